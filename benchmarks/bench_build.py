@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark for building sums and products one operand at a time.
+Times `e = e + term` and `e = e * factor` loops and parsing a nested chain
+((x + 1) + 1) + ..., each of which builds a new n-ary node per step.
+
+Run from the project root:
+    python -m benchmarks.bench_build [max_terms]
+"""
+
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Mul, Pow
+from parser import parse_expression
+
+def build_sum(n):
+    symbols = [Symbol(f"x{j}") for j in range(64)]
+    expr = Number(0)
+    for i in range(n):
+        expr += Mul(Number(i), symbols[i % 64])
+    return expr
+
+def build_product(n):
+    expr = Number(1)
+    for i in range(n):
+        expr *= Pow(Symbol(f"x{i}"), Number(2))
+    return expr
+
+def parse_nested(n):
+    return parse_expression("(" * n + "x" + " + 1)" * n)
+
+def timed(func, n):
+    start = time.perf_counter()
+    func(n)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    max_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 16_000
+    print(f"{'terms':>8} {'e + term':>12} {'e * factor':>12} {'nested parse':>14}")
+    for n in (1000, 2000, 4000, 8000, max_terms):
+        print(f"{n:>8} {timed(build_sum, n):>9.1f} ms {timed(build_product, n):>9.1f} ms "
+              f"{timed(parse_nested, n):>11.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the NumPy dense univariate backend.
+Times multiplication (convolution vs SparsePoly), Horner evaluation over
+an array of points vs a Python loop over the terms, and simplify() on
+univariate sums. Requires NumPy.
+
+Run from the project root:
+    python -m benchmarks.bench_dense [max_degree]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from dense import DensePoly, np
+from simplify import simplify
+
+POINTS = 10_000
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+def evaluate_terms(poly, points):
+    """Evaluate term by term in Python, one point at a time."""
+    terms = list(enumerate(poly.coeffs.tolist()))
+    return [sum(c * t ** k for k, c in terms) for t in points]
+
+def random_sum(terms, degree, seed=0):
+    rng = random.Random(seed)
+    x = Symbol('x')
+    return Add(*[Mul(Number(rng.randint(-9, 9)), Pow(x, Number(rng.randrange(degree))))
+                 for _ in range(terms)])
+
+def main():
+    if np is None:
+        print("NumPy is not installed")
+        return
+    max_degree = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    x = Symbol('x')
+    rng = np.random.default_rng(0)
+    points = np.linspace(-1, 1, POINTS)
+    print(f"{'degree':>7} {'convolve':>12} {'sparse':>12} {'horner':>12} {'terms':>12}")
+    degree = 10
+    while degree <= max_degree:
+        p = DensePoly(rng.integers(-99, 100, degree + 1), x)
+        q = DensePoly(rng.integers(-99, 100, degree + 1), x)
+        _, dense_ms = timed(p.__mul__, q)
+        sp, sq = p.to_sparse(), q.to_sparse()
+        _, sparse_ms = timed(sp.__mul__, sq)
+        _, horner_ms = timed(p.evaluate, points)
+        if degree <= 1000:
+            _, terms_ms = timed(evaluate_terms, p, points[:POINTS // 100])
+            terms_text = f"{terms_ms * 100:>9.1f} ms"
+        else:
+            terms_text = f"{'-':>12}"
+        print(f"{degree:>7} {dense_ms:>9.1f} ms {sparse_ms:>9.1f} ms "
+              f"{horner_ms:>9.1f} ms {terms_text}")
+        degree *= 10
+    print(f"(evaluation at {POINTS} points; the term loop is timed on 1% and scaled)")
+
+    print(f"\n{'terms':>7} {'simplify':>12}")
+    for terms in (100, 1000, 10_000, 100_000):
+        expr = random_sum(terms, 50)
+        _, elapsed = timed(simplify, expr)
+        print(f"{terms:>7} {elapsed:>9.1f} ms")
+
+if __name__ == "__main__":
+    main()
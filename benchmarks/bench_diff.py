@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark for diff() on deeply nested Mul/Pow chains.
+Every level of each chain contains the whole level below it twice, so a
+naive recursive product rule doubles the output per level. Reports the
+derivative's size as a DAG (unique nodes) and as the tree that naive
+differentiation would build.
+
+  nested:  e -> (e * (e + i))^2    products and powers alternate
+  flat:    e -> e * (e + i)^2      products flatten into one growing Mul
+
+Run from the project root:
+    python -m benchmarks.bench_diff [max_depth]
+"""
+
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from diff import diff
+
+def nested_chain(depth):
+    x = Symbol('x')
+    expr = x
+    for i in range(depth):
+        expr = Pow(Mul(expr, Add(expr, Number(i + 1))), Number(2))
+    return expr
+
+def flat_chain(depth):
+    x = Symbol('x')
+    expr = x
+    for i in range(depth):
+        expr = Mul(expr, Pow(Add(expr, Number(i + 1)), Number(2)))
+    return expr
+
+def dag_size(expr):
+    """Number of unique nodes."""
+    seen = set()
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if node not in seen:
+            seen.add(node)
+            stack.extend(node.args)
+    return len(seen)
+
+def tree_size(expr):
+    """Number of nodes if no subtree were shared."""
+    sizes = {}
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        pending = [arg for arg in node.args if arg not in sizes]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        sizes[node] = 1 + sum(sizes[arg] for arg in node.args)
+    return sizes[expr]
+
+def run(name, chain, depths):
+    x = Symbol('x')
+    print(f"\n{name}")
+    print(f"{'depth':>6} {'input DAG':>10} {'output DAG':>11} {'output tree':>12} {'diff':>12}")
+    for depth in depths:
+        expr = chain(depth)
+        start = time.perf_counter()
+        result = diff(expr, x)
+        elapsed = (time.perf_counter() - start) * 1000
+        tree = tree_size(result)
+        tree_text = str(tree) if tree < 10 ** 9 else f"~1e{len(str(tree)) - 1}"
+        print(f"{depth:>6} {dag_size(expr):>10} {dag_size(result):>11} {tree_text:>12} "
+              f"{elapsed:>9.1f} ms")
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    run("nested (e * (e + i))^2", nested_chain,
+        [d for d in (10, 100, 500, 1000, 2000, 5000) if d <= max_depth])
+    # Each flat level has one more factor, so its product rule has one more term
+    run("flat e * (e + i)^2", flat_chain,
+        [d for d in (10, 25, 50, 100) if d <= max_depth])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark for equality saturation against greedy simplify(): output
+size (nodes, counted as a tree) and runtime, on inputs where the greedy
+rules stop in a local minimum, on random expressions, and on an input
+large enough to hit the budgets.
+
+Run from the project root:
+    python -m benchmarks.bench_egraph [random_count]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Symbol, Add
+from parser import parse_expression
+from simplify import simplify
+from egraph import EGraphSimplifier, node_count, tree_cost
+from testing import random_expr
+
+SYMBOLS = [Symbol(name) for name in "xyz"]
+
+CASES = [
+    "(x + 1)^2 - x^2 - 2*x",
+    "x*y + x*z",
+    "(x + y)*(x - y) + y^2",
+    "(a + b)^3 - 3*a*b*(a + b)",
+    "x*y*z + x*y*w + x*y",
+    "(x + 1)*(x + 2) - (x + 3)*(x + 4) + 4*x",
+    "2*x + 3*x + x*x*x",
+]
+
+def large_input(n):
+    """n differences (x_i + 1)^2 - x_i^2, each collapsing to 2*x_i + 1."""
+    return Add(*[parse_expression(f"(x{i} + 1)^2 - x{i}^2 + y*x{i} + y*z")
+                 for i in range(n)])
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+def compare(expr, simplifier):
+    greedy, greedy_time = timed(lambda: simplify(expr))
+    result, egraph_time = timed(lambda: simplifier.run(expr))
+    return (tree_cost(greedy, node_count), tree_cost(result, node_count),
+            greedy_time, egraph_time)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    simplifier = EGraphSimplifier()
+    print(f"{'input':<42} {'greedy':>7} {'e-graph':>8} {'greedy':>10} {'e-graph':>10} "
+          f"{'rounds':>7} {'stop':>16}")
+    for text in CASES:
+        sizes = compare(parse_expression(text), simplifier)
+        print(f"{text:<42} {sizes[0]:>7} {sizes[1]:>8} {sizes[2]:>7.2f} ms {sizes[3]:>7.1f} ms "
+              f"{simplifier.iterations:>7} {simplifier.stop_reason:>16}")
+
+    rng = random.Random(0)
+    totals = [0, 0, 0.0, 0.0]
+    improved = 0
+    for _ in range(count):
+        sizes = compare(random_expr(rng, 4, SYMBOLS), simplifier)
+        improved += sizes[1] < sizes[0]
+        totals = [total + size for total, size in zip(totals, sizes)]
+    label = f"{count} random expressions ({improved} smaller)"
+    print(f"{label:<42} {totals[0]:>7} {totals[1]:>8} {totals[2]:>7.1f} ms "
+          f"{totals[3]:>7.1f} ms")
+
+    # Budgets bound the work on large input, keeping what was found so far
+    for n in (10, 100):
+        for node_limit, time_limit in ((10000, 1.0), (1000, 0.1)):
+            limited = EGraphSimplifier(node_limit=node_limit, time_limit=time_limit)
+            sizes = compare(large_input(n), limited)
+            label = f"{n} terms, {node_limit} nodes, {time_limit} s"
+            print(f"{label:<42} {sizes[0]:>7} {sizes[1]:>8} {sizes[2]:>7.2f} ms "
+                  f"{sizes[3]:>7.1f} ms {limited.iterations:>7} {limited.stop_reason:>16}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for expand().
+Times (x1 + ... + xk + 1)**n for growing exponents n, and products of two
+random sums with a growing number of terms.
+
+Run from the project root:
+    python -m benchmarks.bench_expand [max_exponent] [max_terms]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from expand import expand
+
+def timed_expand(expr):
+    start = time.perf_counter()
+    result = expand(expr)
+    elapsed = (time.perf_counter() - start) * 1000
+    return len(result.args) if isinstance(result, Add) else 1, elapsed
+
+def random_sum(terms, symbols, seed):
+    """A sum of `terms` random monomials with small coefficients."""
+    rng = random.Random(seed)
+    return Add(*[Mul(Number(rng.randint(1, 9)),
+                     *[Pow(s, Number(rng.randrange(10))) for s in symbols])
+                 for _ in range(terms)])
+
+def bench_powers(max_exponent):
+    print(f"{'symbols':>7} {'exponent':>9} {'terms':>8} {'expand':>12}")
+    for count in (1, 3, 5):
+        base = Add(*[Symbol(f"x{i}") for i in range(count)], Number(1))
+        exponent = 5
+        while exponent <= max_exponent:
+            terms, elapsed = timed_expand(Pow(base, Number(exponent)))
+            print(f"{count:>7} {exponent:>9} {terms:>8} {elapsed:>9.1f} ms")
+            exponent *= 2
+
+def bench_products(max_terms):
+    print(f"\n{'factor terms':>12} {'terms':>8} {'expand':>12}")
+    symbols = [Symbol(name) for name in "xyz"]
+    terms = 10
+    while terms <= max_terms:
+        expr = Mul(random_sum(terms, symbols, 1), random_sum(terms, symbols, 2))
+        result_terms, elapsed = timed_expand(expr)
+        print(f"{terms:>12} {result_terms:>8} {elapsed:>9.1f} ms")
+        terms *= 10
+
+def main():
+    max_exponent = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    max_terms = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    bench_powers(max_exponent)
+    bench_products(max_terms)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark for factor().
+Times GCF extraction on wide sums with a shared monomial, and difference
+of squares on (a^2 - b^2) with growing powers, and reports how many
+multiplications evaluating the expression takes before and after.
+
+Run from the project root:
+    python -m benchmarks.bench_factor [max_terms]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from factor import factor
+
+def multiplications(expr):
+    """Multiplications to evaluate `expr` naively (x**n as n - 1 products)."""
+    count = 0
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Mul):
+            count += len(node.args) - 1
+        elif isinstance(node, Pow) and isinstance(node.exp, Number) \
+                and type(node.exp.value) is int and node.exp.value > 1:
+            count += node.exp.value - 1
+        stack.extend(node.args)
+    return count
+
+def shared_factor_sum(terms, seed=0):
+    """A sum of `terms` monomials that all contain 6 * x^3 * y^2."""
+    rng = random.Random(seed)
+    symbols = [Symbol(f"x{i}") for i in range(10)]
+    x, y = Symbol('x'), Symbol('y')
+    return Add(*[Mul(Number(6 * rng.randint(1, 50)), Pow(x, Number(3 + rng.randrange(3))),
+                     Pow(y, Number(2)), rng.choice(symbols), Pow(rng.choice(symbols), Number(2)))
+                 for _ in range(terms)])
+
+def timed_factor(expr):
+    start = time.perf_counter()
+    result = factor(expr)
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    max_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'terms':>7} {'factor':>12} {'mults before':>13} {'after':>8}")
+    terms = 100
+    while terms <= max_terms:
+        expr = shared_factor_sum(terms)
+        result, elapsed = timed_factor(expr)
+        print(f"{terms:>7} {elapsed:>9.1f} ms {multiplications(expr):>13} "
+              f"{multiplications(result):>8}")
+        terms *= 10
+
+    print(f"\n{'power':>7} {'factor':>12} {'factors':>8}")
+    x, y = Symbol('x'), Symbol('y')
+    for n in (2, 8, 64, 512):
+        expr = Add(Pow(x, Number(n)), Mul(Number(-1), Pow(y, Number(n))))
+        result, elapsed = timed_factor(expr)
+        print(f"{n:>7} {elapsed:>9.1f} ms {len(result.args):>8}")
+
+if __name__ == "__main__":
+    main()
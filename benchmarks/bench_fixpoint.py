@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark for FixpointSimplifier against calling simplify() in a loop
+until the result stops changing. The loop re-walks the whole tree on
+every call, including the last one that only confirms nothing changed;
+the driver revisits only nodes created by the previous pass and their
+ancestors, and recognizes an already simplified expression at once.
+
+Input: a sum of n products c * (x_i + 1) * (x_i + 1), each merging into
+a power.
+
+Run from the project root:
+    python -m benchmarks.bench_fixpoint [max_terms]
+"""
+
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul
+from simplify import simplify
+from fixpoint import FixpointSimplifier
+
+def wide_sum(n):
+    return Add(*[Mul(Number(i % 5 + 2), Add(Symbol(f"x{i}"), Number(1)),
+                     Add(Symbol(f"x{i}"), Number(1))) for i in range(n)])
+
+def simplify_loop(expr):
+    """What users did before: simplify until nothing changes."""
+    calls = 0
+    while True:
+        result = simplify(expr)
+        calls += 1
+        if result is expr:
+            return result, calls
+        expr = result
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    max_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"{'terms':>7} {'loop':>10} {'calls':>6} {'fixpoint':>10} {'passes':>7} "
+          f"{'visits':>8} {'loop again':>11} {'fixpoint again':>15}")
+    for n in (1000, 10000, 100000):
+        if n > max_terms:
+            break
+        expr = wide_sum(n)
+        (expected, calls), loop = timed(lambda: simplify_loop(expr))
+        simplifier = FixpointSimplifier()
+        result, fixpoint = timed(lambda: simplifier.run(expr))
+        assert result is expected
+        passes, visits = simplifier.passes, simplifier.visits
+        _, loop_again = timed(lambda: simplify_loop(result))
+        _, fixpoint_again = timed(lambda: simplifier.run(result))
+        print(f"{n:>7} {loop:>7.1f} ms {calls:>6} {fixpoint:>7.1f} ms {passes:>7} "
+              f"{visits:>8} {loop_again:>8.1f} ms {fixpoint_again:>12.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark for gradient() against one diff() call per variable.
+The expression chains n variables so that every level contains the level
+below it:
+
+    e -> (e * x_i + 1)^2
+
+Each diff() walks and differentiates the whole chain, so n of them cost
+O(n^2); gradient() makes one reverse sweep. Also times the numeric mode,
+which evaluates the partials at a point without building expressions.
+
+Run from the project root:
+    python -m benchmarks.bench_gradient [max_variables]
+"""
+
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from diff import diff, gradient
+
+def chain(symbols):
+    expr = Number(1)
+    for sym in symbols:
+        expr = Pow(Add(Mul(expr, sym), Number(1)), Number(2))
+    return expr
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    max_variables = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{'variables':>9} {'diff each':>12} {'gradient':>12} {'numeric':>12} {'speedup':>8}")
+    for n in (10, 50, 100, 200, 500):
+        if n > max_variables:
+            break
+        symbols = [Symbol(f"x{i}") for i in range(n)]
+        expr = chain(symbols)
+        # Values near 0 keep the nested squares from overflowing
+        point = {sym: 0.01 for sym in symbols}
+        _, forward = timed(lambda: [diff(expr, sym) for sym in symbols])
+        _, reverse = timed(lambda: gradient(expr, symbols))
+        _, numeric = timed(lambda: gradient(expr, symbols, point))
+        print(f"{n:>9} {forward:>9.1f} ms {reverse:>9.1f} ms {numeric:>9.1f} ms "
+              f"{forward / reverse:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
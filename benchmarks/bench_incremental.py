@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark for SimplifiedExpr.replace() against simplifying the whole
+edited expression again. The full pass walks every node; the handle
+re-simplifies only the path from the edit to the root, so its latency
+follows the depth of the tree (log of its size here) rather than the size.
+
+Input: balanced alternating sums and products of distinct symbols, with
+leaves replaced one at a time at random positions.
+
+Run from the project root:
+    python -m benchmarks.bench_incremental [max_depth]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Symbol
+from simplify import simplify
+from incremental import SimplifiedExpr
+from testing import balanced
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 18
+    edits = 50
+    print(f"{'depth':>6} {'nodes':>8} {'full':>11} {'incremental':>12} {'speedup':>9} "
+          f"{'simplified':>11}")
+    for depth in (6, 10, 14, 18):
+        if depth > max_depth:
+            break
+        rng = random.Random(depth)
+        handle = SimplifiedExpr(balanced(depth))
+        paths = [[rng.randrange(2) for _ in range(depth)] for _ in range(edits)]
+
+        incremental = 0.0
+        full = 0.0
+        updated = 0
+        for i, path in enumerate(paths):
+            start = time.perf_counter()
+            result = handle.replace(path, Symbol(f"t{i}"))
+            incremental += time.perf_counter() - start
+            updated += handle.updated
+            start = time.perf_counter()
+            expected = simplify(handle.expr)
+            full += time.perf_counter() - start
+            assert result is expected
+        full, incremental = full / edits * 1000, incremental / edits * 1000
+        print(f"{depth:>6} {(2 << depth) - 1:>8} {full:>8.3f} ms {incremental:>9.3f} ms "
+              f"{full / incremental:>8.0f}x {updated / edits:>11.1f}")
+
+if __name__ == "__main__":
+    main()
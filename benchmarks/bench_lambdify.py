@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark for lambdify(): per-call cost of a compiled expression against
+walking the AST at every call and against the same formula written by
+hand as a Python function. Also reports the one-off compile time and the
+cost of a cached lambdify() call.
+
+Run from the project root:
+    python -m benchmarks.bench_lambdify [calls]
+"""
+
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul
+from parser import parse_expression
+from lambdify import lambdify, clear_lambdify_cache
+
+FORMULA = "(x + y)^2 * (x + y + 1) + 3*(x + y)^2 - x*y*z + z^3 / 2"
+
+def hand_written(x, y, z):
+    s = (x + y) ** 2
+    return s * (x + y + 1) + 3 * s - x * y * z + z ** 3 * 0.5
+
+def evaluate(expr, values):
+    """Evaluate `expr` by walking its tree, as an interpreter would."""
+    kind = type(expr)
+    if kind is Number:
+        return expr.value
+    if kind is Symbol:
+        return values[expr]
+    if kind is Add:
+        total = 0
+        for arg in expr.args:
+            total += evaluate(arg, values)
+        return total
+    if kind is Mul:
+        product = 1
+        for arg in expr.args:
+            product *= evaluate(arg, values)
+        return product
+    return evaluate(expr.base, values) ** evaluate(expr.exp, values)
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i * 1e-6)
+    return (time.perf_counter() - start) / calls * 1e9
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    expr = parse_expression(FORMULA)
+    x, y, z = Symbol('x'), Symbol('y'), Symbol('z')
+
+    clear_lambdify_cache()
+    start = time.perf_counter()
+    f = lambdify(expr, [x, y, z])
+    compile_us = (time.perf_counter() - start) * 1e6
+    start = time.perf_counter()
+    for _ in range(1000):
+        lambdify(expr, [x, y, z])
+    cached_us = (time.perf_counter() - start) * 1e3
+
+    print(f"formula: {FORMULA}\n")
+    print(f.source)
+    print(f"compile: {compile_us:.0f} us, cached lookup: {cached_us:.2f} us\n")
+    tree = per_call(lambda t: evaluate(expr, {x: t, y: 2.0, z: 3.0}), calls)
+    compiled = per_call(lambda t: f(t, 2.0, 3.0), calls)
+    native = per_call(lambda t: hand_written(t, 2.0, 3.0), calls)
+    print(f"{'tree walk':>12} {tree:>8.0f} ns/call")
+    print(f"{'lambdify':>12} {compiled:>8.0f} ns/call  ({tree / compiled:.1f}x faster)")
+    print(f"{'hand-written':>12} {native:>8.0f} ns/call")
+
+if __name__ == "__main__":
+    main()
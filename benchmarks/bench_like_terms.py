@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark for like-term collection on random polynomials.
+Compares collect_like_terms() (hash grouping) with simplify() (the
+previous behaviour of collect_like_terms).
+
+Run from the project root:
+    python -m benchmarks.bench_like_terms [max_terms]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from simplify import simplify, collect_like_terms
+
+def random_polynomial(terms, variables=5, max_degree=4, seed=0):
+    """A sum of `terms` random monomials c * x0^e0 * ... * xk^ek."""
+    rng = random.Random(seed)
+    symbols = [Symbol(f"x{i}") for i in range(variables)]
+    result = []
+    for _ in range(terms):
+        factors = [Number(rng.randint(-9, 9))]
+        for symbol in rng.sample(symbols, rng.randint(1, 3)):
+            degree = rng.randint(1, max_degree)
+            factors.append(symbol if degree == 1 else Pow(symbol, Number(degree)))
+        result.append(Mul(*factors))
+    return Add(*result)
+
+def timed(func, expr):
+    start = time.perf_counter()
+    result = func(expr)
+    return (time.perf_counter() - start) * 1000, result
+
+def main():
+    max_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    print(f"{'terms':>8} {'distinct':>9} {'simplify':>12} {'collect':>12}")
+    for terms in (1000, 10_000, 100_000, max_terms):
+        expr = random_polynomial(terms)
+        simplify_ms, expected = timed(simplify, expr)
+        collect_ms, collected = timed(collect_like_terms, expr)
+        assert collected is expected
+        distinct = len(collected.args) if isinstance(collected, Add) else 1
+        print(f"{terms:>8} {distinct:>9} {simplify_ms:>9.1f} ms {collect_ms:>9.1f} ms")
+
+if __name__ == "__main__":
+    main()
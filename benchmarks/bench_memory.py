@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for MiniSym expression nodes.
+Reports tracemalloc bytes per node for the original dict-based node layout
+and for the current interned, slot-based nodes. The "after" figures include
+the intern table. Interning is a tradeoff: a unique node costs more than an
+original one (its weak table entry outweighs the dict it no longer has), and
+a repeated subtree costs nothing beyond a reference to the shared node.
+
+Run from the project root:
+    python -m benchmarks.bench_memory [node_count]
+"""
+
+import sys
+import tracemalloc
+
+from minisym_ast import Number, Symbol, Add, Mul, intern_table_size
+
+class LegacyNumber:
+    """The original node layout: a plain class with a per-instance __dict__."""
+    def __init__(self, value):
+        self.value = value
+
+class LegacySymbol:
+    def __init__(self, name):
+        self.name = name
+
+class LegacyAdd:
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+class LegacyMul:
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+def build_unique(n, number, symbol, add, mul):
+    """Build a sum of n distinct terms `i*x_j`, one term at a time; every
+    node is unique. Each step copies the n-ary sum's operands, so this is
+    quadratic in n."""
+    symbols = [symbol(f"x{j}") for j in range(64)]
+    expr = number(0)
+    for i in range(n):
+        expr = add(expr, mul(number(i), symbols[i % 64]))
+    return expr
+
+def build_repeated(n, number, symbol, add, mul):
+    """Build n copies of `2*x + 1`, the workload interning is meant for."""
+    x = symbol('x')
+    return [add(mul(number(2), x), number(1)) for _ in range(n)]
+
+def measure(label, builder, n, nodes_per_item, classes):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = builder(n, *classes)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    nodes = n * nodes_per_item
+    print(f"  {label:<10} {(after - before) / nodes:8.1f} bytes/node "
+          f"({nodes} nodes, {(after - before) / 2**20:.1f} MiB)")
+    return result, (after - before) / nodes
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    legacy = (LegacyNumber, LegacySymbol, LegacyAdd, LegacyMul)
+    current = (Number, Symbol, Add, Mul)
+
+    print(f"Unique terms (n={n}, 3 nodes per term):")
+    _, legacy_size = measure("before", build_unique, n, 3, legacy)
+    kept, size = measure("after", build_unique, n, 3, current)
+    print(f"  interned nodes alive: {intern_table_size()}")
+    print(f"  unique nodes cost {size / legacy_size:.1f}x the original layout")
+    del kept
+
+    print(f"\nRepeated subterms (n={n} copies of 2*x + 1, 5 nodes each):")
+    measure("before", build_repeated, n, 5, legacy)
+    measure("after", build_repeated, n, 5, current)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Benchmark for power-product merging in simplify_mul.
+Times simplify() on products of n random factors x_i^k and reports how
+many factors remain after exponents are collected per base.
+
+Run from the project root:
+    python -m benchmarks.bench_monomials [max_factors]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Mul, Pow
+from simplify import simplify
+
+def random_monomial(factors, variables=50, seed=0):
+    """A product of `factors` random factors c, x_i, or x_i^k (k may be negative)."""
+    rng = random.Random(seed)
+    symbols = [Symbol(f"x{i}") for i in range(variables)]
+    result = []
+    for _ in range(factors):
+        roll = rng.random()
+        if roll < 0.05:
+            result.append(Number(rng.randint(2, 5)))
+        elif roll < 0.5:
+            result.append(rng.choice(symbols))
+        else:
+            result.append(Pow(rng.choice(symbols), Number(rng.randint(-3, 4))))
+    return Mul(*result)
+
+def main():
+    max_factors = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{'factors':>9} {'remaining':>10} {'simplify':>12}")
+    factors = 1000
+    while factors <= max_factors:
+        expr = random_monomial(factors)
+        start = time.perf_counter()
+        result = simplify(expr)
+        elapsed = (time.perf_counter() - start) * 1000
+        remaining = len(result.args) if isinstance(result, Mul) else 1
+        print(f"{factors:>9} {remaining:>10} {elapsed:>9.1f} ms")
+        factors *= 10
+
+if __name__ == "__main__":
+    main()
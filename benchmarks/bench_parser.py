@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark for tokenizing and parsing large generated expressions.
+Compares the character-by-character Tokenizer with iter_tokens(), and the
+recursive descent Parser with IterativeParser on wide and deep inputs.
+
+Run from the project root:
+    python -m benchmarks.bench_parser [terms]
+"""
+
+import random
+import sys
+import time
+
+from parser import Tokenizer, Parser, IterativeParser, iter_tokens
+
+def generated_polynomial(terms, seed=0):
+    """A multi-megabyte style polynomial string with `terms` terms."""
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(terms):
+        coeff = rng.choice([str(rng.randint(1, 999)), f"{rng.random() * 100:.4f}"])
+        var = f"x_{rng.randint(0, 99)}"
+        parts.append(f"{coeff}*{var}^{rng.randint(1, 9)}")
+    return " + ".join(parts)
+
+def deeply_nested(depth):
+    """Nested parentheses, powers and unary minus, `depth` levels deep."""
+    return "(" * depth + "x" + "+1)*-2^y" * depth
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    try:
+        func(*args)
+    except RecursionError:
+        print(f"  {label:<28}   RecursionError")
+        return
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:8.1f} ms")
+
+def parse_with(parser_class, text):
+    return parser_class(text).parse()
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    text = generated_polynomial(terms)
+    print(f"Tokenizing {len(text) / 2**20:.1f} MiB ({terms} terms):")
+    timed("Tokenizer (char by char)", Tokenizer, text)
+    timed("iter_tokens (master regex)", lambda t: sum(1 for _ in iter_tokens(t)), text)
+
+    print(f"\nParsing wide input ({terms} terms):")
+    timed("Parser (recursive descent)", parse_with, Parser, text)
+    timed("IterativeParser", parse_with, IterativeParser, text)
+
+    for depth in (200, terms // 10):
+        nested = deeply_nested(depth)
+        print(f"\nParsing deep input ({depth} levels):")
+        timed("Parser (recursive descent)", parse_with, Parser, nested)
+        timed("IterativeParser", parse_with, IterativeParser, nested)
+
+if __name__ == "__main__":
+    main()
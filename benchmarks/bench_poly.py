@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark for SparsePoly multiplication.
+Times the product of two random n-term polynomials, packed into big
+integers (Kronecker substitution) and multiplied term by term in a dict.
+
+Run from the project root:
+    python -m benchmarks.bench_poly [max_terms]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Symbol
+from poly import SparsePoly, multiply_dict, multiply_kronecker
+
+def random_poly(terms, symbols, seed):
+    """A polynomial with `terms` random integer terms of low degree in each symbol."""
+    rng = random.Random(seed)
+    degree = round(terms ** (1 / len(symbols))) * 2
+    result = {}
+    while len(result) < terms:
+        exps = tuple(rng.randrange(degree) for _ in symbols)
+        result[exps] = rng.choice([-1, 1]) * rng.randint(1, 99)
+    return SparsePoly(result, symbols)
+
+def timed(multiply, p, q):
+    start = time.perf_counter()
+    product = multiply(p, q)
+    return product, (time.perf_counter() - start) * 1000
+
+def main():
+    max_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"{'symbols':>7} {'terms':>6} {'product':>8} {'packed':>12} {'dict':>12}")
+    for names in ("x", "xy", "xyz"):
+        symbols = tuple(Symbol(name) for name in names)
+        terms = 10
+        while terms <= max_terms:
+            p = random_poly(terms, symbols, seed=1)
+            q = random_poly(terms, symbols, seed=2)
+            packed, packed_ms = timed(multiply_kronecker, p, q)
+            product, dict_ms = timed(multiply_dict, p, q)
+            assert packed is None or packed.terms == product.terms
+            packed_text = f"{packed_ms:>9.1f} ms" if packed is not None else f"{'-':>12}"
+            print(f"{len(symbols):>7} {terms:>6} {len(product):>8} {packed_text} {dict_ms:>9.1f} ms")
+            terms *= 10
+
+if __name__ == "__main__":
+    main()
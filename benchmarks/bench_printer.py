@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark for expression printing.
+Compares the original recursive f-string rendering with the iterative
+printer, on a wide 100k-term sum and on a deep chain.
+
+Run from the project root:
+    python -m benchmarks.bench_printer [terms]
+"""
+
+import io
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+import printer
+
+def legacy_str(expr):
+    """The original rendering: each level formats its children's strings."""
+    if isinstance(expr, Add):
+        return "(" + " + ".join(legacy_str(arg) for arg in expr.args) + ")"
+    if isinstance(expr, Mul):
+        return "(" + " * ".join(legacy_str(arg) for arg in expr.args) + ")"
+    if isinstance(expr, Pow):
+        return f"({legacy_str(expr.base)} ** {legacy_str(expr.exp)})"
+    return str(expr)
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    try:
+        func(*args)
+    except RecursionError:
+        print(f"  {label:<22}   RecursionError")
+        return
+    print(f"  {label:<22} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+def run(title, expr):
+    print(title)
+    timed("recursive f-strings", legacy_str, expr)
+    timed("printer.sstr", printer.sstr, expr)
+    timed("printer.write", printer.write, expr, io.StringIO())
+    printer.enable_string_cache()
+    printer.sstr(expr)
+    timed("printer.sstr (cached)", printer.sstr, expr)
+    printer.disable_string_cache()
+    print()
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    x = Symbol('x')
+
+    wide = Add(*[Mul(Number(i), Pow(Symbol(f"x{i % 50}"), Number(i % 7 + 2)))
+                 for i in range(1, terms + 1)])
+    run(f"Wide sum ({terms} terms):", wide)
+
+    deep = x
+    for i in range(terms // 10):
+        deep = Mul(Number(2), Add(deep, Number(1)))
+    run(f"Deep chain (depth {2 * (terms // 10)}):", deep)
+
+if __name__ == "__main__":
+    main()
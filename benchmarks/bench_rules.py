@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark for rule dispatch as user rules accumulate. Registers growing
+numbers of rules on powers, products and sums (none of which fire on the
+workload, so the work done is the same) and times simplify() on a fixed
+expression with the indexed RuleSet and with a linear scan that tries
+every rule on every node, as an if-ladder would.
+
+Run from the project root:
+    python -m benchmarks.bench_rules [max_rules]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+import simplify as simplify_module
+from simplify import simplify
+from rewrite import Rule, RuleSet, Wild, Rest, pattern
+from benchmarks.bench_diff import dag_size
+
+class LinearRuleSet(RuleSet):
+    """Tries every rule on every node."""
+    def candidates(self, expr):
+        return range(len(self.rules))
+
+def user_rules(count):
+    """`count` rules, spread over the three heads, on symbols the workload lacks."""
+    a = Wild('a')
+    rules = []
+    for i in range(count):
+        anchor = Symbol(f"u{i}")
+        shape = (pattern(Pow, anchor, a), pattern(Mul, anchor, Rest('r')),
+                 pattern(Add, pattern(Pow, anchor, a), Rest('r')))[i % 3]
+        rules.append(Rule(f"rule{i}", shape, anchor))
+    return rules
+
+def workload(seed=0):
+    """A sum of products of small powers, with like terms to combine."""
+    rng = random.Random(seed)
+    symbols = [Symbol(f"x{j}") for j in range(20)]
+    return Add(*[Mul(Number(rng.randint(1, 5)),
+                     *[Pow(rng.choice(symbols), Number(rng.randint(1, 3)))
+                       for _ in range(rng.randint(1, 3))],
+                     Add(rng.choice(symbols), Number(rng.randint(0, 2))))
+                 for _ in range(300)])
+
+def timed(expr):
+    start = time.perf_counter()
+    simplify(expr)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    max_rules = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    expr = workload()
+    print(f"workload: {dag_size(expr)} unique nodes per simplify() call\n")
+    print(f"{'rules':>6} {'indexed':>10} {'linear scan':>12}")
+    try:
+        for count in (0, 10, 50, 100, 200, 500):
+            if count > max_rules:
+                break
+            rules = user_rules(count)
+            simplify_module.USER_RULES = RuleSet(rules)
+            indexed = min(timed(expr) for _ in range(5))
+            simplify_module.USER_RULES = LinearRuleSet(rules)
+            linear = min(timed(expr) for _ in range(5))
+            print(f"{count:>6} {indexed:>7.1f} ms {linear:>9.1f} ms")
+    finally:
+        simplify_module.clear_user_rules()
+
+if __name__ == "__main__":
+    main()
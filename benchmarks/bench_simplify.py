@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the simplify driver.
+Times simplify() on wide sums of 10^3 to 10^6 terms, on deeply nested
+expressions that exceed the interpreter recursion limit, and on DAGs whose
+trees double in size at each level.
+
+Run from the project root:
+    python -m benchmarks.bench_simplify [max_exponent]
+"""
+
+import random
+import sys
+import time
+
+from minisym_ast import Number, Symbol, Add, Mul
+from simplify import simplify
+
+def wide_sum(n, variables=100, seed=0):
+    """A sum of n terms c*x_j and constants, with many like terms."""
+    rng = random.Random(seed)
+    symbols = [Symbol(f"x{j}") for j in range(variables)]
+    terms = []
+    for _ in range(n):
+        if rng.random() < 0.1:
+            terms.append(Number(rng.randint(-9, 9)))
+        else:
+            terms.append(Mul(Number(rng.randint(-9, 9)), rng.choice(symbols)))
+    return Add(*terms)
+
+def deep_chain(depth):
+    """x nested `depth` times as ((... * 1) + 0)."""
+    expr = Symbol('x')
+    for _ in range(depth):
+        expr = Add(Mul(expr, Number(1)), Number(0))
+    return expr
+
+def shared_dag(levels):
+    """x nested `levels` times as (e + 0) * (e + i): 3 nodes a level, 2^levels leaves as a tree."""
+    expr = Symbol('x')
+    for i in range(levels):
+        expr = Mul(Add(expr, Number(0)), Add(expr, Number(i + 1)))
+    return expr
+
+def timed(label, expr):
+    start = time.perf_counter()
+    result = simplify(expr)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<14} {elapsed * 1000:10.1f} ms")
+    return result
+
+def main():
+    max_exponent = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    print(f"Recursion limit: {sys.getrecursionlimit()}\n")
+
+    print("Wide sums:")
+    for exponent in range(3, max_exponent + 1):
+        timed(f"10^{exponent} terms", wide_sum(10 ** exponent))
+
+    print("\nDeep nesting:")
+    for exponent in range(3, max_exponent):
+        timed(f"depth 10^{exponent}", deep_chain(10 ** exponent))
+
+    print("\nShared subexpressions:")
+    for levels in (20, 80, 320):
+        timed(f"2^{levels} tree", shared_dag(levels))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the specialized simplifier against the interpreted rule
+path. The interpreted path looks each rule up through the RuleSet index
+and matches it with compiled closures; the generated module tests the
+same patterns inline. Both run without the global simplify cache.
+
+Input: random expressions, simplified with the built-in rules alone and
+with n user rules over powers registered.
+
+Run from the project root:
+    python -m benchmarks.bench_specialize [max_rules]
+"""
+
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from minisym_ast import Number, Symbol, Pow
+from simplify import simplify_all, register_rule, clear_user_rules
+from rewrite import Rule, Wild, Value, pattern
+from specialize import build_simplifier
+from testing import random_expr
+
+SYMBOLS = [Symbol(name) for name in "xyzw"]
+
+def power_rules(n):
+    """n rules rewriting (s^k)^j for one symbol s and exponent k each."""
+    a = Wild('a')
+    rules = []
+    for i in range(n):
+        sym, k = SYMBOLS[i % len(SYMBOLS)], i // len(SYMBOLS) + 2
+        rules.append(Rule(f"{sym}-{k}", pattern(Pow, pattern(Pow, sym, Value(k)), a),
+                          lambda bindings, sym=sym, k=k: Pow(sym, Number(k) * bindings['a'])))
+    return rules
+
+def timed(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+def main():
+    max_rules = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rng = random.Random(0)
+    exprs = [random_expr(rng, 6, SYMBOLS, constants=range(4), exponents=range(5),
+                         leaf_chance=0.25, add_chance=0.3, mul_chance=0.3)
+             for _ in range(2000)]
+    cache_dir = tempfile.mkdtemp()
+    print(f"{'rules':>6} {'interpreted':>12} {'specialized':>12} {'speedup':>8} "
+          f"{'cold build':>11} {'warm build':>11}")
+    try:
+        for n in (0, 10, 100):
+            if n > max_rules:
+                break
+            clear_user_rules()
+            for rule in power_rules(n):
+                register_rule(rule)
+            module, cold = timed(lambda: build_simplifier(cache_dir), repeat=1)
+            _, warm = timed(lambda: build_simplifier(cache_dir))
+            expected, interpreted = timed(lambda: simplify_all(exprs))
+            result, specialized = timed(lambda: module.simplify_all(exprs))
+            assert all(a is b for a, b in zip(result, expected))
+            print(f"{n:>6} {interpreted:>9.1f} ms {specialized:>9.1f} ms "
+                  f"{interpreted / specialized:>7.2f}x {cold:>8.1f} ms {warm:>8.1f} ms")
+    finally:
+        clear_user_rules()
+        shutil.rmtree(cache_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Tape: per-point evaluation against tree walking and
+lambdify(), batch evaluation against calling the tape once per point, and
+the size and round-trip time of a serialized tape.
+
+Run from the project root:
+    python -m benchmarks.bench_tape [points]
+"""
+
+import pickle
+import random
+import sys
+import time
+
+from minisym_ast import Symbol
+from parser import parse_expression
+from lambdify import lambdify
+from tape import Tape
+from benchmarks.bench_lambdify import FORMULA, evaluate
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    expr = parse_expression(FORMULA)
+    symbols = (Symbol('x'), Symbol('y'), Symbol('z'))
+    rng = random.Random(0)
+    columns = [[rng.random() + 0.5 for _ in range(points)] for _ in symbols]
+    rows = list(zip(*columns))
+
+    tape, build = timed(lambda: Tape.from_exprs(expr, symbols))
+    f = lambdify(expr, symbols)
+    print(f"formula: {FORMULA}\n")
+    print(tape.disassemble())
+    print(f"\n{len(tape)} instructions, {tape.registers} registers, "
+          f"built in {build * 1e6:.0f} us\n")
+
+    sample = min(points, 20000)
+    _, walk = timed(lambda: [evaluate(expr, dict(zip(symbols, row))) for row in rows[:sample]])
+    _, per_point = timed(lambda: [tape(*row) for row in rows])
+    _, compiled = timed(lambda: [f(*row) for row in rows])
+    batch, batched = timed(lambda: tape.evaluate_batch(*columns))
+    assert batch == [tape(*row) for row in rows[:len(batch)]]
+    print(f"{points} points:")
+    print(f"{'tree walk':>18} {walk / sample * 1e9:>8.0f} ns/point")
+    print(f"{'tape per point':>18} {per_point / points * 1e9:>8.0f} ns/point")
+    print(f"{'tape batch':>18} {batched / points * 1e9:>8.0f} ns/point")
+    print(f"{'lambdify':>18} {compiled / points * 1e9:>8.0f} ns/point")
+
+    data, dump = timed(tape.to_bytes)
+    copy, load = timed(lambda: pickle.loads(pickle.dumps(tape)))
+    assert copy(*rows[0]) == tape(*rows[0])
+    print(f"\nserialized: {len(data)} bytes in {dump * 1e6:.0f} us, "
+          f"pickle round trip {load * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    main()
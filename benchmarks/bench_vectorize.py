@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark for ArrayEvaluator: evaluating an expression over a million rows
+per symbol. Compares walking the tree once per row (timed on a sample and
+scaled up), the lambdify() function applied to whole arrays (one NumPy
+temporary per operation, no reuse), and the chunked in-place evaluator at
+several chunk sizes. Peak memory counts the temporaries only, not the
+inputs or the result.
+
+Run from the project root:
+    python -m benchmarks.bench_vectorize [rows]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from minisym_ast import Symbol
+from parser import parse_expression
+from lambdify import lambdify
+from vectorize import ArrayEvaluator
+from benchmarks.bench_lambdify import evaluate
+
+FORMULA = "(x + y)^2 * (x + y + 1) + 3*(x + y)^2 - x*y*z + z^3 / 2 + (x*z + 1)^-1"
+
+def measure(func):
+    """Result, seconds and peak bytes allocated for one call of `func`."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    # Traced separately: tracing slows every allocation down
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    expr = parse_expression(FORMULA)
+    symbols = (Symbol('x'), Symbol('y'), Symbol('z'))
+    rng = np.random.default_rng(0)
+    columns = [rng.random(rows) + 0.5 for _ in symbols]
+    print(f"formula: {FORMULA}")
+    print(f"rows: {rows}\n")
+    print(f"{'method':>24} {'time':>10} {'peak temp':>11}")
+
+    sample = min(rows, 20000)
+    start = time.perf_counter()
+    for i in range(sample):
+        evaluate(expr, {sym: float(column[i]) for sym, column in zip(symbols, columns)})
+    elapsed = (time.perf_counter() - start) * rows / sample
+    print(f"{'tree walk per row':>24} {elapsed * 1000:>7.0f} ms {'-':>11}")
+
+    f = lambdify(expr, symbols)
+    expected, elapsed, peak = measure(lambda: f(*columns))
+    print(f"{'lambdify on arrays':>24} {elapsed * 1000:>7.1f} ms {peak / 2**20:>7.1f} MiB")
+
+    evaluator = ArrayEvaluator(expr, symbols)
+    out = np.empty(rows)
+    for chunk_size in (1 << 10, 1 << 14, 1 << 17, rows):
+        _, elapsed, peak = measure(lambda: evaluator(*columns, chunk_size=chunk_size, out=out))
+        assert np.allclose(out, expected)
+        label = f"chunks of {chunk_size}"
+        print(f"{label:>24} {elapsed * 1000:>7.1f} ms {peak / 2**20:>7.1f} MiB")
+    print(f"\n{len(evaluator.steps)} ufunc steps, {evaluator.buffers} temporary buffers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Dense univariate polynomials for MiniSym
+Polynomials in a single symbol held as NumPy coefficient arrays.
+NumPy is optional: without it HAVE_NUMPY is False and DensePoly cannot be
+built, and simplify() keeps using the sparse path.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from minisym_ast import Number, Symbol, Mul, Pow, Add
+from poly import SparsePoly, free_symbols
+
+HAVE_NUMPY = np is not None
+
+# Integer coefficients stay in int64 while products are known to fit, and
+# fall back to exact Python ints (object arrays) beyond that
+INT64_MAX = 2 ** 63 - 1
+
+# simplify_univariate only builds a dense array, sized by the degree, for
+# sums that fill a fair share of it: at most this many slots per term, and at
+# most DENSE_MAX_DEGREE in all. Sparser sums stay on the SparsePoly path.
+DENSE_SLOTS_PER_TERM = 4
+DENSE_MAX_DEGREE = 1 << 20
+
+def coefficient_array(values):
+    """Pick a dtype for a list of coefficients: int64, float64 or object."""
+    if all(type(v) is int for v in values):
+        if all(-INT64_MAX <= v <= INT64_MAX for v in values):
+            return np.array(values, dtype=np.int64)
+        return np.array(values, dtype=object)
+    if all(isinstance(v, (int, float)) for v in values):
+        return np.array(values, dtype=np.float64)
+    return np.array(values, dtype=object)
+
+def largest(coeffs):
+    """Largest absolute value in an int64 coefficient array."""
+    return int(np.abs(coeffs).max()) if len(coeffs) else 0
+
+class DensePoly:
+    """
+    A polynomial in one symbol; coeffs[k] is the coefficient of symbol**k.
+
+    Trailing zero coefficients are trimmed, so the zero polynomial has an
+    empty coefficient array.
+    """
+    __slots__ = ('symbol', 'coeffs')
+
+    def __init__(self, coeffs, symbol):
+        if not HAVE_NUMPY:
+            raise ImportError("DensePoly requires NumPy")
+        if not isinstance(coeffs, np.ndarray):
+            coeffs = coefficient_array(list(coeffs))
+        nonzero = np.flatnonzero(coeffs)
+        self.coeffs = coeffs[:nonzero[-1] + 1] if len(nonzero) else coeffs[:0]
+        self.symbol = symbol
+
+    @classmethod
+    def from_expr(cls, expr, symbol=None):
+        """
+        Convert a polynomial AST in at most one symbol to a DensePoly.
+        Raises ValueError if the expression is not such a polynomial.
+        """
+        symbols = free_symbols(expr)
+        if symbol is None:
+            if len(symbols) > 1:
+                raise ValueError(f"Not univariate: {expr}")
+            symbol = symbols[0] if symbols else Symbol('x')
+        elif symbols and symbols != (symbol,):
+            raise ValueError(f"Not a polynomial in {symbol}: {expr}")
+        return cls.from_sparse(SparsePoly.from_expr(expr, (symbol,)))
+
+    @classmethod
+    def from_string(cls, text, symbol=None):
+        """Parse `text` and convert the result."""
+        from parser import parse_expression
+        return cls.from_expr(parse_expression(text), symbol)
+
+    @classmethod
+    def from_sparse(cls, poly):
+        """Convert a univariate SparsePoly."""
+        if len(poly.symbols) != 1:
+            raise ValueError("Not a univariate polynomial")
+        coeffs = [0] * (poly.degree() + 1)
+        for (exp,), coeff in poly.terms.items():
+            coeffs[exp] = coeff
+        return cls(coeffs, poly.symbols[0])
+
+    def to_sparse(self):
+        return SparsePoly({(k,): c for k, c in enumerate(self.coeffs.tolist())},
+                          (self.symbol,))
+
+    def to_expr(self):
+        """Convert back to a canonical AST, with plain Python coefficients."""
+        return terms_to_expr(self.coeffs.tolist(), self.symbol)
+
+    def degree(self):
+        """Degree (-1 for the zero polynomial)."""
+        return len(self.coeffs) - 1
+
+    def _coerce(self, other):
+        if isinstance(other, DensePoly):
+            if other.symbol is not self.symbol and other.degree() > 0 and self.degree() > 0:
+                raise ValueError("Polynomials in different symbols")
+            return other
+        if isinstance(other, (int, float)):
+            return DensePoly([other], self.symbol)
+        return None
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b = self.coeffs, other.coeffs
+        if len(a) < len(b):
+            a, b = b, a
+        if a.dtype == np.int64 and b.dtype == np.int64 and \
+                largest(a) + largest(b) > INT64_MAX:
+            a, b = a.astype(object), b.astype(object)
+        result = a.astype(np.result_type(a, b), copy=True)
+        result[:len(b)] += b
+        return DensePoly(result, self.symbol if self.degree() > 0 else other.symbol)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return DensePoly(-self.coeffs, self.symbol)
+
+    def __sub__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self + (-other)
+
+    def __mul__(self, other):
+        """Multiply by convolving the coefficient arrays."""
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b = self.coeffs, other.coeffs
+        symbol = self.symbol if self.degree() > 0 else other.symbol
+        if not len(a) or not len(b):
+            return DensePoly(a[:0], symbol)
+        if a.dtype == np.int64 and b.dtype == np.int64:
+            # Keep int64 only while no product coefficient can overflow
+            if largest(a) * largest(b) * min(len(a), len(b)) > INT64_MAX:
+                a, b = a.astype(object), b.astype(object)
+        return DensePoly(np.convolve(a, b), symbol)
+
+    __rmul__ = __mul__
+
+    def __pow__(self, n):
+        if type(n) is not int or n < 0:
+            raise ValueError("Polynomial powers must be non-negative integers")
+        result = DensePoly([1], self.symbol)
+        base = self
+        # Binary exponentiation
+        while n:
+            if n & 1:
+                result = result * base
+            n >>= 1
+            if n:
+                base = base * base
+        return result
+
+    def __eq__(self, other):
+        if not isinstance(other, DensePoly):
+            return NotImplemented
+        return (self.symbol is other.symbol and len(self.coeffs) == len(other.coeffs)
+                and bool(np.all(self.coeffs == other.coeffs)))
+
+    def derivative(self):
+        """d/d(symbol), coefficient k * c_k moved down one place."""
+        coeffs = self.coeffs
+        if coeffs.dtype == np.int64 and largest(coeffs) * len(coeffs) > INT64_MAX:
+            coeffs = coeffs.astype(object)
+        coeffs = coeffs[1:] * np.arange(1, len(coeffs)).astype(coeffs.dtype)
+        return DensePoly(coeffs, self.symbol)
+
+    def evaluate(self, values):
+        """
+        Evaluate at a scalar or an array of points with Horner's rule.
+        Each step is one multiply and one add over the whole array.
+        """
+        points = np.asarray(values)
+        coeffs = self.coeffs
+        dtype = np.result_type(points, coeffs)
+        if dtype.kind in 'iu' and points.size and len(coeffs):
+            # Integer points stay in integer arithmetic only while no partial
+            # Horner sum can overflow, like products in __mul__
+            point = max(1, -int(points.min()), int(points.max()))
+            if largest(coeffs) * len(coeffs) * point ** (len(coeffs) - 1) > INT64_MAX:
+                points, coeffs, dtype = points.astype(object), coeffs.astype(object), object
+        result = np.zeros(points.shape, dtype=dtype)
+        for coeff in coeffs[::-1]:
+            result *= points
+            result += coeff
+        return result if result.ndim else result[()]
+
+    __call__ = evaluate
+
+    def __repr__(self):
+        return f"DensePoly({self.coeffs.tolist()!r}, {self.symbol.name})"
+
+def terms_to_expr(coeffs, symbol):
+    """Build the canonical AST for coefficients listed by degree."""
+    terms = []
+    for exp, coeff in enumerate(coeffs):
+        if not coeff:
+            continue
+        power = symbol if exp == 1 else Pow(symbol, Number(exp))
+        if exp == 0:
+            terms.append(Number(coeff))
+        elif coeff == 1:
+            terms.append(power)
+        else:
+            terms.append(Mul(Number(coeff), power))
+    return Add(*terms)
+
+def simplify_univariate(expr):
+    """
+    Simplify a sum of integer monomials in one symbol by accumulating the
+    coefficients into a dense array. Returns None if more than one symbol
+    appears, a coefficient does not fit in int64, or the degree is too large
+    for the number of terms (see DENSE_SLOTS_PER_TERM).
+    """
+    symbol = None
+    degrees = []
+    coeffs = []
+    for term in expr.args:
+        degree = 0
+        coeff = 1
+        for factor in (term.args if isinstance(term, Mul) else (term,)):
+            if isinstance(factor, Number):
+                coeff = coeff * factor.value
+                continue
+            base, exp = (factor.base, factor.exp.value) if isinstance(factor, Pow) else (factor, 1)
+            if base is not symbol:
+                if symbol is not None:
+                    return None
+                symbol = base
+            degree += exp
+        degrees.append(degree)
+        coeffs.append(coeff)
+    if symbol is None or sum(abs(c) for c in coeffs) > INT64_MAX:
+        return None
+    size = max(degrees) + 1
+    if size > DENSE_SLOTS_PER_TERM * len(degrees) or size > DENSE_MAX_DEGREE:
+        return None
+    result = np.zeros(size, dtype=np.int64)
+    np.add.at(result, degrees, coeffs)
+    return terms_to_expr(result.tolist(), symbol)
+
+# Example usage and testing
+if __name__ == "__main__":
+    p = DensePoly.from_string("x^2 - 3*x + 2")
+    print(p)
+    print((p * p).to_expr())
+    print(p.derivative().to_expr())
+    print(p.evaluate(np.arange(5)))
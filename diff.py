@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Differentiation Engine for MiniSym - Phase 5
+Symbolic derivatives with the power, product and chain rules.
+"""
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from simplify import simplify, build
+
+ZERO = Number(0)
+ONE = Number(1)
+
+def diff(expr, sym):
+    """
+    Differentiate `expr` with respect to the Symbol `sym`.
+
+    Rules implemented:
+    - Constant rule (d/dx c → 0) and d/dx x → 1
+    - Sum rule, term by term
+    - Product rule over n-ary products
+    - Power rule with the chain rule (d/dx u^n → n * u^(n-1) * du/dx)
+
+    The expression is simplified first, then walked post-order over its DAG
+    with an explicit stack: each unique subexpression is differentiated
+    once, however often it is shared, and derivatives are built from the
+    original (shared) operands and simplified node by node. Nested products
+    therefore do not swell exponentially.
+
+    Raises ValueError for a power whose exponent depends on `sym`, since
+    its derivative needs a logarithm, which MiniSym cannot represent.
+    """
+    expr = simplify(expr)
+    derivatives = {}
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in derivatives:
+            stack.pop()
+            continue
+        rule = RULES.get(type(node))
+        if rule is None:
+            raise ValueError(f"Cannot differentiate {type(node).__name__}")
+        pending = [arg for arg in node.args if arg not in derivatives]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        derivatives[node] = rule(node, sym, derivatives)
+    return derivatives[expr]
+
+def diff_number(expr, sym, derivatives):
+    return ZERO
+
+def diff_symbol(expr, sym, derivatives):
+    return ONE if expr is sym else ZERO
+
+def diff_add(expr, sym, derivatives):
+    """Sum rule: d(a + b) = da + db."""
+    return build(Add, *[derivatives[arg] for arg in expr.args])
+
+def diff_mul(expr, sym, derivatives):
+    """Product rule: d(a*b*c) = da*b*c + a*db*c + a*b*dc."""
+    args = expr.args
+    terms = []
+    for i, arg in enumerate(args):
+        derivative = derivatives[arg]
+        if derivative is ZERO:
+            continue
+        terms.append(build(Mul, derivative, *args[:i], *args[i + 1:]))
+    return build(Add, *terms)
+
+def diff_pow(expr, sym, derivatives):
+    """Power and chain rules: d(u^n) = n * u^(n-1) * du."""
+    base, exp = expr.args
+    if derivatives[exp] is not ZERO:
+        raise ValueError(f"Cannot differentiate {expr}: the exponent depends on {sym}")
+    derivative = derivatives[base]
+    if derivative is ZERO:
+        return ZERO
+    power = build(Pow, base, build(Add, exp, Number(-1)))
+    return build(Mul, exp, power, derivative)
+
+# Derivative rule for each node type, applied bottom-up by diff()
+RULES = {
+    Number: diff_number,
+    Symbol: diff_symbol,
+    Add: diff_add,
+    Mul: diff_mul,
+    Pow: diff_pow,
+}
+
+def gradient(expr, symbols, point=None):
+    """
+    Partial derivatives of `expr` with respect to each Symbol in `symbols`.
+
+    Unlike calling diff() once per symbol, this makes one reverse-mode
+    sweep over the expression DAG: every unique node receives the
+    derivative of `expr` with respect to itself (its adjoint) from its
+    parents, and passes it on to those of its operands that depend on any
+    of `symbols`. Partials are built from the shared operands, so they share
+    subexpressions with `expr` and with each other.
+
+    Returns a list in the order of `symbols`. With `point`, a dict mapping
+    every Symbol in `expr` to a number, the partials are evaluated at that
+    point instead and returned as numbers, without building expressions.
+
+    Raises ValueError for a power whose exponent depends on any of `symbols`.
+    """
+    expr = simplify(expr)
+    order, active = dependencies(expr, set(symbols))
+    if point is None:
+        adjoints = symbolic_adjoints(order, active, symbols)
+        zero = ZERO
+    else:
+        adjoints = numeric_adjoints(order, active, symbols, point)
+        zero = 0
+    return [adjoints.get(sym, zero) for sym in symbols]
+
+def dependencies(expr, symbols):
+    """
+    Unique nodes of `expr` in post-order, and the set of those that depend
+    on any Symbol in `symbols`.
+    """
+    order = []
+    active = set()
+    seen = set()
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in seen:
+            stack.pop()
+            continue
+        if type(node) not in RULES:
+            raise ValueError(f"Cannot differentiate {type(node).__name__}")
+        pending = [arg for arg in node.args if arg not in seen]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        seen.add(node)
+        order.append(node)
+        if node in symbols or any(arg in active for arg in node.args):
+            active.add(node)
+    for node in active:
+        if type(node) is Pow and node.exp in active:
+            raise ValueError(f"Cannot differentiate {node}: the exponent depends on "
+                             f"the variables")
+    return order, active
+
+def symbolic_adjoints(order, active, symbols):
+    """Adjoint expressions of `symbols`, by a reverse sweep over `order`."""
+    wanted = set(symbols)
+    adjoints = {}
+    # Contributions of the parents seen so far to each node's adjoint
+    parts = {order[-1]: [ONE]}
+    for node in reversed(order):
+        if node not in active or node not in parts:
+            continue
+        terms = parts.pop(node)
+        adjoint = terms[0] if len(terms) == 1 else build(Add, *terms)
+        if node in wanted:
+            adjoints[node] = adjoint
+        args = node.args
+        if type(node) is Add:
+            for arg in args:
+                if arg in active:
+                    parts.setdefault(arg, []).append(adjoint)
+        elif type(node) is Mul:
+            for i, arg in enumerate(args):
+                if arg in active:
+                    term = build(Mul, adjoint, *args[:i], *args[i + 1:])
+                    parts.setdefault(arg, []).append(term)
+        elif type(node) is Pow:
+            base, exp = args
+            power = build(Pow, base, build(Add, exp, Number(-1)))
+            parts.setdefault(base, []).append(build(Mul, adjoint, exp, power))
+    return adjoints
+
+def numeric_adjoints(order, active, symbols, point):
+    """Adjoint values of `symbols` at `point`, by a reverse sweep over `order`."""
+    values = {}
+    for node in order:
+        kind = type(node)
+        if kind is Number:
+            value = node.value
+        elif kind is Symbol:
+            if node not in point:
+                raise ValueError(f"No value given for {node}")
+            value = point[node]
+        elif kind is Add:
+            value = sum([values[arg] for arg in node.args])
+        elif kind is Mul:
+            value = 1
+            for arg in node.args:
+                value *= values[arg]
+        else:
+            value = values[node.base] ** values[node.exp]
+        values[node] = value
+
+    adjoints = {order[-1]: 1}
+    for node in reversed(order):
+        if node not in active or node not in adjoints:
+            continue
+        adjoint = adjoints[node]
+        args = node.args
+        if type(node) is Add:
+            for arg in args:
+                if arg in active:
+                    adjoints[arg] = adjoints.get(arg, 0) + adjoint
+        elif type(node) is Mul:
+            # Product of the other factors without dividing, via the
+            # running product of the factors before each one
+            factors = [values[arg] for arg in args]
+            prefix = [1]
+            for value in factors[:-1]:
+                prefix.append(prefix[-1] * value)
+            suffix = adjoint
+            for i in range(len(args) - 1, -1, -1):
+                arg = args[i]
+                if arg in active:
+                    adjoints[arg] = adjoints.get(arg, 0) + suffix * prefix[i]
+                suffix *= factors[i]
+        elif type(node) is Pow:
+            base, exp = args
+            n = values[exp]
+            partial = adjoint * n * values[base] ** (n - 1)
+            adjoints[base] = adjoints.get(base, 0) + partial
+    wanted = set(symbols)
+    return {sym: value for sym, value in adjoints.items() if sym in wanted}
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    x = Symbol('x')
+    test_cases = [
+        "5",
+        "x",
+        "y",
+        "3*x^2 + 2*x + 1",
+        "x * y",
+        "x^3 * y^2",
+        "(x^2 + 1)^3",
+        "x^-1",
+        "(2*x + 1) * (x - 1)",
+    ]
+
+    print("Testing Differentiation Engine...\n")
+
+    for input_expr in test_cases:
+        try:
+            print(f"d/dx '{input_expr}' → {diff(parse_expression(input_expr), x)}")
+        except Exception as e:
+            print(f"d/dx '{input_expr}' → ERROR: {e}")
+
+    print("\nDifferentiation testing complete!")
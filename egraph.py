@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Equality saturation for MiniSym
+An e-graph records every rewrite as an equality instead of replacing the
+expression, and the cheapest equivalent form is extracted at the end. An
+opt-in alternative to the greedy simplify(), whose result depends on the
+order in which its rules fire.
+"""
+
+import time
+from collections import Counter
+from math import comb
+
+from minisym_ast import Add, Mul, Pow
+from simplify import simplify, apply_rules
+from expand import expand
+from factor import factor
+from poly import is_exponent
+
+# Budgets: saturation stops when the graph holds NODE_LIMIT e-nodes, after
+# TIME_LIMIT seconds, or after ITERATION_LIMIT rounds of rewriting
+NODE_LIMIT = 10000
+TIME_LIMIT = 1.0
+ITERATION_LIMIT = 16
+
+# expand() is only tried where the expansion has at most this many terms
+EXPAND_TERM_LIMIT = 1000
+
+# Per-operation weights of evaluation_cost()
+OPERATION_COSTS = {Add: 1, Mul: 1, Pow: 4}
+
+def node_count(enode, child_costs):
+    """Cost of a tree: its number of nodes."""
+    return 1 + sum(child_costs)
+
+def evaluation_cost(enode, child_costs):
+    """Cost of evaluating a tree: one per addition or multiplication, more for a power."""
+    if type(enode) is not tuple:
+        return 0
+    cls, children = enode
+    return OPERATION_COSTS[cls] * max(1, len(children) - 1) + sum(child_costs)
+
+def tree_cost(expr, cost):
+    """`cost` of `expr` counted as a tree, as extraction counts it."""
+    costs = {}
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in costs:
+            stack.pop()
+            continue
+        pending = [arg for arg in node.args if arg not in costs]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        if node.args:
+            costs[node] = cost((type(node), node.args), [costs[arg] for arg in node.args])
+        else:
+            costs[node] = cost(node, ())
+    return costs[expr]
+
+def expanded_terms(expr):
+    """An upper bound on the number of terms of expand(expr)."""
+    terms = {}
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in terms:
+            stack.pop()
+            continue
+        pending = [arg for arg in node.args if arg not in terms]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        kind = type(node)
+        if kind is Add:
+            count = sum([terms[arg] for arg in node.args])
+        elif kind is Mul:
+            count = 1
+            for arg in node.args:
+                count *= terms[arg]
+        elif kind is Pow and is_exponent(node.exp):
+            # Monomials of degree n in the base's terms
+            count = comb(terms[node.base] + node.exp.value - 1, node.exp.value)
+        else:
+            count = 1
+        terms[node] = min(count, EXPAND_TERM_LIMIT + 1)
+    return terms[expr]
+
+def expand_sums(term):
+    """expand(term), unless the expansion would be too large."""
+    if expanded_terms(term) > EXPAND_TERM_LIMIT:
+        return None
+    return expand(term)
+
+# What saturation applies to every e-node: functions from an expression to
+# an equal one (or None). The simplify() rules, user rules included, and
+# the two Phase 4 rewrites that move away from a local minimum.
+REWRITES = (apply_rules, expand_sums, factor)
+
+class EClass:
+    """The e-nodes of one equivalence class, and the e-nodes using it."""
+    __slots__ = ('nodes', 'parents')
+
+    def __init__(self, enode):
+        self.nodes = [enode]
+        self.parents = []       # (e-node, class id) pairs
+
+class EGraph:
+    """
+    Equivalence classes of expressions, sharing structure.
+
+    An e-node is a Number or Symbol, or a (class, child class ids) tuple
+    whose ids are canonical (union-find roots, sorted for sums and
+    products). Each e-node is stored once (hash-consing) and belongs to
+    one class. union() merges two classes; rebuild() then restores
+    congruence, merging classes whose e-nodes became equal (so that
+    x = y makes x^2 = y^2), as in egg's deferred rebuilding.
+    """
+
+    def __init__(self):
+        self.parent = []        # union-find over class ids
+        self.classes = {}       # root id -> EClass
+        self.memo = {}          # canonical e-node -> class id
+        self.pending = []       # merged classes whose parents need repair
+
+    def __len__(self):
+        """Number of e-nodes."""
+        return len(self.memo)
+
+    def find(self, cid):
+        parent = self.parent
+        root = cid
+        while parent[root] != root:
+            root = parent[root]
+        while parent[cid] != root:
+            parent[cid], cid = root, parent[cid]
+        return root
+
+    def canonicalize(self, enode):
+        if type(enode) is not tuple:
+            return enode
+        cls, children = enode
+        children = [self.find(child) for child in children]
+        if cls is not Pow:
+            children.sort()
+        return (cls, tuple(children))
+
+    def add_node(self, enode):
+        """The class of `enode`, adding it in a class of its own if new."""
+        enode = self.canonicalize(enode)
+        cid = self.memo.get(enode)
+        if cid is not None:
+            return self.find(cid)
+        cid = len(self.parent)
+        self.parent.append(cid)
+        self.classes[cid] = EClass(enode)
+        if type(enode) is tuple:
+            for child in set(enode[1]):
+                self.classes[child].parents.append((enode, cid))
+        self.memo[enode] = cid
+        return cid
+
+    def add(self, expr):
+        """The class of `expr`, adding its nodes as needed."""
+        ids = {}
+        stack = [expr]
+        while stack:
+            node = stack[-1]
+            if node in ids:
+                stack.pop()
+                continue
+            pending = [arg for arg in node.args if arg not in ids]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            if node.args:
+                ids[node] = self.add_node((type(node), tuple([ids[arg] for arg in node.args])))
+            else:
+                ids[node] = self.add_node(node)
+        return ids[expr]
+
+    def union(self, a, b):
+        """Merge the classes of `a` and `b`; False if they were the same."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        first, second = self.classes[a], self.classes[b]
+        if len(first.parents) < len(second.parents):
+            a, b, first, second = b, a, second, first
+        self.parent[b] = a
+        first.nodes.extend(second.nodes)
+        first.parents.extend(second.parents)
+        del self.classes[b]
+        self.pending.append(a)
+        return True
+
+    def rebuild(self):
+        """Restore congruence and canonical e-nodes after unions."""
+        while self.pending:
+            todo = {self.find(cid) for cid in self.pending}
+            self.pending = []
+            for cid in todo:
+                self.repair(self.find(cid))
+        for eclass in self.classes.values():
+            eclass.nodes = list(dict.fromkeys(map(self.canonicalize, eclass.nodes)))
+
+    def repair(self, cid):
+        eclass = self.classes[cid]
+        for enode, parent in eclass.parents:
+            self.memo.pop(enode, None)
+            self.memo[self.canonicalize(enode)] = self.find(parent)
+        parents = {}
+        for enode, parent in eclass.parents:
+            enode = self.canonicalize(enode)
+            other = parents.get(enode)
+            if other is not None:
+                # Two parents became the same e-node: their classes are equal
+                self.union(other, parent)
+            parents[enode] = self.find(parent)
+        eclass.parents = list(parents.items())
+
+    def best_nodes(self, cost):
+        """The cheapest e-node of every class under `cost`, with its cost."""
+        best = {}
+        changed = True
+        while changed:
+            changed = False
+            for cid, eclass in self.classes.items():
+                current = best.get(cid)
+                for enode in eclass.nodes:
+                    if type(enode) is tuple:
+                        child_costs = [best.get(child) for child in enode[1]]
+                        if None in child_costs:
+                            continue
+                        total = cost(enode, [entry[0] for entry in child_costs])
+                    else:
+                        total = cost(enode, ())
+                    if current is None or total < current[0]:
+                        current = best[cid] = (total, enode)
+                        changed = True
+        return best
+
+    def term(self, cid, best, terms):
+        """The expression `best` picks for class `cid`, memoized in `terms`."""
+        stack = [cid]
+        while stack:
+            top = stack[-1]
+            if top in terms:
+                stack.pop()
+                continue
+            enode = best[top][1]
+            if type(enode) is not tuple:
+                terms[top] = enode
+                stack.pop()
+                continue
+            pending = [child for child in enode[1] if child not in terms]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            terms[top] = enode[0](*[terms[child] for child in enode[1]])
+        return terms[cid]
+
+    def extract(self, cid, cost=node_count):
+        """The cheapest expression in the class of `cid` under `cost`."""
+        self.rebuild()
+        return self.term(self.find(cid), self.best_nodes(cost), {})
+
+class EGraphSimplifier:
+    """
+    Simplifies by equality saturation.
+
+    Each round builds, for every e-node, the expression made of its
+    children's cheapest forms, and applies each rewrite to it; results are
+    added to the graph and merged with the e-node's class, so no form is
+    ever lost. Rounds continue until nothing new is found or a budget runs
+    out: `node_limit` e-nodes, `time_limit` seconds (checked between
+    rewrites) or `iteration_limit` rounds. The cheapest form under `cost`
+    is then extracted; it is never costlier than simplify()'s result,
+    which is returned on ties.
+
+    After run(), `iterations` is the number of rounds, `stop_reason` one of
+    'saturated', 'node_limit', 'time_limit' or 'iteration_limit', `hits`
+    counts the rewrites (by name) that merged classes, and `graph` is the
+    e-graph.
+    """
+
+    def __init__(self, cost=node_count, node_limit=NODE_LIMIT, time_limit=TIME_LIMIT,
+                 iteration_limit=ITERATION_LIMIT, rewrites=REWRITES):
+        self.cost = cost
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.iteration_limit = iteration_limit
+        self.rewrites = rewrites
+        self.graph = None
+        self.iterations = 0
+        self.stop_reason = None
+        self.hits = Counter()
+
+    def run(self, expr):
+        greedy = simplify(expr)
+        self.graph = graph = EGraph()
+        self.iterations = 0
+        self.hits = Counter()
+        root = graph.add(expr)
+        graph.union(root, graph.add(greedy))
+        self.stop_reason = self.saturate(time.perf_counter() + self.time_limit)
+        result = graph.extract(root, self.cost)
+        # Extraction breaks ties arbitrarily, and its pick may still hold
+        # unsimplified parts of equal cost
+        best = greedy
+        best_cost = tree_cost(greedy, self.cost)
+        for candidate in (simplify(result), result):
+            candidate_cost = tree_cost(candidate, self.cost)
+            if candidate_cost < best_cost:
+                best, best_cost = candidate, candidate_cost
+        return best
+
+    def saturate(self, deadline):
+        graph = self.graph
+        tried = set()
+        while self.iterations < self.iteration_limit:
+            graph.rebuild()
+            best = graph.best_nodes(self.cost)
+            terms = {}
+            found = []
+            reason = None
+            for cid in list(graph.classes):
+                for enode in graph.classes[cid].nodes:
+                    if type(enode) is not tuple:
+                        continue
+                    term = enode[0](*[graph.term(child, best, terms) for child in enode[1]])
+                    for rewrite in self.rewrites:
+                        if (term, rewrite) in tried:
+                            continue
+                        if len(graph) >= self.node_limit:
+                            reason = 'node_limit'
+                        elif time.perf_counter() >= deadline:
+                            reason = 'time_limit'
+                        if reason:
+                            break
+                        tried.add((term, rewrite))
+                        try:
+                            result = rewrite(term)
+                        except ArithmeticError:
+                            # Such as 0^-1 appearing in a rewritten form
+                            continue
+                        if result is not None and result is not term:
+                            found.append((cid, graph.add(result), rewrite.__name__))
+                    if reason:
+                        break
+                if reason:
+                    break
+            # Everything found is a valid equality, even in a cut-short round
+            changed = False
+            for cid, new, name in found:
+                if graph.union(cid, new):
+                    self.hits[name] += 1
+                    changed = True
+            graph.rebuild()
+            self.iterations += 1
+            if reason:
+                return reason
+            if not changed:
+                return 'saturated'
+        return 'iteration_limit'
+
+def simplify_egraph(expr, cost=node_count, node_limit=NODE_LIMIT, time_limit=TIME_LIMIT,
+                    iteration_limit=ITERATION_LIMIT):
+    """Simplify `expr` by equality saturation; see EGraphSimplifier."""
+    return EGraphSimplifier(cost, node_limit, time_limit, iteration_limit).run(expr)
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    simplifier = EGraphSimplifier()
+    for text in ["(x + 1)^2 - x^2 - 2*x", "x*y + x*z", "(x + y)*(x - y) + y^2", "2*x + 3*x"]:
+        expr = parse_expression(text)
+        result = simplifier.run(expr)
+        print(f"'{text}' → {result}  (greedy: {simplify(expr)}; "
+              f"{simplifier.iterations} rounds, {simplifier.stop_reason}, "
+              f"{len(simplifier.graph)} e-nodes, hits {dict(simplifier.hits)})")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Expansion Engine for MiniSym - Phase 4
+Multiplies out products and integer powers of sums.
+"""
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from poly import SparsePoly, is_exponent
+from simplify import simplify
+
+def expand(expr):
+    """
+    Expand an expression into a collected, canonical sum of products.
+
+    Products and non-negative integer powers of sums are multiplied out as
+    sparse polynomials (see poly.py): each product is accumulated in a hash
+    table keyed on exponent tuples, or packed into big integers and
+    multiplied at once when the coefficients are integers, rather than
+    distributed term by term and re-simplified. Powers use repeated squaring,
+    so (x + y + z + 1)**20 takes a handful of products.
+
+    Any other power, such as 1/(x + 1) or x**y, is kept as a unit and treated
+    like a symbol; its base and exponent are expanded first. The walk uses
+    explicit stacks, so nesting depth is unlimited.
+    """
+    # Expanded form of every expression finished so far
+    expanded = {}
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in expanded:
+            stack.pop()
+            continue
+        atoms, symbols = generators(node)
+        # Expand inside each non-polynomial power before expanding around it
+        pending = [part for atom in atoms for part in atom.args
+                   if part not in expanded]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        expanded[node] = expand_polynomial(node, atoms, symbols, expanded)
+    return expanded[expr]
+
+def generators(expr):
+    """
+    Split the leaves of `expr` seen through sums, products and polynomial
+    powers into (non-polynomial powers, symbols).
+    """
+    atoms = set()
+    symbols = set()
+    seen = set()
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        if isinstance(node, Symbol):
+            symbols.add(node)
+        elif isinstance(node, Pow):
+            if is_exponent(node.exp):
+                stack.append(node.base)
+            else:
+                atoms.add(node)
+        elif isinstance(node, (Add, Mul)):
+            stack.extend(node.args)
+        elif not isinstance(node, Number):
+            # Unknown node types are kept as they are
+            atoms.add(node)
+    return atoms, symbols
+
+def expand_polynomial(expr, atoms, symbols, expanded):
+    """Expand `expr` as a polynomial in its symbols and (already expanded) atoms."""
+    order = sorted(atoms | symbols, key=lambda node: node._key)
+    poly = SparsePoly.from_expr(expr, order)
+    if not atoms:
+        return poly.to_expr()
+    # Put the expanded atoms in place of the originals. Merging powers of
+    # equal bases (x * x**-1 → 1) is left to simplify().
+    replaced = {node: expand_atom(node, expanded) for node in atoms}
+    poly.symbols = tuple(replaced.get(node, node) for node in order)
+    result = simplify(poly.to_expr())
+    # An exponent that simplified to a non-negative integer, as in
+    # (x + 1)^(1 + 1), leaves a polynomial power to multiply out
+    if any(isinstance(atom, Pow) and is_exponent(atom.exp) for atom in replaced.values()):
+        return expand(result)
+    return result
+
+def expand_atom(atom, expanded):
+    if isinstance(atom, Pow):
+        return simplify(Pow(expanded[atom.base], expanded[atom.exp]))
+    return atom
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    test_cases = [
+        "(x + 1) * (x + 2)",
+        "(x + y)^2",
+        "(a - b) * (a + b)",
+        "2 * (x + 3) - 2*x",
+        "(x + 1)^3",
+        "x * (x^-1 + 1)",
+        "(x * (y + 1))^-1",
+    ]
+
+    print("Testing Expansion Engine...\n")
+
+    for input_expr in test_cases:
+        try:
+            print(f"'{input_expr}' → {expand(parse_expression(input_expr))}")
+        except Exception as e:
+            print(f"'{input_expr}' → ERROR: {e}")
+
+    print("\nExpansion testing complete!")
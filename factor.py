@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Factoring Engine for MiniSym - Phase 4
+Pulls out greatest common factors and splits differences of squares.
+"""
+
+from math import gcd, isqrt
+
+from minisym_ast import Number, Add, Mul, Pow
+from simplify import simplify
+
+def factor(expr):
+    """
+    Factor a simplified expression.
+
+    Rules implemented:
+    - Greatest common factor: integer content and common monomial
+      (6*x^2*y + 9*x*y^2 → 3*x*y*(2*x + 3*y))
+    - Difference of squares, repeatedly (x^4 - y^4 → (x^2 + y^2)(x + y)(x - y))
+
+    A sum at the top level is factored, or each sum in a product. The GCF
+    is found in one pass over the terms, and square roots of terms are
+    looked up in a dict keyed on the (interned) term instead of comparing
+    terms pairwise.
+    """
+    expr = simplify(expr)
+    if isinstance(expr, Add):
+        return Mul(*factor_sum(expr, {}))
+    if isinstance(expr, Mul) and any(isinstance(arg, Add) for arg in expr.args):
+        roots = {}
+        factors = []
+        for arg in expr.args:
+            factors.extend(factor_sum(arg, roots) if isinstance(arg, Add) else [arg])
+        return simplify(Mul(*factors))
+    return expr
+
+def factor_sum(expr, roots):
+    """Factor a simplified Add into a list of factors."""
+    content, common, cofactor = common_factor(expr)
+    factors = [] if content == 1 else [Number(content)]
+    factors.extend(power(base, exp) for base, exp in common.items())
+    # Split differences of squares until none are left
+    pending = [cofactor]
+    while pending:
+        item = pending.pop()
+        split = difference_of_squares(item, roots)
+        if split is None:
+            factors.append(item)
+        else:
+            pending.extend(split)
+    return factors
+
+def split_term(term):
+    """Split a term into (coefficient, {base: integer exponent})."""
+    coeff = 1
+    powers = {}
+    for factor in (term.args if isinstance(term, Mul) else (term,)):
+        if isinstance(factor, Number):
+            coeff = coeff * factor.value
+            continue
+        if isinstance(factor, Pow) and isinstance(factor.exp, Number) \
+                and type(factor.exp.value) is int:
+            base, exp = factor.base, factor.exp.value
+        else:
+            base, exp = factor, 1
+        powers[base] = powers.get(base, 0) + exp
+    return coeff, powers
+
+def power(base, exp):
+    return base if exp == 1 else Pow(base, Number(exp))
+
+def build_term(coeff, powers):
+    """Inverse of split_term, dropping zero exponents and a unit coefficient."""
+    factors = [power(base, exp) for base, exp in powers.items() if exp]
+    if coeff != 1 or not factors:
+        factors.append(Number(coeff))
+    return Mul(*factors)
+
+def common_factor(expr):
+    """
+    Find the greatest common factor of the terms of an Add in one pass.
+    Returns (integer content, {base: exponent} of the common monomial,
+    cofactor). Content is negative when every coefficient is, and 1 when a
+    coefficient is not an integer.
+    """
+    content = 0
+    integral = True
+    negative = True
+    common = None
+    terms = []
+    for term in expr.args:
+        coeff, powers = split_term(term)
+        terms.append((coeff, powers))
+        if integral and type(coeff) is int:
+            content = gcd(content, coeff)
+        else:
+            integral = False
+        negative = negative and isinstance(coeff, (int, float)) and coeff < 0
+        # Keep the smallest positive exponent of each base seen in every term
+        if common is None:
+            common = {base: exp for base, exp in powers.items() if exp > 0}
+        else:
+            for base in list(common):
+                exp = powers.get(base, 0)
+                if exp <= 0:
+                    del common[base]
+                elif exp < common[base]:
+                    common[base] = exp
+    if not integral:
+        content = 1
+    if negative:
+        content = -content
+
+    if content == 1 and not common:
+        return 1, {}, expr
+    cofactor = []
+    for coeff, powers in terms:
+        for base, exp in common.items():
+            powers[base] -= exp
+        cofactor.append(build_term(coeff // content if integral else coeff * content, powers))
+    return content, common, Add(*cofactor)
+
+def square_root(term, roots):
+    """The monomial whose square is `term`, or None; results are cached in `roots`."""
+    if term in roots:
+        return roots[term]
+    coeff, powers = split_term(term)
+    root = None
+    if type(coeff) is int and coeff > 0 and isqrt(coeff) ** 2 == coeff \
+            and all(exp % 2 == 0 for exp in powers.values()):
+        root = build_term(isqrt(coeff), {base: exp // 2 for base, exp in powers.items()})
+    roots[term] = root
+    return root
+
+def difference_of_squares(expr, roots):
+    """Split a^2 - b^2 into [a + b, a - b], or return None."""
+    if not isinstance(expr, Add) or len(expr.args) != 2:
+        return None
+    first, second = expr.args
+    positive, negative = (first, negate(second)) if is_negative(second) else \
+        (second, negate(first)) if is_negative(first) else (None, None)
+    if positive is None:
+        return None
+    a = square_root(positive, roots)
+    b = square_root(negative, roots)
+    if a is None or b is None:
+        return None
+    return [Add(a, b), Add(a, negate(b))]
+
+def is_negative(term):
+    coeff = term.args[0] if isinstance(term, Mul) else term
+    return isinstance(coeff, Number) and isinstance(coeff.value, (int, float)) \
+        and coeff.value < 0
+
+def negate(term):
+    coeff, powers = split_term(term)
+    return build_term(-coeff, powers)
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    test_cases = [
+        "6*x^2*y + 9*x*y^2",
+        "2*x + 4",
+        "-2*x - 4",
+        "x^2 - 1",
+        "4*x^2 - 9*y^2",
+        "x^4 - y^4",
+        "3*x^3 - 12*x",
+        "x^2 + 1",
+    ]
+
+    print("Testing Factoring Engine...\n")
+
+    for input_expr in test_cases:
+        try:
+            print(f"'{input_expr}' → {factor(parse_expression(input_expr))}")
+        except Exception as e:
+            print(f"'{input_expr}' → ERROR: {e}")
+
+    print("\nFactoring testing complete!")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Fixpoint simplification for MiniSym
+Applies simplification rules repeatedly until the expression stops
+changing, revisiting only the parts that changed.
+"""
+
+import weakref
+from collections import Counter
+
+import simplify
+from minisym_ast import Add
+from poly import is_monomial, simplify_polynomial
+from dense import HAVE_NUMPY, simplify_univariate
+from simplify import RULES, POLY_MIN_TERMS
+
+# Passes after which run() gives up and returns the latest expression
+MAX_ITERATIONS = 16
+
+class FixpointSimplifier:
+    """
+    Runs simplification passes until nothing changes.
+
+    A node is stable once its rule has returned it unchanged and all of its
+    operands are stable; stable nodes are remembered (weakly, across runs)
+    and never visited again. A pass therefore walks only the nodes that
+    are not yet known to be stable: after the first pass, those are the
+    nodes the previous pass created and their ancestors. When the root
+    comes out stable the expression is a fixpoint, which is established by
+    the pass itself without re-walking the tree.
+
+    `rules` maps node classes to rule functions, as simplify.RULES does
+    (the default). With the default rules, rules added with
+    simplify.register_rule() are applied after them too. After run(), `passes` and `visits` give the number of
+    passes and of rule applications, `hits` counts the applications of each
+    rule that changed a node, and `converged` is False if the iteration cap
+    was reached first.
+    """
+
+    def __init__(self, rules=None, max_iterations=MAX_ITERATIONS):
+        self.rules = RULES if rules is None else rules
+        self.user_rules = rules is None
+        # The polynomial path gives the same results as the default rules,
+        # so it stands in for them only while they are in use
+        self.polynomial = all(self.rules.get(cls) is rule for cls, rule in RULES.items())
+        self.max_iterations = max_iterations
+        self.stable = weakref.WeakSet()
+        # The user rules the stable nodes were checked against
+        self.checked_rules = (simplify.USER_RULES, len(simplify.USER_RULES))
+        self.hits = Counter()
+        self.passes = 0
+        self.visits = 0
+        self.converged = True
+
+    def run(self, expr):
+        """Simplify `expr` to a fixpoint of the rules, or until the cap."""
+        self.hits = Counter()
+        self.passes = 0
+        self.visits = 0
+        if self.user_rules:
+            rules = (simplify.USER_RULES, len(simplify.USER_RULES))
+            if rules != self.checked_rules:
+                # New user rules may apply to nodes found stable before
+                self.stable = weakref.WeakSet()
+                self.checked_rules = rules
+        while not self.is_stable(expr):
+            if self.passes == self.max_iterations:
+                self.converged = False
+                return expr
+            expr = self.simplify_pass(expr)
+            self.passes += 1
+        self.converged = True
+        return expr
+
+    def is_stable(self, node):
+        return type(node) not in self.rules or node in self.stable
+
+    def simplify_pass(self, expr):
+        """One bottom-up pass over the nodes of `expr` not known to be stable."""
+        memo = {}
+        results = []
+        polynomial = self.polynomial and not (self.user_rules and simplify.USER_RULES.rules)
+        # Each stack entry is a node still to visit, or a (node, arity) marker
+        # meaning all of its operands have been simplified onto `results`.
+        stack = [expr]
+        while stack:
+            item = stack.pop()
+            if type(item) is tuple:
+                node, arity = item
+                args = results[len(results) - arity:]
+                del results[len(results) - arity:]
+                result = self.apply(node, args)
+                memo[node] = result
+                results.append(result)
+            elif self.is_stable(item):
+                results.append(item)
+            elif item in memo:
+                results.append(memo[item])
+            elif (polynomial and type(item) is Add
+                    and len(item.args) >= POLY_MIN_TERMS
+                    and all(map(is_monomial, item.args))):
+                result = simplify_univariate(item) if HAVE_NUMPY else None
+                if result is None:
+                    result = simplify_polynomial(item)
+                self.visits += 1
+                if result is not item:
+                    self.hits['polynomial'] += 1
+                else:
+                    # Already a canonical polynomial, hence a fixpoint
+                    self.stable.add(item)
+                memo[item] = result
+                results.append(result)
+            else:
+                stack.append((item, len(item.args)))
+                stack.extend(reversed(item.args))
+        return results[0]
+
+    def apply(self, node, args):
+        """Rebuild `node` from simplified operands and apply its rule once."""
+        cls = type(node)
+        if all(new is old for new, old in zip(args, node.args)):
+            rebuilt = node
+        else:
+            rebuilt = cls(*args)
+            if type(rebuilt) is not cls:
+                # Collapsed to one operand, which this pass already handled
+                return rebuilt
+        rule = self.rules[cls]
+        result = rule(rebuilt)
+        self.visits += 1
+        if result is not rebuilt:
+            self.hits[rule.__name__] += 1
+        if self.user_rules and simplify.USER_RULES.rules and type(result) in self.rules:
+            rewritten = simplify.USER_RULES.rewrite(result)
+            # A rule giving back its input did not match
+            if rewritten is not None and rewritten is not result:
+                self.hits['user_rules'] += 1
+                return rewritten
+        if result is rebuilt and all(map(self.is_stable, rebuilt.args)):
+            self.stable.add(rebuilt)
+        return result
+
+def simplify_fixpoint(expr, max_iterations=MAX_ITERATIONS):
+    """Simplify `expr` until no rule changes it; see FixpointSimplifier."""
+    return FixpointSimplifier(max_iterations=max_iterations).run(expr)
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    simplifier = FixpointSimplifier()
+    for text in ["2*x + 3*x + x*x*x", "(x + 0)^1 * (y^0 + 1)", "x + y"]:
+        result = simplifier.run(parse_expression(text))
+        print(f"'{text}' → {result}  ({simplifier.passes} passes, "
+              f"{simplifier.visits} visits, hits {dict(simplifier.hits)})")
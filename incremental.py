@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Incremental simplification for MiniSym
+A handle on a simplified expression that takes localized edits and
+re-simplifies only the path from each edit to the root.
+"""
+
+from simplify import simplify_all
+
+class SimplifiedExpr:
+    """
+    An expression and its simplified form, kept up to date under edits.
+
+    The handle keeps the memo of its simplify_all() calls: the simplified
+    form of every composite node of `expr`. replace() rebuilds the nodes on
+    the path from the edited subtree to the root and re-simplifies with
+    that memo, so each untouched sibling is one lookup and only the new
+    subtree and the spine above it go through the rules. The work grows
+    with the depth of the edit (and the width of the nodes on the way),
+    not with the size of the expression. Memo entries of replaced nodes
+    are dropped once they outnumber the live ones.
+
+    Paths are sequences of operand indices into `args`, starting at the
+    root of `expr`. Sums and products keep their operands in canonical
+    order, so an edit may reorder the operands of the nodes on its path.
+
+    `updated` is the number of nodes the last update simplified. Results
+    reflect the rules in force when they were computed: call refresh()
+    after register_rule() or clear_user_rules().
+    """
+
+    def __init__(self, expr):
+        self.expr = expr
+        self.refresh()
+
+    def refresh(self):
+        """Simplify `expr` from scratch, dropping the memo."""
+        self.memo = {}
+        self.result = simplify_all([self.expr], self.memo)[0]
+        self.live = self.updated = len(self.memo)
+        return self.result
+
+    def subexpr(self, path):
+        """The subexpression of `expr` at `path`."""
+        return self.spine(path)[-1]
+
+    def spine(self, path):
+        """The nodes of `expr` from the root down to `path`."""
+        nodes = [self.expr]
+        for index in path:
+            node = nodes[-1]
+            if not 0 <= index < len(node.args):
+                raise IndexError(f"No operand {index} in {node}")
+            nodes.append(node.args[index])
+        return nodes
+
+    def replace(self, path, new):
+        """Put `new` in place of the subexpression at `path`; returns the new result."""
+        spine = self.spine(path)
+        for node, index in zip(reversed(spine[:-1]), reversed(path)):
+            args = list(node.args)
+            args[index] = new
+            new = type(node)(*args)
+        self.expr = new
+        before = len(self.memo)
+        self.result = simplify_all([new], self.memo)[0]
+        self.updated = len(self.memo) - before
+        if len(self.memo) > 2 * self.live:
+            self.compact()
+        return self.result
+
+    def compact(self):
+        """Drop the memo entries of nodes no longer in `expr`."""
+        memo = self.memo
+        kept = {}
+        stack = [self.expr]
+        while stack:
+            node = stack.pop()
+            if node in kept:
+                continue
+            result = memo.get(node)
+            if result is None:
+                # Leaves, and the terms of sums simplified as polynomials
+                continue
+            kept[node] = result
+            stack.extend(node.args)
+        self.memo = kept
+        self.live = len(kept)
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    handle = SimplifiedExpr(parse_expression("(x + x) * (y^1 + 0) + (z * 1 + 2*z)"))
+    print(f"{handle.expr} → {handle.result}  ({handle.updated} nodes simplified)")
+    for path, text in [((0, 0), "3*y"), ((1,), "w^0")]:
+        print(f"replace {handle.subexpr(path)} at {path} by {text}:")
+        handle.replace(path, parse_expression(text))
+        print(f"  {handle.expr} → {handle.result}  ({handle.updated} nodes simplified)")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Expression compiler for MiniSym.
+Turns expressions into plain Python functions of their symbols.
+"""
+
+import itertools
+import keyword
+import linecache
+import math
+import weakref
+
+from minisym_ast import Expr, Number, Symbol, Add, Mul, Pow
+from lrucache import LRUCache
+from poly import free_symbols
+
+# A subexpression nested this deep inside one generated Python expression is
+# assigned to a local variable instead, keeping every line well within the
+# nesting limits of Python's parser however deep the expression is.
+MAX_INLINE_DEPTH = 32
+
+# Compiled functions by (expressions, symbols); always on and bounded
+_lambdify_cache = LRUCache(1024)
+
+# Numbers the generated functions' pseudo-filenames, so no two share one
+_filenames = itertools.count()
+
+def lambdify(exprs, symbols=None):
+    """
+    Compile `exprs` into a Python function of `symbols`.
+
+    `exprs` is one expression, or a sequence of them for a function that
+    returns a tuple. `symbols` lists the positional arguments in order (as
+    Symbols or names) and defaults to every symbol in `exprs`, sorted by
+    name.
+
+    The function body is straight-line Python arithmetic, so each call costs
+    what the hand-written formula would. Subexpressions used more than once
+    are computed once into locals (common-subexpression elimination); the
+    rest is inlined. The generated source is kept in the function's `source`
+    attribute and shown in tracebacks.
+
+    Compiled functions are cached per (expressions, symbols), so compiling a
+    formula again only costs a lookup.
+    """
+    single = isinstance(exprs, Expr)
+    outputs = (exprs,) if single else tuple(exprs)
+    if symbols is None:
+        symbols = free_symbols(Add(*outputs)) if outputs else ()
+    symbols = tuple([Symbol(sym) if isinstance(sym, str) else sym for sym in symbols])
+    key = (exprs if single else outputs, symbols)
+    func = _lambdify_cache.get(key)
+    if func is None:
+        func = compile_function(lambda_source(key[0], symbols), symbols)
+        _lambdify_cache.put(key, func)
+    return func
+
+def lambdify_cache_info():
+    """Statistics of the lambdify() cache."""
+    return _lambdify_cache.cache_info()
+
+def clear_lambdify_cache():
+    """Drop all compiled functions from the lambdify() cache."""
+    _lambdify_cache.clear()
+
+def compile_function(source, symbols):
+    """Execute generated `source` and return the function it defines."""
+    filename = f"<lambdify {next(_filenames)}>"
+    # Registered so tracebacks through the function show the generated lines,
+    # for as long as the function lives
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    namespace = {}
+    exec(compile(source, filename, 'exec'), namespace)
+    func = namespace['_lambdified']
+    weakref.finalize(func, linecache.cache.pop, filename, None)
+    func.source = source
+    func.symbols = symbols
+    return func
+
+def lambda_source(exprs, symbols):
+    """
+    Python source defining `_lambdified(*symbols)`, which evaluates `exprs`
+    (one expression, or a sequence for a tuple result).
+    """
+    single = isinstance(exprs, Expr)
+    outputs = [exprs] if single else list(exprs)
+    arguments = argument_names(symbols)
+    order, uses = references(outputs)
+
+    text = dict(zip(symbols, arguments))
+    depth = {}
+    lines = [f"def _lambdified({', '.join(arguments)}):"]
+    for node in order:
+        kind = type(node)
+        if kind is Number:
+            text[node] = number_source(node.value)
+            depth[node] = 0
+            continue
+        if kind is Symbol:
+            if node not in text:
+                raise ValueError(f"{node} is not among the symbols {list(map(str, symbols))}")
+            depth[node] = 0
+            continue
+        args = [text[arg] for arg in node.args]
+        if kind is Add:
+            code = f"({' + '.join(args)})"
+        elif kind is Mul:
+            code = f"({' * '.join(args)})"
+        elif kind is Pow:
+            code = f"({args[0]} ** {args[1]})"
+        else:
+            raise ValueError(f"Cannot compile {kind.__name__}")
+        node_depth = 1 + max([depth[arg] for arg in node.args])
+        if uses[node] > 1 or node_depth >= MAX_INLINE_DEPTH:
+            local = f"_t{len(lines) - 1}"
+            lines.append(f"    {local} = {code}")
+            text[node] = local
+            node_depth = 0
+        else:
+            text[node] = code
+        depth[node] = node_depth
+
+    if single:
+        lines.append(f"    return {text[outputs[0]]}")
+    else:
+        lines.append(f"    return ({''.join([text[expr] + ', ' for expr in outputs])})")
+    return '\n'.join(lines) + '\n'
+
+def references(exprs):
+    """
+    Unique nodes of `exprs` in post-order (operands before the nodes that
+    use them), and how many times each is used: once per parent that has it
+    as an operand, plus once per appearance in `exprs`.
+    """
+    uses = {}
+    order = []
+    for expr in exprs:
+        uses[expr] = uses.get(expr, 0) + 1
+    # A node's operands are counted once, when the node is first finished
+    done = set()
+    stack = list(reversed(exprs))
+    while stack:
+        node = stack[-1]
+        if node in done:
+            stack.pop()
+            continue
+        pending = [arg for arg in node.args if arg not in done]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        done.add(node)
+        order.append(node)
+        for arg in node.args:
+            uses[arg] = uses.get(arg, 0) + 1
+    return order, uses
+
+def argument_names(symbols):
+    """Parameter names for `symbols`: their own names where those are usable."""
+    if len(set(symbols)) != len(symbols):
+        raise ValueError("Repeated symbol in the arguments")
+    names = []
+    for i, sym in enumerate(symbols):
+        if type(sym) is not Symbol:
+            raise TypeError(f"Arguments must be Symbols, got {sym!r}")
+        name = sym.name
+        # Leading underscores are reserved for generated locals
+        if not name.isidentifier() or keyword.iskeyword(name) or name.startswith('_'):
+            name = f"_a{i}"
+        names.append(name)
+    return names
+
+def number_source(value):
+    """Python literal for a Number's value."""
+    if isinstance(value, complex):
+        if math.isfinite(value.real) and math.isfinite(value.imag):
+            return f"({value!r})"
+        return f"complex({str(value)!r})"
+    if isinstance(value, float) and not math.isfinite(value):
+        return f"float({str(value)!r})"
+    return f"({value!r})" if value < 0 else repr(value)
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    expr = parse_expression("(x + y)^2 * (x + y + 1) + (x + y)^2")
+    f = lambdify(expr)
+    print(f.source)
+    print(f"f(1, 2) = {f(1, 2)}")
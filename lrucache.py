@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Bounded LRU cache shared by the MiniSym parse and simplify caches.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions size maxsize')
+
+class LRUCache:
+    """Thread-safe mapping that keeps at most `maxsize` most recently used entries."""
+    
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        """Return the cached value for `key`, or None on a miss."""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key, value):
+        """Store `value` for `key`, evicting least recently used entries."""
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def cache_info(self):
+        """Hit, miss and eviction counts with the current and maximum size."""
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             len(self.entries), self.maxsize)
+    
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+    
+    def __len__(self):
+        return len(self.entries)
@@ -1,68 +1,356 @@
+import threading
+import weakref
+from bisect import insort
+from hashlib import blake2b
+from operator import attrgetter
+
+# Hash-consing tables: structurally identical nodes are built once and
+# shared. There is one table per kind of node, mapping the node's own fields
+# (a Symbol's name, a Number's value, a composite's operand tuple) to a weak
+# reference, so that a key costs no memory beyond the node itself; an entry
+# is dropped when the last reference to its node goes away. Operands in a
+# key are themselves interned, so key comparison is an identity check on
+# each field.
+class _InternTable(dict):
+    __slots__ = ('forget',)
+
+    def __init__(self):
+        super().__init__()
+        def forget(ref):
+            # Only drop the entry if it still belongs to the node that just died
+            with _intern_lock:
+                if self.get(ref.key) is ref:
+                    del self[ref.key]
+        self.forget = forget
+
+_SYMBOLS = _InternTable()
+_ADDS = _InternTable()
+_MULS = _InternTable()
+_POWS = _InternTable()
+# Numbers by value type, so that 1 and 1.0 are distinct nodes
+_NUMBERS = {}
+
+# Interning is check-then-insert, so it runs under a lock: two threads
+# building equal nodes at once still get one object. Lookups of live nodes
+# need no lock. Reentrant, because a node dying while the lock is held runs
+# its table's forget() on the same thread.
+_intern_lock = threading.RLock()
+
+def _lookup(table, key):
+    """Return the live interned node for `key` in `table`, or None."""
+    ref = table.get(key)
+    if ref is not None:
+        return ref()
+    return None
+
+def _intern(table, cls, key, fields):
+    """Build and register a new node of `cls` for `key` from `fields`."""
+    with _intern_lock:
+        # Another thread may have interned the node since our lookup
+        node = _lookup(table, key)
+        if node is not None:
+            return node
+        node = object.__new__(cls)
+        for name, value in fields.items():
+            object.__setattr__(node, name, value)
+        table[key] = weakref.KeyedRef(node, table.forget, key)
+        return node
+
+def _number_table(kind):
+    """The intern table for numbers of type `kind`, created on first use."""
+    with _intern_lock:
+        return _NUMBERS.setdefault(kind, _InternTable())
+
+def intern_table_size():
+    """Number of live interned nodes."""
+    tables = [_SYMBOLS, _ADDS, _MULS, _POWS, *_NUMBERS.values()]
+    return sum(map(len, tables))
+
+# Canonical ordering
+#
+# Every node has a sort key `_key`. Keys are tuples whose first element is a
+# rank, so keys of different node kinds never compare their payloads against
+# each other:
+#   Number (0, real, imag, type name)   Symbol (1, name)
+#   Pow    (2, base key, exp key)       Mul    (3, operand keys)
+#   Add    (4, operand keys)
+# Operands of Add are ordered by their non-numeric part, then coefficient, with
+# constants last, so like terms (x, 2*x, 3*x) sit next to each other. Operands
+# of Mul are ordered with constants first, then by base and exponent, so equal
+# bases (x, x**2) sit next to each other. A last flag tells a term from the
+# same term with an explicit coefficient or exponent of 1 (x and 1*x, x and
+# x**1), which would otherwise tie and keep their construction order.
+#
+# Keys nest as deep as the expression, so comparing two deep nodes would walk
+# (and recurse through) both trees. A node taller than KEY_DEPTH is keyed as
+# (rank, (), fingerprint) instead, where the fingerprint is a deterministic
+# 64-bit hash of its structure: comparisons stay shallow, and expressions up
+# to KEY_DEPTH levels keep their structural order.
+#
+# Keys and fingerprints `_fp` are computed on first use and then cached on
+# the node, so nodes that are never compared or keyed do not pay for them.
+# Numbers, which are often unique, recompute them instead, and operand keys
+# are never cached: they are cheap to rebuild from the operands' own keys.
+# Only the height is stored up front.
+
+KEY_DEPTH = 16
+
+
+_ONE_KEY = (0, 1, 0, 'int')
+
+_FP_MASK = (1 << 64) - 1
+_FP_PRIME = 0x100000001B3
+
+def _leaf_fingerprint(text):
+    # Python's str hash is salted per process; this one is stable
+    return int.from_bytes(blake2b(text.encode(), digest_size=8).digest(), 'little')
+
+def _number_fingerprint(value):
+    # Hashed from an exact encoding of the value: hash() is not injective
+    # (hash(-1) == hash(-2)), and repr() is slow for, and refuses, huge
+    # integers. The type name keeps 1 and 1.0 apart.
+    kind = type(value)
+    if kind is int:
+        data = value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+    elif kind is float:
+        data = value.hex().encode()
+    else:
+        data = repr(value).encode()
+    digest = blake2b(data, digest_size=8, person=kind.__name__.encode()[:16]).digest()
+    return int.from_bytes(digest, 'little')
+
+def _fingerprint(rank, args):
+    fp = rank
+    for arg in args:
+        fp = ((fp * _FP_PRIME) ^ arg._fp) & _FP_MASK
+    return fp
+
+def _cached(node, name):
+    """A lazy field of `node` if already computed, else None."""
+    try:
+        return object.__getattribute__(node, name)
+    except AttributeError:
+        return None
+
+def _node_fingerprint(node):
+    cls = type(node)
+    if cls is Number:
+        return _number_fingerprint(node.value)
+    if cls is Symbol:
+        return _leaf_fingerprint(f"Symbol:{node.name}")
+    # Operands are fingerprinted bottom-up with an explicit stack, since a
+    # chain of nodes without one can be as deep as the expression
+    stack = [node]
+    while stack:
+        top = stack[-1]
+        pending = [arg for arg in top.args if arg.args and _cached(arg, '_fp') is None]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        fp = _fingerprint(_RANKS[type(top)], top.args)
+        object.__setattr__(top, '_fp', fp)
+    return fp
+
+def _sort_key(node):
+    cls = type(node)
+    if cls is Number:
+        value = node.value
+        return (0, value.real, value.imag, type(value).__name__)
+    if cls is Symbol:
+        return (1, node.name)
+    if node._height > KEY_DEPTH:
+        return (_RANKS[cls], (), node._fp)
+    if cls is Pow:
+        return (2, node.args[0]._key, node.args[1]._key)
+    operand_key = _add_operand_key if cls is Add else _mul_operand_key
+    return (_RANKS[cls], tuple(map(operand_key, node.args)))
+
+def _add_operand_key(node):
+    if type(node) is Number:
+        return (1, node._key)
+    if type(node) is Mul and type(node.args[0]) is Number:
+        rest = node.args[1:]
+        if len(rest) == 1:
+            term_key = rest[0]._key
+        elif node._height > KEY_DEPTH:
+            term_key = (3, (), _fingerprint(3, rest))
+        else:
+            term_key = (3, tuple(map(_mul_operand_key, rest)))
+        return (0, term_key, node.args[0]._key, 1)
+    return (0, node._key, _ONE_KEY, 0)
+
+def _mul_operand_key(node):
+    if type(node) is Number:
+        return (0, node._key)
+    if type(node) is Pow:
+        return (1, node.args[0]._key, node.args[1]._key, 1)
+    return (1, node._key, _ONE_KEY, 0)
+
+_LAZY_FIELDS = {'_key': _sort_key, '_fp': _node_fingerprint}
+
+_HEIGHT = attrgetter('_height')
+
+# A node built from an existing sum or product and at most this many other
+# operands inserts them into its already sorted operands instead of sorting
+# everything again, so growing an expression one term at a time (e = e + t,
+# or a parsed chain ((x + 1) + 1) + ...) costs a binary search per term.
+MERGE_LIMIT = 8
+
+def _build(table, cls, args, operand_key):
+    """The interned `cls` node over `args`, with nested `cls` nodes flattened
+    and plain numbers wrapped. Returns None if there are fewer than two
+    operands; the caller decides what that means."""
+    operands = []
+    base = None
+    for arg in args:
+        if isinstance(arg, (int, float)):
+            arg = Number(arg)
+        if type(arg) is cls:
+            # Keep the largest nested node whole, to merge into
+            if base is None:
+                base = arg
+                continue
+            if len(arg.args) > len(base.args):
+                base, arg = arg, base
+            operands.extend(arg.args)
+        else:
+            operands.append(arg)
+    if base is not None and len(operands) <= MERGE_LIMIT:
+        merged = list(base.args)
+        for operand in operands:
+            insort(merged, operand, key=operand_key)
+        height = max(base._height, 1 + max(map(_HEIGHT, operands), default=0))
+        return _composite(table, cls, tuple(merged), height)
+    if base is not None:
+        operands.extend(base.args)
+    if len(operands) < 2:
+        return operands[0] if operands else None
+    args = _sorted_operands(operands, operand_key)
+    return _composite(table, cls, args, 1 + max(map(_HEIGHT, args)))
+
+def _sorted_operands(operands, operand_key):
+    """Sort operands canonically, as a tuple."""
+    keys = list(map(operand_key, operands))
+    if len(keys) == 2:
+        # Most nodes are binary; avoid the general sort for them
+        if keys[1] < keys[0]:
+            return (operands[1], operands[0])
+        return tuple(operands)
+    order = sorted(range(len(operands)), key=keys.__getitem__)
+    return tuple([operands[i] for i in order])
+
+def _composite(table, cls, args, height):
+    """The interned `cls` node with operands `args`."""
+    node = _lookup(table, args)
+    if node is None:
+        node = _intern(table, cls, args, {'args': args, '_height': height})
+    return node
+
+# Fields of composite nodes; the lazy ones are unset until first used
+_COMPOSITE_SLOTS = ('args', '_height', '_key', '_fp')
+
 class Expr:
-    pass
+    # Nodes are immutable and slot-based: no per-instance __dict__, and fields
+    # cannot be reassigned once built, so shared subtrees are safe to reuse.
+    # Hashing and equality are inherited from object: because every node is
+    # interned, structurally equal nodes are the same object.
+    __slots__ = ('__weakref__',)
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    def __getattr__(self, name):
+        # Only reached for fields not set yet: compute the lazy ones
+        compute = _LAZY_FIELDS.get(name)
+        if compute is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        value = compute(self)
+        if type(self) is not Number:
+            object.__setattr__(self, name, value)
+        return value
+    def __reduce__(self):
+        return (type(self), self._args())
 
 class Number(Expr):
-    def __init__(self, value):
-        self.value = value
+    __slots__ = ('value',)
+    args = ()
+    _height = 0
+    def __new__(cls, value):
+        table = _NUMBERS.get(type(value))
+        if table is None:
+            table = _number_table(type(value))
+        node = _lookup(table, value)
+        if node is None:
+            node = _intern(table, cls, value, {'value': value})
+        return node
     def __str__(self):
         return str(self.value)
     def __repr__(self):
         return f"Number({self.value})"
-    def __eq__(self, other):
-        if isinstance(other, Number):
-            return self.value == other.value
-        return False
+    def _args(self):
+        return (self.value,)
 
 class Symbol(Expr):
-    def __init__(self, name):
-        self.name = name
+    __slots__ = ('name', '_key', '_fp')
+    args = ()
+    _height = 0
+    def __new__(cls, name):
+        node = _lookup(_SYMBOLS, name)
+        if node is None:
+            node = _intern(_SYMBOLS, cls, name, {'name': name})
+        return node
     def __str__(self):
         return self.name
     def __repr__(self):
         return f"Symbol('{self.name}')"
-    def __eq__(self, other):
-        if isinstance(other, Symbol):
-            return self.name == other.name
-        return False
+    def _args(self):
+        return (self.name,)
 
 class Add(Expr):
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
+    """N-ary sum. Operands are flattened and kept in canonical order."""
+    __slots__ = _COMPOSITE_SLOTS
+    def __new__(cls, *args):
+        node = _build(_ADDS, cls, args, _add_operand_key)
+        return Number(0) if node is None else node
     def __str__(self):
-        return f"({self.left} + {self.right})"
+        return printer.sstr(self)
     def __repr__(self):
-        return f"Add({repr(self.left)}, {repr(self.right)})"
-    def __eq__(self, other):
-        if isinstance(other, Add):
-            return self.left == other.left and self.right == other.right
-        return False
+        return printer.srepr(self)
+    def _args(self):
+        return self.args
 
 class Mul(Expr):
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
+    """N-ary product. Operands are flattened and kept in canonical order."""
+    __slots__ = _COMPOSITE_SLOTS
+    def __new__(cls, *args):
+        node = _build(_MULS, cls, args, _mul_operand_key)
+        return Number(1) if node is None else node
     def __str__(self):
-        return f"({self.left} * {self.right})"
+        return printer.sstr(self)
     def __repr__(self):
-        return f"Mul({repr(self.left)}, {repr(self.right)})"
-    def __eq__(self, other):
-        if isinstance(other, Mul):
-            return self.left == other.left and self.right == other.right
-        return False
+        return printer.srepr(self)
+    def _args(self):
+        return self.args
 
 class Pow(Expr):
-    def __init__(self, base, exp):
-        self.base = base
-        self.exp = exp
+    __slots__ = _COMPOSITE_SLOTS
+    def __new__(cls, base, exp):
+        return _composite(_POWS, cls, (base, exp), 1 + max(base._height, exp._height))
+    @property
+    def base(self):
+        return self.args[0]
+    @property
+    def exp(self):
+        return self.args[1]
     def __str__(self):
-        return f"({self.base} ** {self.exp})"
+        return printer.sstr(self)
     def __repr__(self):
-        return f"Pow({repr(self.base)}, {repr(self.exp)})"
-    def __eq__(self, other):
-        if isinstance(other, Pow):
-            return self.base == other.base and self.exp == other.exp
-        return False
+        return printer.srepr(self)
+    def _args(self):
+        return self.args
+
+_RANKS = {Pow: 2, Mul: 3, Add: 4}
 
 # Python operator overloads for basic math operations
 def __add__(self, other):
@@ -84,3 +372,7 @@ def __pow__(self, other):
 Expr.__add__ = __add__
 Expr.__mul__ = __mul__
 Expr.__pow__ = __pow__
+
+# Composite nodes render through the printer module, which walks the tree
+# iteratively; imported last because it depends on the classes above.
+import printer
@@ -6,6 +6,22 @@ Converts mathematical expressions from strings to ASTs.
 
 import re
 from minisym_ast import Number, Symbol, Add, Mul, Pow
+from lrucache import LRUCache
+
+def negate(expr):
+    """Return -expr: a negative literal for numbers, -1 * expr otherwise."""
+    if isinstance(expr, Number):
+        return Number(-expr.value)
+    return Mul(Number(-1), expr)
+
+def divide(factor):
+    """Return the factor that dividing by `factor` multiplies with."""
+    # For now, treat division as multiplication with reciprocal
+    # This is a simplification - proper division would need a Div class
+    if isinstance(factor, Number) and factor.value != 0:
+        return Number(1 / factor.value)
+    # For symbolic division, multiply by factor^-1
+    return Pow(factor, Number(-1))
 
 class Token:
     """Represents a single token in the input stream."""
@@ -85,81 +101,134 @@ class Tokenizer:
         identifier = self.text[start:self.position]
         self.tokens.append(Token('IDENTIFIER', identifier, start))
 
+# Fast tokenizer mode: one compiled master pattern, one match per token.
+# The classes mirror Tokenizer: numbers are runs of digits and dots,
+# identifiers start with a letter or underscore, and anything unmatched
+# is reported as an unknown character at the same position.
+TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>[\d.]+)
+  | (?P<identifier>[^\W\d]\w*)
+  | (?P<operator>[-+*/()^])
+  | (?P<unknown>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Compact tokens are plain (type, value, position) tuples
+TYPE, VALUE, POSITION = 0, 1, 2
+
+def iter_tokens(text):
+    """Lazily yield compact (type, value, position) tokens for `text`."""
+    for match in TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'operator':
+            yield ('OPERATOR', match.group(), match.start())
+        elif kind == 'identifier':
+            yield ('IDENTIFIER', match.group(), match.start())
+        elif kind == 'number':
+            number_str = match.group()
+            try:
+                if '.' in number_str:
+                    value = float(number_str)
+                else:
+                    value = int(number_str)
+            except ValueError:
+                raise ValueError(f"Invalid number '{number_str}' at position {match.start()}")
+            yield ('NUMBER', value, match.start())
+        elif kind == 'unknown':
+            raise ValueError(f"Unknown character '{match.group()}' at position {match.start()}")
+
+# Matches text that iter_tokens() accepts, token for token: possessive
+# quantifiers give the same longest matches, and a number must be a whole
+# valid int or float. One pass in C, so parsers can report lexical errors
+# before any syntax error while still streaming their tokens.
+LEXICAL_PATTERN = re.compile(r"""
+    (?: \s++
+      | [^\W\d]\w*+
+      | [-+*/()^]
+      | (?= (?:\d+(?:\.\d*)?|\.\d+) (?![\d.]) ) [\d.]++
+    )*+
+""", re.VERBOSE)
+
+def check_tokens(text):
+    """Raise the first error iter_tokens() would raise for `text`, if any."""
+    if LEXICAL_PATTERN.match(text).end() != len(text):
+        for _ in iter_tokens(text):
+            pass
+
 class Parser:
     """Recursive descent parser for mathematical expressions."""
     
-    def __init__(self, text):
-        self.tokenizer = Tokenizer(text)
-        self.tokens = self.tokenizer.tokens
+    def __init__(self, text, fast=True):
+        # The fast mode streams compact tokens from iter_tokens(), after one
+        # check that reports lexical errors first, as the other mode does;
+        # otherwise the character-by-character Tokenizer builds the whole
+        # list first.
+        if fast:
+            check_tokens(text)
+            self.tokens = iter_tokens(text)
+        else:
+            self.tokenizer = Tokenizer(text)
+            self.tokens = iter([(token.type, token.value, token.position)
+                                for token in self.tokenizer.tokens])
         self.position = 0
+        self.current = next(self.tokens, None)
     
     def parse(self):
         """Parse the expression and return an AST."""
-        if not self.tokens:
+        if self.current is None:
             raise ValueError("Empty expression")
         
         result = self.parse_expression()
         
         # Check if we've consumed all tokens
-        if self.position < len(self.tokens):
+        if self.current is not None:
             raise ValueError(f"Unexpected tokens after expression at position {self.position}")
         
         return result
     
     def parse_expression(self):
         """Parse an expression (lowest precedence)."""
-        left = self.parse_term()
+        terms = [self.parse_term()]
         
-        while (self.position < len(self.tokens) and 
-               self.current_token().value in ['+', '-']):
-            op = self.current_token().value
+        while (self.current is not None and 
+               self.current[VALUE] in ('+', '-')):
+            op = self.current[VALUE]
             self.advance()
             right = self.parse_term()
             
             if op == '+':
-                left = Add(left, right)
+                terms.append(right)
             else:  # op == '-'
-                # For now, treat subtraction as addition with negative
-                if isinstance(right, Number):
-                    right = Number(-right.value)
-                else:
-                    # For symbolic expressions, we'll need to implement negation
-                    # For now, just use addition with a negative coefficient
-                    left = Add(left, Mul(Number(-1), right))
+                # Treat subtraction as addition of the negated term
+                terms.append(negate(right))
         
-        return left
+        # Collect the whole sum first so it becomes one flat Add
+        return Add(*terms)
     
     def parse_term(self):
         """Parse a term (medium precedence)."""
-        left = self.parse_factor()
+        factors = [self.parse_factor()]
         
-        while (self.position < len(self.tokens) and 
-               self.current_token().value in ['*', '/']):
-            op = self.current_token().value
+        while (self.current is not None and 
+               self.current[VALUE] in ('*', '/')):
+            op = self.current[VALUE]
             self.advance()
             right = self.parse_factor()
             
             if op == '*':
-                left = Mul(left, right)
+                factors.append(right)
             else:  # op == '/'
-                # For now, treat division as multiplication with reciprocal
-                # This is a simplification - proper division would need a Div class
-                if isinstance(right, Number) and right.value != 0:
-                    left = Mul(left, Number(1 / right.value))
-                else:
-                    # For symbolic division, we'll need to implement proper division
-                    # For now, just use multiplication
-                    left = Mul(left, Pow(right, Number(-1)))
+                factors.append(divide(right))
         
-        return left
+        return Mul(*factors)
     
     def parse_factor(self):
         """Parse a factor (highest precedence)."""
         left = self.parse_primary()
         
         # Handle exponentiation (right-associative)
-        while (self.position < len(self.tokens) and 
-               self.current_token().value == '^'):
+        while (self.current is not None and 
+               self.current[VALUE] == '^'):
             self.advance()  # consume '^'
             right = self.parse_factor()  # recursive for right-associativity
             left = Pow(left, right)
@@ -168,53 +237,201 @@ class Parser:
     
     def parse_primary(self):
         """Parse primary expressions (numbers, variables, parentheses)."""
-        token = self.current_token()
+        kind, value, position = self.current_token()
         
-        if token.type == 'NUMBER':
+        if kind == 'NUMBER':
             self.advance()
-            return Number(token.value)
+            return Number(value)
         
-        elif token.type == 'IDENTIFIER':
+        elif kind == 'IDENTIFIER':
             self.advance()
-            return Symbol(token.value)
+            return Symbol(value)
         
-        elif token.value == '(':
+        elif value == '(':
             self.advance()  # consume '('
             expr = self.parse_expression()
             
-            if (self.position >= len(self.tokens) or 
-                self.current_token().value != ')'):
+            if self.current is None or self.current[VALUE] != ')':
                 raise ValueError("Unmatched parentheses")
             
             self.advance()  # consume ')'
             return expr
         
-        elif token.value == '-':
+        elif value == '-':
             # Handle unary minus for negative numbers
             self.advance()  # consume '-'
-            primary = self.parse_primary()
-            if isinstance(primary, Number):
-                return Number(-primary.value)
-            else:
-                # For symbolic expressions, multiply by -1
-                return Mul(Number(-1), primary)
+            return negate(self.parse_primary())
         
         else:
-            raise ValueError(f"Unexpected token '{token.value}' at position {token.position}")
+            raise ValueError(f"Unexpected token '{value}' at position {position}")
     
     def current_token(self):
         """Get the current token."""
-        if self.position >= len(self.tokens):
+        if self.current is None:
             raise ValueError("Unexpected end of input")
-        return self.tokens[self.position]
+        return self.current
     
     def advance(self):
         """Move to the next token."""
+        self.current = next(self.tokens, None)
         self.position += 1
 
+class Frame:
+    """Operands collected so far for one parenthesis level."""
+    __slots__ = ('terms', 'subtract', 'factors', 'divide', 'powers', 'minus')
+    
+    def __init__(self):
+        self.terms = []        # finished terms of the sum
+        self.subtract = False  # current term follows a '-'
+        self.factors = []      # finished factors of the current term
+        self.divide = False    # current factor follows a '/'
+        self.powers = []       # operands of the current '^' chain
+        self.minus = 0         # unary minus signs before the next primary
+
+class IterativeParser:
+    """
+    Shunting-yard parser with an explicit stack, one frame per open
+    parenthesis. It builds exactly the same ASTs (and raises the same
+    errors) as the recursive descent Parser, but nesting depth is limited
+    only by memory.
+    """
+    
+    def __init__(self, text, fast=True):
+        if fast:
+            check_tokens(text)
+            self.tokens = iter_tokens(text)
+        else:
+            self.tokens = iter([(token.type, token.value, token.position)
+                                for token in Tokenizer(text).tokens])
+    
+    def parse(self):
+        """Parse the expression and return an AST."""
+        tokens = self.tokens
+        token = next(tokens, None)
+        if token is None:
+            raise ValueError("Empty expression")
+        
+        position = 0       # index of `token` in the stream
+        frame = Frame()
+        frames = []        # enclosing parenthesis levels
+        
+        while True:
+            # Prefix position: read unary minus signs and one primary
+            while True:
+                if token is None:
+                    raise ValueError("Unexpected end of input")
+                kind, value, token_position = token
+                if kind == 'NUMBER':
+                    operand = Number(value)
+                elif kind == 'IDENTIFIER':
+                    operand = Symbol(value)
+                elif value == '(':
+                    frames.append(frame)
+                    frame = Frame()
+                    token = next(tokens, None)
+                    position += 1
+                    continue
+                elif value == '-':
+                    frame.minus += 1
+                    token = next(tokens, None)
+                    position += 1
+                    continue
+                else:
+                    raise ValueError(f"Unexpected token '{value}' at position {token_position}")
+                token = next(tokens, None)
+                position += 1
+                break
+            
+            # Infix position: reduce finished levels, then read an operator
+            while True:
+                if frame.minus:
+                    for _ in range(frame.minus):
+                        operand = negate(operand)
+                    frame.minus = 0
+                
+                op = token[VALUE] if token is not None else None
+                if op == '^':
+                    frame.powers.append(operand)
+                    break
+                
+                # The '^' chain is complete (right-associative)
+                powers = frame.powers
+                factor = operand
+                while powers:
+                    factor = Pow(powers.pop(), factor)
+                frame.factors.append(divide(factor) if frame.divide else factor)
+                if op == '*' or op == '/':
+                    frame.divide = op == '/'
+                    break
+                
+                # The term is complete
+                term = Mul(*frame.factors)
+                frame.terms.append(negate(term) if frame.subtract else term)
+                frame.factors = []
+                frame.divide = False
+                if op == '+' or op == '-':
+                    frame.subtract = op == '-'
+                    break
+                
+                # The sum is complete: close a parenthesis level or finish
+                expr = Add(*frame.terms)
+                if not frames:
+                    if token is not None:
+                        raise ValueError(f"Unexpected tokens after expression at position {position}")
+                    return expr
+                if op != ')':
+                    raise ValueError("Unmatched parentheses")
+                frame = frames.pop()
+                operand = expr
+                token = next(tokens, None)
+                position += 1
+                continue
+            
+            # Consume the binary operator and read the next operand
+            token = next(tokens, None)
+            position += 1
+
+class ParseCache(LRUCache):
+    """
+    Bounded LRU cache from expression strings to parsed ASTs.
+    
+    ASTs are immutable, interned nodes, so a cached result can be handed to
+    any number of callers safely. Failed parses are not cached.
+    """
+    
+    def parse(self, text):
+        """Return the AST for `text`, parsing it only on a cache miss."""
+        expr = self.get(text)
+        if expr is None:
+            expr = IterativeParser(text).parse()
+            self.put(text, expr)
+        return expr
+
+# Cache used by parse_expression(), when enabled
+_parse_cache = None
+
+def enable_parse_cache(maxsize=1024):
+    """Cache parse_expression() results in a new LRU cache of `maxsize` entries."""
+    global _parse_cache
+    _parse_cache = ParseCache(maxsize)
+    return _parse_cache
+
+def disable_parse_cache():
+    """Stop caching parse_expression() results and drop the cache."""
+    global _parse_cache
+    _parse_cache = None
+
+def parse_cache_info():
+    """Statistics of the parse_expression() cache, or None when disabled."""
+    cache = _parse_cache
+    return cache.cache_info() if cache is not None else None
+
 def parse_expression(text):
     """Convenience function to parse a string expression into an AST."""
-    parser = Parser(text)
+    cache = _parse_cache
+    if cache is not None:
+        return cache.parse(text)
+    parser = IterativeParser(text)
     return parser.parse()
 
 # Example usage and testing
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Sparse multivariate polynomials for MiniSym
+A fast path for expressions built only from numbers, symbols, sums,
+products and non-negative integer powers.
+"""
+
+import sys
+from array import array
+from itertools import compress, product, repeat
+from operator import sub
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+
+# Kronecker substitution packs a whole polynomial into one Python integer, so
+# a product becomes a single big-integer multiplication. It is used when the
+# packed size stays below this many bits; otherwise terms are multiplied
+# pairwise in a dict.
+KRONECKER_MAX_BITS = 1 << 22
+
+# Unsigned array type codes tried for Kronecker slots, narrowest first
+SLOT_CODES = ('B', 'H', 'I', 'Q')
+
+def is_polynomial(expr):
+    """True if `expr` is a polynomial in its symbols."""
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (Number, Symbol)):
+            continue
+        if isinstance(node, (Add, Mul)):
+            stack.extend(node.args)
+        elif isinstance(node, Pow):
+            if not is_exponent(node.exp):
+                return False
+            stack.append(node.base)
+        else:
+            return False
+    return True
+
+def is_exponent(expr):
+    """True if `expr` is a non-negative integer Number."""
+    return (isinstance(expr, Number) and type(expr.value) is int
+            and expr.value >= 0)
+
+def is_monomial(expr):
+    """True for an integer times symbols raised to non-negative integer powers."""
+    factors = expr.args if isinstance(expr, Mul) else (expr,)
+    for factor in factors:
+        if isinstance(factor, Pow):
+            if not (isinstance(factor.base, Symbol) and is_exponent(factor.exp)):
+                return False
+        elif isinstance(factor, Number):
+            if type(factor.value) is not int:
+                return False
+        elif not isinstance(factor, Symbol):
+            return False
+    return True
+
+def monomial_bases(expr):
+    """The symbols of a monomial, as returned by is_monomial()."""
+    for factor in expr.args:
+        if isinstance(factor, Pow):
+            yield factor.base
+        elif isinstance(factor, Symbol):
+            yield factor
+
+def free_symbols(expr):
+    """All symbols in `expr`, sorted by name."""
+    seen = set()
+    symbols = set()
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        if isinstance(node, Symbol):
+            symbols.add(node)
+        else:
+            stack.extend(node.args)
+    return tuple(sorted(symbols, key=lambda symbol: symbol._key))
+
+class SparsePoly:
+    """
+    A polynomial stored as a dict from exponent tuples to coefficients.
+
+    `symbols` is a tuple of Symbols in canonical order (by name); each key of
+    `terms` holds one exponent per symbol. Zero coefficients are never
+    stored. Other expressions may stand in for symbols, as expand() does
+    with powers like x**-1.
+    """
+    __slots__ = ('symbols', 'terms')
+
+    def __init__(self, terms, symbols=()):
+        self.symbols = tuple(symbols)
+        self.terms = {exps: coeff for exps, coeff in terms.items() if coeff != 0}
+
+    @classmethod
+    def constant(cls, value, symbols=()):
+        return cls({(0,) * len(symbols): value}, symbols)
+
+    @classmethod
+    def from_expr(cls, expr, symbols=None):
+        """
+        Convert an AST to a SparsePoly, optionally over a given symbol tuple.
+        Subexpressions found in `symbols` are taken as symbols, whatever
+        their type. Raises ValueError if the expression is not a polynomial.
+        """
+        if symbols is None:
+            symbols = free_symbols(expr)
+        symbols = tuple(symbols)
+        width = len(symbols)
+        zero = (0,) * width
+        position = {symbol: i for i, symbol in enumerate(symbols)}
+
+        # Post-order walk with an explicit stack; shared subtrees convert once
+        converted = {}
+        stack = [expr]
+        while stack:
+            node = stack[-1]
+            if node in converted:
+                stack.pop()
+                continue
+            if node in position:
+                exps = [0] * width
+                exps[position[node]] = 1
+                converted[node] = cls._raw({tuple(exps): 1}, symbols)
+            elif isinstance(node, Number):
+                converted[node] = cls._raw({zero: node.value}, symbols)
+            elif isinstance(node, Symbol):
+                raise ValueError(f"Symbol '{node.name}' is not one of the polynomial symbols")
+            elif (isinstance(node, Mul) and is_monomial(node)
+                  and all(arg in position for arg in monomial_bases(node))):
+                # Common case: read the exponents off directly
+                exps = [0] * width
+                coeff = 1
+                for factor in node.args:
+                    if isinstance(factor, Number):
+                        coeff = coeff * factor.value
+                    elif isinstance(factor, Pow):
+                        exps[position[factor.base]] += factor.exp.value
+                    else:
+                        exps[position[factor]] += 1
+                converted[node] = cls._raw({tuple(exps): coeff} if coeff else {}, symbols)
+            elif isinstance(node, (Add, Mul, Pow)):
+                if isinstance(node, Pow) and not is_exponent(node.exp):
+                    raise ValueError(f"Not a polynomial: {node}")
+                operands = node.args if not isinstance(node, Pow) else (node.base,)
+                pending = [arg for arg in operands if arg not in converted]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                if isinstance(node, Add):
+                    result = cls._raw({}, symbols)
+                    for arg in node.args:
+                        result = result._iadd(converted[arg])
+                elif isinstance(node, Mul):
+                    result = converted[node.args[0]]
+                    for arg in node.args[1:]:
+                        result = result * converted[arg]
+                else:
+                    result = converted[node.base] ** node.exp.value
+                converted[node] = result
+            else:
+                raise ValueError(f"Not a polynomial: {node}")
+            stack.pop()
+        return converted[expr]
+
+    @classmethod
+    def _raw(cls, terms, symbols):
+        """Build from terms that are known to have no zero coefficients."""
+        poly = object.__new__(cls)
+        poly.symbols = symbols
+        poly.terms = terms
+        return poly
+
+    def to_expr(self):
+        """Convert back to a canonical AST."""
+        terms = []
+        for exps, coeff in self.terms.items():
+            factors = []
+            for symbol, exp in zip(self.symbols, exps):
+                if exp == 1:
+                    factors.append(symbol)
+                elif exp:
+                    factors.append(Pow(symbol, Number(exp)))
+            if coeff != 1 or not factors:
+                factors.append(Number(coeff))
+            terms.append(Mul(*factors))
+        return Add(*terms)
+
+    def aligned(self, other):
+        """Return (self, other) re-expressed over the union of their symbols."""
+        if self.symbols == other.symbols:
+            return self, other
+        symbols = tuple(sorted(set(self.symbols) | set(other.symbols),
+                               key=lambda symbol: symbol._key))
+        return self.over(symbols), other.over(symbols)
+
+    def over(self, symbols):
+        """Re-express over `symbols`, which must include all of self.symbols."""
+        index = [symbols.index(symbol) for symbol in self.symbols]
+        width = len(symbols)
+        terms = {}
+        for exps, coeff in self.terms.items():
+            new = [0] * width
+            for i, exp in zip(index, exps):
+                new[i] = exp
+            terms[tuple(new)] = coeff
+        return SparsePoly._raw(terms, tuple(symbols))
+
+    def _coerce(self, other):
+        if isinstance(other, SparsePoly):
+            return self.aligned(other)
+        if isinstance(other, (int, float)):
+            return self, SparsePoly.constant(other, self.symbols)
+        return None, None
+
+    def _iadd(self, other):
+        """Add `other` (over the same symbols) into this polynomial's dict."""
+        terms = self.terms
+        for exps, coeff in other.terms.items():
+            total = terms.get(exps, 0) + coeff
+            if total != 0:
+                terms[exps] = total
+            else:
+                terms.pop(exps, None)
+        return self
+
+    def __add__(self, other):
+        left, right = self._coerce(other)
+        if left is None:
+            return NotImplemented
+        return SparsePoly._raw(dict(left.terms), left.symbols)._iadd(right)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return SparsePoly._raw({exps: -coeff for exps, coeff in self.terms.items()},
+                               self.symbols)
+
+    def __sub__(self, other):
+        left, right = self._coerce(other)
+        if left is None:
+            return NotImplemented
+        return left + (-right)
+
+    def __mul__(self, other):
+        left, right = self._coerce(other)
+        if left is None:
+            return NotImplemented
+        if not left.terms or not right.terms:
+            return SparsePoly._raw({}, left.symbols)
+        if len(left.terms) == 1 or len(right.terms) == 1:
+            return multiply_dict(left, right)
+        return multiply_kronecker(left, right) or multiply_dict(left, right)
+
+    __rmul__ = __mul__
+
+    def __pow__(self, n):
+        if type(n) is not int or n < 0:
+            raise ValueError("Polynomial powers must be non-negative integers")
+        result = SparsePoly.constant(1, self.symbols)
+        base = self
+        # Binary exponentiation
+        while n:
+            if n & 1:
+                result = result * base
+            n >>= 1
+            if n:
+                base = base * base
+        return result
+
+    def __eq__(self, other):
+        if not isinstance(other, SparsePoly):
+            return NotImplemented
+        left, right = self.aligned(other)
+        return left.terms == right.terms
+
+    def __len__(self):
+        return len(self.terms)
+
+    def degree(self):
+        """Total degree (-1 for the zero polynomial)."""
+        return max((sum(exps) for exps in self.terms), default=-1)
+
+    def __repr__(self):
+        names = ", ".join(str(symbol) for symbol in self.symbols)
+        return f"SparsePoly({self.terms!r}, symbols=({names}))"
+
+def multiply_dict(left, right):
+    """Multiply term by term, accumulating products in a dict."""
+    width = len(left.symbols)
+    if len(left.terms) > len(right.terms):
+        left, right = right, left
+    # Pack each exponent tuple into one integer, so multiplying monomials is
+    # a single integer addition
+    bits = max(product_degrees(left, right), default=0).bit_length() + 1
+    pack = lambda exps: sum(exp << (bits * i) for i, exp in enumerate(exps))
+    right_items = [(pack(exps), coeff) for exps, coeff in right.terms.items()]
+    products = {}
+    get = products.get
+    for exps, coeff in left.terms.items():
+        key = pack(exps)
+        for other_key, other_coeff in right_items:
+            k = key + other_key
+            products[k] = get(k, 0) + coeff * other_coeff
+    mask = (1 << bits) - 1
+    terms = {}
+    for key, coeff in products.items():
+        if coeff != 0:
+            terms[tuple((key >> (bits * i)) & mask for i in range(width))] = coeff
+    return SparsePoly._raw(terms, left.symbols)
+
+def product_degrees(left, right):
+    """Upper bounds on the exponent of each symbol in left * right."""
+    return [a + b for a, b in zip(max_degrees(left), max_degrees(right))]
+
+def max_degrees(poly):
+    """Largest exponent of each symbol."""
+    width = len(poly.symbols)
+    degrees = [0] * width
+    for exps in poly.terms:
+        for i in range(width):
+            if exps[i] > degrees[i]:
+                degrees[i] = exps[i]
+    return degrees
+
+def multiply_kronecker(left, right):
+    """
+    Multiply integer polynomials by Kronecker substitution: map each monomial
+    to a slot of a dense vector, pack the coefficients into one big integer
+    per polynomial, and multiply those. Returns None when the coefficients
+    are not all integers or the packing would be too large.
+    """
+    coeffs = list(left.terms.values()) + list(right.terms.values())
+    if any(type(coeff) is not int for coeff in coeffs):
+        return None
+
+    # Each slot must hold the largest possible product coefficient, signed
+    largest = (max(abs(c) for c in left.terms.values()) *
+               max(abs(c) for c in right.terms.values()) *
+               min(len(left.terms), len(right.terms)))
+    code = next((code for code in SLOT_CODES
+                 if largest < 1 << (8 * array(code).itemsize - 1)), None)
+    if code is None:
+        return None
+    slot_bits = 8 * array(code).itemsize
+
+    # Slot of a monomial: symbol i has stride prod(D_j, j > i), where D_j
+    # bounds the product's degree in symbol j, so slots add without carries
+    # when monomials multiply
+    bounds = [degree + 1 for degree in product_degrees(left, right)]
+    strides = []
+    size = 1
+    for bound in reversed(bounds):
+        strides.append(size)
+        size *= bound
+    strides.reverse()
+    if size * slot_bits > KRONECKER_MAX_BITS:
+        return None
+
+    # Slots of the product may be negative; adding `half` to every slot
+    # makes them all non-negative without borrowing from their neighbours
+    half = 1 << (slot_bits - 1)
+    product_value = (pack_integers(left, strides, size, code) *
+                     pack_integers(right, strides, size, code) +
+                     pack_slots([half] * size, code))
+    data = product_value.to_bytes(size * slot_bits // 8, sys.byteorder)
+    values = list(map(sub, memoryview(data).cast(code).tolist(), repeat(half)))
+
+    # Slots run through the exponent tuples in itertools.product order
+    monomials = product(*[range(bound) for bound in bounds])
+    terms = dict(compress(zip(monomials, values), values))
+    return SparsePoly._raw(terms, left.symbols)
+
+def pack_integers(poly, strides, size, code):
+    """Pack coefficients into one big integer, sum(c * 2^(slot bits * slot))."""
+    positive = [0] * size
+    negative = [0] * size
+    for exps, coeff in poly.terms.items():
+        slot = sum([exp * stride for exp, stride in zip(exps, strides)])
+        if coeff > 0:
+            positive[slot] = coeff
+        else:
+            negative[slot] = -coeff
+    return pack_slots(positive, code) - pack_slots(negative, code)
+
+def pack_slots(values, code):
+    """Pack non-negative slot values into one big integer."""
+    return int.from_bytes(array(code, values).tobytes(), sys.byteorder)
+
+def simplify_polynomial(expr):
+    """Simplify a polynomial by converting it to a SparsePoly and back."""
+    return SparsePoly.from_expr(expr).to_expr()
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    p = SparsePoly.from_expr(parse_expression("x^2 + 2*x*y + 1"))
+    q = SparsePoly.from_expr(parse_expression("x - y"))
+    print(p)
+    print((p * q).to_expr())
+    print((q ** 3).to_expr())
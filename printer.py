@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Printer for MiniSym
+Renders expressions to strings or file-like streams without recursion.
+"""
+
+import weakref
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+
+# (opening, separator, closing) for each composite node type
+STR_FORMS = {
+    Add: ("(", " + ", ")"),
+    Mul: ("(", " * ", ")"),
+    Pow: ("(", " ** ", ")"),
+}
+
+REPR_FORMS = {
+    Add: ("Add(", ", ", ")"),
+    Mul: ("Mul(", ", ", ")"),
+    Pow: ("Pow(", ", ", ")"),
+}
+
+# Number of fragments buffered before a write to the output stream
+CHUNK_SIZE = 4096
+
+# Rendered strings of nodes passed to sstr(), when caching is enabled.
+# Keys are weak, so an entry goes away with its (interned) node.
+_string_cache = None
+
+def enable_string_cache():
+    """Cache the rendered string of every expression passed to sstr()."""
+    global _string_cache
+    if _string_cache is None:
+        _string_cache = weakref.WeakKeyDictionary()
+
+def disable_string_cache():
+    """Stop caching rendered strings and drop the cache."""
+    global _string_cache
+    _string_cache = None
+
+def string_cache_size():
+    """Number of cached strings (0 when caching is disabled)."""
+    return len(_string_cache) if _string_cache is not None else 0
+
+def str_leaf(node):
+    if type(node) is Symbol:
+        return node.name
+    if type(node) is Number:
+        return str(node.value)
+    return str(node)
+
+def repr_leaf(node):
+    if type(node) is Symbol:
+        return f"Symbol('{node.name}')"
+    if type(node) is Number:
+        return f"Number({node.value})"
+    return repr(node)
+
+def render(expr, forms, leaf, out, stream=None, cache=None):
+    """
+    Append the text of `expr` to the fragment list `out`.
+
+    Walks the tree with an explicit stack, so depth is unlimited and every
+    fragment is produced exactly once. If `stream` is given, fragments are
+    flushed to it in chunks and `out` is left empty.
+    """
+    append = out.append
+    stack = [expr]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        item = pop()
+        if type(item) is str:
+            append(item)
+            continue
+        form = forms.get(type(item))
+        if form is None:
+            append(leaf(item))
+        elif cache is not None and item in cache:
+            append(cache[item])
+        else:
+            opening, separator, closing = form
+            args = item.args
+            push(closing)
+            for i in range(len(args) - 1, 0, -1):
+                push(args[i])
+                push(separator)
+            push(args[0])
+            append(opening)
+        if stream is not None and len(out) >= CHUNK_SIZE:
+            stream.write("".join(out))
+            out.clear()
+    if stream is not None and out:
+        stream.write("".join(out))
+        out.clear()
+
+def sstr(expr):
+    """Render `expr` the way str() does."""
+    cache = _string_cache
+    if cache is not None:
+        text = cache.get(expr)
+        if text is not None:
+            return text
+    out = []
+    render(expr, STR_FORMS, str_leaf, out, cache=cache)
+    text = "".join(out)
+    if cache is not None and type(expr) in STR_FORMS:
+        cache[expr] = text
+    return text
+
+def srepr(expr):
+    """Render `expr` the way repr() does."""
+    out = []
+    render(expr, REPR_FORMS, repr_leaf, out)
+    return "".join(out)
+
+def write(expr, stream):
+    """Write str(expr) to a file-like `stream` without building the whole string."""
+    render(expr, STR_FORMS, str_leaf, [], stream=stream, cache=_string_cache)
+
+# Example usage and testing
+if __name__ == "__main__":
+    import sys
+    from parser import parse_expression
+
+    expr = parse_expression("2*x^2 + 3*x*y - (x + 1)^3")
+    print(sstr(expr))
+    print(srepr(expr))
+    write(expr, sys.stdout)
+    print()
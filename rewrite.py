@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Rewrite rules for MiniSym
+Declarative rules (pattern → replacement) and an index that finds the
+rules able to match a node without trying every rule.
+"""
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+
+# Sums and products match their operands as a multiset: a pattern operand
+# may match any operand of the subject, whatever the canonical order
+COMMUTATIVE = (Add, Mul)
+
+class Wild:
+    """
+    A pattern variable. Matches any expression, or only instances of `kind`
+    when given, and only those for which `test(expr)` is true when given.
+    Repeated uses of one Wild in a pattern must match the same expression.
+    """
+    __slots__ = ('name', 'kind', 'test')
+
+    def __init__(self, name, kind=None, test=None):
+        self.name = name
+        self.kind = kind
+        self.test = test
+
+    def accepts(self, expr):
+        if self.kind is not None and not isinstance(expr, self.kind):
+            return False
+        return self.test is None or self.test(expr)
+
+    def __repr__(self):
+        return f"Wild('{self.name}')"
+
+class Rest:
+    """
+    Inside a sum or product pattern: matches all operands not matched by
+    the others (possibly none), bound as a tuple.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Rest('{self.name}')"
+
+class Value:
+    """Matches any Number equal to `value` (so Value(1) matches 1 and 1.0)."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"Value({self.value!r})"
+
+def pattern(cls, *args):
+    """A pattern for a `cls` node whose operands match `args`."""
+    return (cls,) + args
+
+class Rule:
+    """
+    Rewrites nodes matching `pattern` to `replacement`.
+
+    Patterns are Wild and Rest variables, Value constants, literal
+    expressions (matched by identity) and pattern() tuples. The replacement is a template of the
+    same kind, instantiated with the bindings, or a function of the
+    bindings dict returning an expression, or None to decline the match.
+    """
+    __slots__ = ('name', 'pattern', 'replacement', 'matcher')
+
+    def __init__(self, name, pattern, replacement):
+        if type(pattern) is not tuple:
+            raise ValueError("A rule's pattern must be a pattern() for a node type")
+        self.name = name
+        self.pattern = pattern
+        self.replacement = replacement
+        # Patterns without sums or products match in at most one way, and
+        # are compiled to nested closures; the rest are searched by match()
+        self.matcher = compile_pattern(pattern) if is_positional(pattern) else None
+
+    def apply(self, expr):
+        """The rewritten expression, or None when the rule does not apply."""
+        if self.matcher is not None:
+            bindings = {}
+            if not self.matcher(expr, bindings):
+                return None
+            return self.replace(bindings)
+        for bindings in match(self.pattern, expr, {}):
+            result = self.replace(bindings)
+            if result is not None:
+                return result
+        return None
+
+    def replace(self, bindings):
+        if callable(self.replacement):
+            return self.replacement(bindings)
+        return instantiate(self.replacement, bindings)
+
+    def __repr__(self):
+        return f"Rule('{self.name}')"
+
+def is_positional(pattern):
+    """Whether `pattern` has no sum or product sub-patterns."""
+    if type(pattern) is not tuple:
+        return True
+    return pattern[0] not in COMMUTATIVE and all(map(is_positional, pattern[1:]))
+
+def compile_pattern(pattern):
+    """
+    A function (expr, bindings) → bool matching a positional pattern,
+    which fills `bindings` as it goes.
+    """
+    kind = type(pattern)
+    if kind is Wild:
+        name, cls, test = pattern.name, pattern.kind, pattern.test
+        def match_wild(expr, bindings):
+            bound = bindings.get(name)
+            if bound is not None:
+                return bound is expr
+            if cls is not None and not isinstance(expr, cls):
+                return False
+            if test is not None and not test(expr):
+                return False
+            bindings[name] = expr
+            return True
+        return match_wild
+    if kind is tuple:
+        cls, arity = pattern[0], len(pattern) - 1
+        matchers = [compile_pattern(arg) for arg in pattern[1:]]
+        def match_node(expr, bindings):
+            if type(expr) is not cls or len(expr.args) != arity:
+                return False
+            for matcher, arg in zip(matchers, expr.args):
+                if not matcher(arg, bindings):
+                    return False
+            return True
+        return match_node
+    if kind is Value:
+        value = pattern.value
+        def match_value(expr, bindings):
+            return type(expr) is Number and expr.value == value
+        return match_value
+    def match_literal(expr, bindings):
+        return expr is pattern
+    return match_literal
+
+def match(pattern, expr, bindings):
+    """Yield every extension of `bindings` under which `pattern` matches `expr`."""
+    kind = type(pattern)
+    if kind is Wild:
+        bound = bindings.get(pattern.name)
+        if bound is None:
+            if pattern.accepts(expr):
+                yield {**bindings, pattern.name: expr}
+        elif bound is expr:
+            yield bindings
+    elif kind is tuple:
+        cls, args = pattern[0], pattern[1:]
+        if type(expr) is not cls:
+            return
+        if cls in COMMUTATIVE:
+            yield from match_operands(args, list(expr.args), bindings)
+        elif len(args) == len(expr.args):
+            yield from match_sequence(args, expr.args, 0, bindings)
+    elif kind is Value:
+        if type(expr) is Number and expr.value == pattern.value:
+            yield bindings
+    elif pattern is expr:
+        yield bindings
+
+def match_sequence(patterns, exprs, i, bindings):
+    if i == len(patterns):
+        yield bindings
+        return
+    for extended in match(patterns[i], exprs[i], bindings):
+        yield from match_sequence(patterns, exprs, i + 1, extended)
+
+def match_operands(patterns, operands, bindings):
+    """Match operand patterns against a multiset of operands."""
+    if not patterns:
+        if not operands:
+            yield bindings
+        return
+    first = patterns[0]
+    if type(first) is Rest:
+        if len(patterns) > 1:
+            # Match the Rest last, whatever its position in the pattern
+            yield from match_operands(patterns[1:] + (first,), operands, bindings)
+        else:
+            yield {**bindings, first.name: tuple(operands)}
+        return
+    tried = set()
+    for i, operand in enumerate(operands):
+        if operand in tried:
+            continue
+        tried.add(operand)
+        for extended in match(first, operand, bindings):
+            yield from match_operands(patterns[1:], operands[:i] + operands[i + 1:], extended)
+
+def instantiate(template, bindings):
+    """Build the expression described by `template` under `bindings`."""
+    kind = type(template)
+    if kind is Wild:
+        return bindings[template.name]
+    if kind is tuple:
+        args = []
+        for arg in template[1:]:
+            if type(arg) is Rest:
+                args.extend(bindings[arg.name])
+            else:
+                args.append(instantiate(arg, bindings))
+        return template[0](*args)
+    return template
+
+# Index keys. An operand pattern is indexed under one key: ANY for a
+# variable (or its type's key if it is restricted to one node type), the
+# value for a Value, the node for a literal, and the shape for a
+# sub-pattern. An operand of a subject is looked up under its identity,
+# type, shape or value, and ANY.
+ANY = '*'
+NODE_TYPES = (Number, Symbol, Add, Mul, Pow)
+TYPE_KEYS = {cls: ('type', cls) for cls in NODE_TYPES}
+
+def shape_key(cls, arity):
+    """Key of a node's shape: its type, and its arity unless it is n-ary."""
+    return (cls,) if cls in COMMUTATIVE else (cls, arity)
+
+def operand_key(pattern):
+    """The index key of an operand pattern."""
+    kind = type(pattern)
+    if kind is Wild:
+        return TYPE_KEYS.get(pattern.kind, ANY)
+    if kind is tuple:
+        return shape_key(pattern[0], len(pattern) - 1)
+    if kind is Value:
+        return value_key(pattern.value)
+    return pattern
+
+def value_key(value):
+    # Equal numbers hash alike, so 1 and 1.0 share a key
+    return ('value', value)
+
+def operand_anchor(pattern):
+    """A key some operand of any match must have, for a sum/product pattern."""
+    for arg in pattern[1:]:
+        if type(arg) is not Rest:
+            key = operand_key(arg)
+            if key is not ANY:
+                return key
+    return None
+
+class RuleSet:
+    """
+    An ordered collection of rules with an index for dispatch.
+
+    Rules for non-commutative heads (powers) are indexed by head and arity,
+    then separately for each operand position by the key of the operand
+    pattern there; looking up a node intersects, position by position, the
+    rules whose key fits that operand's identity, type or shape. Rules for
+    sums and products are indexed by head and by one operand key every
+    match must contain; a node is looked up by its operands' keys. Deeper
+    structure and variable tests are checked by the matchers. Either way the
+    cost of finding candidates depends on the node and the rules that fit
+    it, not on how many rules are registered. Candidates are tried in
+    registration order.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = []
+        self.positional = {}    # (head, arity) -> per-position {key: rule ids}
+        self.anchored = {}      # head -> {anchor key: rule ids}
+        self.unanchored = {}    # head -> rule ids
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule):
+        """Register `rule` after the existing ones."""
+        position = len(self.rules)
+        self.rules.append(rule)
+        head, operands = rule.pattern[0], rule.pattern[1:]
+        if head in COMMUTATIVE:
+            anchor = operand_anchor(rule.pattern)
+            if anchor is None:
+                self.unanchored.setdefault(head, set()).add(position)
+            else:
+                self.anchored.setdefault(head, {}).setdefault(anchor, set()).add(position)
+        else:
+            index = self.positional.setdefault(
+                (head, len(operands)), [{} for _ in operands])
+            if not operands:
+                index.append({ANY: set()})
+                operands = (Wild('_'),)
+            for keys, operand in zip(index, operands):
+                keys.setdefault(operand_key(operand), set()).add(position)
+        return rule
+
+    def __len__(self):
+        return len(self.rules)
+
+    def candidates(self, expr):
+        """Ids of the rules that may match `expr`, in order."""
+        kind = type(expr)
+        if kind in COMMUTATIVE:
+            found = set(self.unanchored.get(kind, ()))
+            anchors = self.anchored.get(kind)
+            if anchors:
+                for arg in expr.args:
+                    for key in lookup_keys(arg):
+                        ids = anchors.get(key)
+                        if ids:
+                            found |= ids
+            return sorted(found)
+        index = self.positional.get((kind, len(expr.args)))
+        if index is None:
+            return []
+        found = None
+        for keys, arg in zip(index, expr.args or (None,)):
+            fits = None
+            for key in lookup_keys(arg):
+                ids = keys.get(key)
+                if ids:
+                    fits = ids if fits is None else fits | ids
+            if fits is None:
+                return []
+            found = fits if found is None else found & fits
+            if not found:
+                return []
+        return sorted(found)
+
+    def rewrite(self, expr):
+        """Apply the first rule that matches `expr`; None if none does."""
+        rules = self.rules
+        for position in self.candidates(expr):
+            result = rules[position].apply(expr)
+            if result is not None:
+                return result
+        return None
+
+def lookup_keys(expr):
+    """The index keys an operand of a subject is found under."""
+    if expr is None:
+        return (ANY,)
+    cls = type(expr)
+    if cls is Number:
+        return (ANY, TYPE_KEYS[Number], expr, value_key(expr.value))
+    if expr.args:
+        return (ANY, TYPE_KEYS.get(cls), shape_key(cls, len(expr.args)), expr)
+    return (ANY, TYPE_KEYS.get(cls), expr)
+
+# Example usage and testing
+if __name__ == "__main__":
+    x, y = Wild('x'), Wild('y')
+    rules = RuleSet([
+        Rule("pow-one", pattern(Pow, x, Number(1)), x),
+        Rule("square-sum", pattern(Mul, pattern(Add, x, y), pattern(Add, x, y), Rest('r')),
+             pattern(Mul, pattern(Pow, pattern(Add, x, y), Number(2)), Rest('r'))),
+    ])
+    a, b = Symbol('a'), Symbol('b')
+    for expr in [Pow(a, Number(1)), Pow(a, Number(2)), Mul(Add(a, b), Add(a, b), a)]:
+        print(f"{expr} → {rules.rewrite(expr)}")
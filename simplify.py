@@ -4,7 +4,36 @@ Simplification Engine for MiniSym - Phase 3
 Applies algebraic rules to simplify expressions.
 """
 
-from minisym_ast import Number, Symbol, Add, Mul, Pow
+from minisym_ast import Number, Add, Mul, Pow
+from lrucache import LRUCache
+from poly import is_monomial, simplify_polynomial
+from dense import HAVE_NUMPY, simplify_univariate
+from rewrite import Rule, RuleSet, Wild, Value, pattern
+
+# Sums of at least this many integer monomials are simplified as polynomials
+# instead of through the rules: as a dense NumPy array when they are in one
+# symbol and NumPy is installed, else as a SparsePoly. All give the same result
+# as the built-in rules, so this is skipped while user rules are registered.
+POLY_MIN_TERMS = 8
+
+# Global cache from expressions to their simplified form, when enabled
+_simplify_cache = None
+
+def enable_simplify_cache(maxsize=4096):
+    """Keep simplify() results across calls in a new LRU cache of `maxsize` entries."""
+    global _simplify_cache
+    _simplify_cache = LRUCache(maxsize)
+    return _simplify_cache
+
+def disable_simplify_cache():
+    """Stop caching simplify() results across calls and drop the cache."""
+    global _simplify_cache
+    _simplify_cache = None
+
+def simplify_cache_info():
+    """Statistics of the global simplify() cache, or None when disabled."""
+    cache = _simplify_cache
+    return cache.cache_info() if cache is not None else None
 
 def simplify(expr):
     """
@@ -13,159 +42,365 @@ def simplify(expr):
     Rules implemented:
     - Constants and identity rules (x + 0 → x, 1 * x → x)
     - Constant folding (2 + 3 → 5)
-    - Like-term combination (2*x + 3*x → 5*x)
-    - Nested simplification (recursive descent)
+    - Like-term combination across a whole sum (2*x + y + 3*x → 5*x + y)
+    - Nested simplification (bottom-up, any depth)
+    - Sums of integer monomials are combined as polynomials (poly.py, dense.py)
+    
+    The tree is walked post-order with an explicit stack, so there is no
+    recursion limit on expression depth. Each distinct subexpression is
+    simplified once per call, however often it is shared, and results are
+    also looked up in the global cache when enable_simplify_cache() is on.
     """
-    if isinstance(expr, Number):
-        return expr
-    
-    elif isinstance(expr, Symbol):
-        return expr
-    
-    elif isinstance(expr, Add):
-        return simplify_add(expr)
-    
-    elif isinstance(expr, Mul):
-        return simplify_mul(expr)
-    
-    elif isinstance(expr, Pow):
-        return simplify_pow(expr)
-    
+    return simplify_all([expr])[0]
+
+def simplify_all(exprs, memo=None):
+    """
+    Simplify each expression in `exprs`, sharing one memo across them.
+
+    `memo` maps nodes to their simplified forms; a dict passed in is read
+    and extended, so that a caller can carry it from one call to the next.
+    """
+    cache = _simplify_cache
+    polynomial = not USER_RULES.rules
+    # Simplified form of every composite node finished during this call.
+    # Nodes are interned, so this is keyed on structural identity.
+    if memo is None:
+        memo = {}
+    
+    # Each stack entry is a node still to visit, or a (node, arity) marker
+    # meaning all of its operands have been simplified onto `results`.
+    stack = list(reversed(exprs))
+    results = []
+    while stack:
+        item = stack.pop()
+        if type(item) is tuple:
+            node, arity = item
+            args = results[len(results) - arity:]
+            del results[len(results) - arity:]
+            result = rebuild(node, args)
+            memo[node] = result
+            if cache is not None:
+                cache.put(node, result)
+            results.append(result)
+        elif type(item) in RULES:
+            result = memo.get(item)
+            if result is None and cache is not None:
+                result = cache.get(item)
+            if result is not None:
+                results.append(result)
+                continue
+            if (polynomial and type(item) is Add and len(item.args) >= POLY_MIN_TERMS
+                    and all(map(is_monomial, item.args))):
+                result = simplify_univariate(item) if HAVE_NUMPY else None
+                if result is None:
+                    result = simplify_polynomial(item)
+                memo[item] = result
+                if cache is not None:
+                    cache.put(item, result)
+                results.append(result)
+                continue
+            stack.append((item, len(item.args)))
+            stack.extend(reversed(item.args))
+        else:
+            # Numbers, symbols and unknown node types are already simple
+            results.append(item)
+    return results
+
+def rebuild(node, args):
+    """Rebuild `node` from simplified operands and apply its rules."""
+    cls = type(node)
+    if all(new is old for new, old in zip(args, node.args)):
+        rebuilt = node
     else:
-        return expr
+        # Rebuilding flattens nested sums/products and restores canonical order
+        rebuilt = cls(*args)
+    if type(rebuilt) is not cls:
+        # The node collapsed to one of its (already simplified) operands
+        return rebuilt
+    return apply_rules(rebuilt)
+
+def build(cls, *args):
+    """Build cls(*args) from simplified operands and apply its rules once."""
+    node = cls(*args)
+    if type(node) is not cls:
+        return node
+    return apply_rules(node)
+
+def apply_rules(node):
+    """Apply the built-in rules for `node`, then any matching user rule."""
+    result = RULES[type(node)](node)
+    if USER_RULES.rules and type(result) in RULES:
+        rewritten = USER_RULES.rewrite(result)
+        # A rule giving back its input (such as a * b → b * a, which
+        # canonical order undoes) did not match
+        if rewritten is not None and rewritten is not result:
+            # A user rule's result is only known to have simplified leaves
+            return simplify(rewritten)
+    return result
+
+def split_coefficient(expr):
+    """Split a term into (numeric coefficient, non-numeric part)."""
+    if isinstance(expr, Mul) and isinstance(expr.args[0], Number):
+        if len(expr.args) == 2:
+            return expr.args[0].value, expr.args[1]
+        return expr.args[0].value, Mul(*expr.args[1:])
+    return 1, expr
 
 def simplify_add(expr):
     """Simplify addition expressions."""
-    # Simplify both operands first
-    left = simplify(expr.left)
-    right = simplify(expr.right)
-    
-    # Rule: x + 0 → x
-    if isinstance(right, Number) and right.value == 0:
-        return left
-    
-    if isinstance(left, Number) and left.value == 0:
-        return right
-    
-    # Rule: constant + constant → constant
-    if isinstance(left, Number) and isinstance(right, Number):
-        return Number(left.value + right.value)
-    
-    # Rule: like terms combination
-    # Handle cases like: 2*x + 3*x → 5*x
-    if (isinstance(left, Mul) and isinstance(right, Mul) and
-        isinstance(left.left, Number) and isinstance(right.left, Number)):
-        
-        # Check if they have the same symbolic part
-        if left.right == right.right:
-            new_coeff = left.left.value + right.left.value
-            if new_coeff == 0:
-                return Number(0)
-            elif new_coeff == 1:
-                return left.right
-            else:
-                return Mul(Number(new_coeff), left.right)
-    
-    # Handle cases like: x + x → 2*x
-    if left == right:
-        return Mul(Number(2), left)
-    
-    # Handle cases like: x + (1*x) → 2*x
-    if (isinstance(right, Mul) and isinstance(right.left, Number) and 
-        right.left.value == 1 and right.right == left):
-        return Mul(Number(2), left)
-    
-    if (isinstance(left, Mul) and isinstance(left.left, Number) and 
-        left.left.value == 1 and left.right == right):
-        return Mul(Number(2), right)
+    return simplify(expr)
+
+def add_rules(expr):
+    """Apply addition rules to a flat Add whose operands are simplified."""
+    # Rule: constant + constant → constant, x + 0 → x
+    constant = 0
+    constants = 0
+    
+    # Rule: like terms combination (2*x + 3*x → 5*x, x + x → 2*x)
+    # Terms are grouped in a dict keyed by their non-numeric part, so like
+    # terms combine wherever they sit in the sum
+    coefficients = {}
+    for arg in expr.args:
+        if isinstance(arg, Number):
+            constant = constant + arg.value
+            constants += 1
+            continue
+        coeff, term = split_coefficient(arg)
+        coefficients[term] = coefficients.get(term, 0) + coeff
+    combined = len(coefficients) < len(expr.args) - constants
+    
+    # Nothing to fold or combine: keep the node as it is
+    if not combined and constants == (1 if constant != 0 else 0):
+        return expr
     
-    # If no simplification rules apply, return the simplified expression
-    return Add(left, right)
+    terms = [scale(coeff, term) for term, coeff in coefficients.items() if coeff != 0]
+    if constant != 0:
+        terms.append(Number(constant))
+    return Add(*terms)
+
+def scale(coeff, term):
+    """Build coeff * term, dropping the coefficient when it is 1."""
+    if coeff == 1:
+        return term
+    return Mul(Number(coeff), term)
 
 def simplify_mul(expr):
     """Simplify multiplication expressions."""
-    # Simplify both operands first
-    left = simplify(expr.left)
-    right = simplify(expr.right)
-    
-    # Rule: x * 1 → x
-    if isinstance(right, Number) and right.value == 1:
-        return left
-    
-    if isinstance(left, Number) and left.value == 1:
-        return right
+    return simplify(expr)
+
+def split_power(expr):
+    """Split a factor into (base, exponent)."""
+    if isinstance(expr, Pow):
+        return expr.base, expr.exp
+    return expr, Number(1)
+
+def add_exponents(exponents):
+    """Sum a list of simplified exponents."""
+    total = 0
+    symbolic = []
+    for exp in exponents:
+        if isinstance(exp, Number):
+            total = total + exp.value
+        else:
+            symbolic.append(exp)
+    if not symbolic:
+        return Number(total)
+    exp = Add(*symbolic, Number(total))
+    return add_rules(exp) if isinstance(exp, Add) else exp
+
+def mul_rules(expr):
+    """Apply multiplication rules to a flat Mul whose operands are simplified."""
+    # Rule: constant * constant → constant
+    # Rule: x^a * x^b → x^(a+b), collecting exponents per base in one pass
+    coeff = 1
+    constants = 0
+    powers = {}      # base -> factors with that base, in order
+    merged = False
+    for arg in expr.args:
+        if isinstance(arg, Number):
+            coeff = coeff * arg.value
+            constants += 1
+            continue
+        base = arg.base if isinstance(arg, Pow) else arg
+        factors = powers.get(base)
+        if factors is None:
+            powers[base] = [arg]
+        else:
+            factors.append(arg)
+            merged = True
     
     # Rule: x * 0 → 0
-    if isinstance(right, Number) and right.value == 0:
+    if coeff == 0:
         return Number(0)
     
-    if isinstance(left, Number) and left.value == 0:
+    # Nothing to fold or merge: keep the node as it is
+    if not merged and constants == (0 if coeff == 1 else 1):
+        return expr
+    
+    factors = []
+    nested = False
+    for base, group in powers.items():
+        if len(group) == 1:
+            factors.append(group[0])
+            continue
+        factor = pow_rules(Pow(base, add_exponents([split_power(f)[1] for f in group])))
+        # Rule: x^0 → 1 drops the factor; other merged powers that fold to a
+        # constant, e.g. 2^x * 2^(1-x) → 2, join the coefficient
+        if isinstance(factor, Number):
+            coeff = coeff * factor.value
+            continue
+        nested = nested or isinstance(factor, Mul)
+        factors.append(factor)
+    
+    if coeff == 0:
         return Number(0)
     
-    # Rule: constant * constant → constant
-    if isinstance(left, Number) and isinstance(right, Number):
-        return Number(left.value * right.value)
-    
-    # Rule: constant * (constant * symbol) → (constant * symbol)
-    if (isinstance(left, Number) and isinstance(right, Mul) and
-        isinstance(right.left, Number)):
-        new_coeff = left.value * right.left.value
-        if new_coeff == 0:
-            return Number(0)
-        elif new_coeff == 1:
-            return right.right
-        else:
-            return Mul(Number(new_coeff), right.right)
+    # Rule: x * 1 → x
+    if coeff == 1:
+        result = Mul(*factors)
+    else:
+        result = Mul(Number(coeff), *factors)
     
-    # If no simplification rules apply, return the simplified expression
-    return Mul(left, right)
+    # A merged power may have collapsed to a product, e.g. (x*y)^2 * (x*y)^-1,
+    # whose factors can merge with the rest
+    if nested and isinstance(result, Mul):
+        return mul_rules(result)
+    return result
 
 def simplify_pow(expr):
     """Simplify power expressions."""
-    # Simplify both operands first
-    base = simplify(expr.base)
-    exp = simplify(expr.exp)
-    
+    return simplify(expr)
+
+def pow_rules(expr):
+    """
+    Apply power rules to a Pow whose operands are simplified.
+
+    The same rules as POW_RULES, checked directly: this runs on every power,
+    and the rule index only pays off for large rule sets.
+    """
+    base, exp = expr.args
+    if type(exp) is Number:
+        # Rule: x^1 → x
+        if exp.value == 1:
+            return base
+        # Rule: x^0 → 1
+        if exp.value == 0:
+            return Number(1)
+    if type(base) is Number:
+        # Rule: 1^x → 1
+        if base.value == 1:
+            return Number(1)
+        if type(exp) is Number:
+            # Rule: 0^x → 0 (for x > 0)
+            if base.value == 0 and exp.value > 0:
+                return Number(0)
+            # Rule: constant^constant → constant
+            try:
+                return Number(base.value ** exp.value)
+            except (OverflowError, ValueError):
+                pass
+    return expr
+
+def fold_power(bindings):
+    """constant^constant → constant, unless it overflows or is undefined."""
+    try:
+        return Number(bindings['base'].value ** bindings['exp'].value)
+    except (OverflowError, ValueError):
+        return None
+
+def number(name, test=None):
+    """A pattern variable for a Number whose value passes `test`."""
+    return Wild(name, Number, test and (lambda expr: test(expr.value)))
+
+_base = Wild('base')
+_exp = Wild('exp')
+
+# The power rules as patterns, tried in order. simplify() does not run them:
+# it calls their hand-written equivalent pow_rules(), and the rule index
+# only serves user rules. specialize.py compiles them from here.
+POW_RULES = RuleSet([
     # Rule: x^1 → x
-    if isinstance(exp, Number) and exp.value == 1:
-        return base
-    
+    Rule('pow-one', pattern(Pow, _base, Value(1)), _base),
     # Rule: x^0 → 1
-    if isinstance(exp, Number) and exp.value == 0:
-        return Number(1)
-    
+    Rule('pow-zero', pattern(Pow, _base, Value(0)), Number(1)),
     # Rule: 1^x → 1
-    if isinstance(base, Number) and base.value == 1:
-        return Number(1)
-    
+    Rule('one-pow', pattern(Pow, Value(1), _exp), Number(1)),
     # Rule: 0^x → 0 (for x > 0)
-    if isinstance(base, Number) and base.value == 0:
-        if isinstance(exp, Number) and exp.value > 0:
-            return Number(0)
-    
+    Rule('zero-pow', pattern(Pow, Value(0), number('exp', lambda n: n > 0)), Number(0)),
     # Rule: constant^constant → constant
-    if isinstance(base, Number) and isinstance(exp, Number):
-        try:
-            result = base.value ** exp.value
-            return Number(result)
-        except (OverflowError, ValueError):
-            # Handle cases like 0^0 or very large numbers
-            pass
-    
-    # If no simplification rules apply, return the simplified expression
-    return Pow(base, exp)
+    Rule('fold-pow', pattern(Pow, number('base'), number('exp')), fold_power),
+])
+
+# Rules added with register_rule(), tried on each node after the built-in ones
+USER_RULES = RuleSet()
+
+def register_rule(rule):
+    """
+    Add a rewrite.Rule that simplify() applies after the built-in rules.
+
+    Rules are indexed by the shape of their patterns, so a rule only costs
+    time on nodes it might match. Cached simplify() results are dropped.
+    """
+    USER_RULES.add(rule)
+    if _simplify_cache is not None:
+        _simplify_cache.clear()
+    return rule
+
+def clear_user_rules():
+    """Remove every rule added with register_rule()."""
+    global USER_RULES
+    USER_RULES = RuleSet()
+    if _simplify_cache is not None:
+        _simplify_cache.clear()
+
+# Rule set for each composite node type, applied bottom-up by simplify()
+RULES = {
+    Add: add_rules,
+    Mul: mul_rules,
+    Pow: pow_rules,
+}
+
+# RULES with the power rules in their pattern form, for specialize.py,
+# which compiles this table into a module. Entries are a procedure, or a
+# RuleSet tried in order.
+RULE_TABLE = {
+    Add: add_rules,
+    Mul: mul_rules,
+    Pow: POW_RULES,
+}
 
 def collect_like_terms(expr):
     """
     Collect like terms in an addition expression.
-    This is a more advanced simplification that groups terms with the same variables.
+    
+    Operands are simplified and nested sums flattened, then terms are grouped
+    in a dict keyed by their non-numeric part (interned, so hashing and
+    comparison are O(1)) while the coefficients are added up. Grouping is
+    O(n) expected in the number of terms; only the collected result is
+    sorted into canonical order.
     """
     if not isinstance(expr, Add):
         return expr
     
-    # For now, implement basic like-term collection
-    # This can be expanded later for more complex cases
-    return simplify(expr)
+    coefficients = {}
+    constant = 0
+    pending = simplify_all(expr.args)
+    while pending:
+        arg = pending.pop()
+        if isinstance(arg, Add):
+            pending.extend(arg.args)
+        elif isinstance(arg, Number):
+            constant = constant + arg.value
+        else:
+            coeff, term = split_coefficient(arg)
+            coefficients[term] = coefficients.get(term, 0) + coeff
+    
+    terms = [scale(coeff, term) for term, coeff in coefficients.items()
+             if coeff != 0]
+    terms = [scale(coeff, term) for term, coeff in coefficients.items() if coeff != 0]
+    if constant != 0:
+        terms.append(Number(constant))
+    return Add(*terms)
 
 # Example usage and testing
 if __name__ == "__main__":
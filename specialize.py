@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Specialized simplifier generation for MiniSym
+Compiles the simplification rule table (simplify.RULE_TABLE and the rules
+added with register_rule()) into one generated Python module, cached on
+disk.
+"""
+
+import hashlib
+import importlib.util
+import math
+import os
+
+from minisym_ast import Pow
+from rewrite import RuleSet, Wild, Rest, Value, COMMUTATIVE, NODE_TYPES, operand_anchor
+import simplify
+
+# Bumped whenever the generated code changes for an unchanged rule table
+GENERATOR_VERSION = 3
+
+def default_cache_dir():
+    """$MINISYM_CACHE_DIR, or ~/.cache/minisym."""
+    return os.environ.get('MINISYM_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'minisym')
+
+def build_simplifier(cache_dir=None):
+    """
+    Load the specialized simplifier for the current rules.
+
+    The rule table is turned into Python source: a dict from node class to
+    a function per class, with every positional pattern inlined as direct
+    type, identity and value checks, and the simplify() driver itself.
+    Callables and literal nodes the rules refer to are bound when the
+    module is loaded, so the source depends only on the rules' structure.
+    It is written to `cache_dir` under a hash of its text, and rewritten
+    (and recompiled) only when the rules change; otherwise the cached
+    file and its bytecode are reused. The module's `rebuilt` attribute
+    says which happened.
+
+    The returned module's simplify() gives the same results as
+    simplify.simplify() with the same rules, without the global cache.
+    """
+    source, constants = generate_source(simplify.RULE_TABLE, simplify.USER_RULES)
+    digest = hashlib.sha256(source.encode()).hexdigest()[:16]
+    directory = cache_dir or default_cache_dir()
+    path = os.path.join(directory, f"simplifier_{digest}.py")
+    rebuilt = not os.path.exists(path)
+    if rebuilt:
+        os.makedirs(directory, exist_ok=True)
+        # Written under a temporary name first, so that concurrent builds
+        # never import a half-written file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            f.write(source)
+        os.replace(temporary, path)
+    spec = importlib.util.spec_from_file_location(f"minisym_simplifier_{digest}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.C = constants
+    module.rebuilt = rebuilt
+    return module
+
+class Generator:
+    """Accumulates generated lines and the constants they refer to."""
+
+    def __init__(self):
+        self.lines = []
+        self.constants = []
+        self.slots = {}
+
+    def emit(self, line, indent=0):
+        self.lines.append('    ' * indent + line)
+
+    def constant(self, value):
+        """Source for a reference to `value` through the constants list."""
+        slot = self.slots.get(id(value))
+        if slot is None:
+            slot = self.slots[id(value)] = len(self.constants)
+            self.constants.append(value)
+        return f"C[{slot}]"
+
+    def number(self, value):
+        """Source for a numeric literal."""
+        if type(value) is int or (type(value) is float and math.isfinite(value)):
+            return repr(value)
+        return self.constant(value)
+
+def generate_source(table, user_rules):
+    """Source of the specialized module for `table` and `user_rules`."""
+    gen = Generator()
+    gen.emit("# Generated by specialize.py from the MiniSym rule table. Do not edit:")
+    gen.emit("# it is regenerated whenever the rules change.")
+    gen.emit(f"# Generator version {GENERATOR_VERSION}")
+    gen.emit("from minisym_ast import Number, Symbol, Add, Mul, Pow")
+    gen.emit("from poly import is_monomial, simplify_polynomial")
+    gen.emit("from dense import HAVE_NUMPY, simplify_univariate")
+    gen.emit("")
+    gen.emit("# Callables and literal nodes of the rules, bound by the loader")
+    gen.emit("C = None")
+    gen.emit("")
+    gen.emit(f"POLY_MIN_TERMS = {simplify.POLY_MIN_TERMS}")
+
+    for cls, entry in table.items():
+        gen.emit("")
+        gen.emit(f"def builtin_{cls.__name__}(expr):")
+        if isinstance(entry, RuleSet):
+            emit_rules(gen, cls, entry.rules, builtin=True)
+        else:
+            gen.emit(f"return {gen.constant(entry)}(expr)", 1)
+
+    # User rules only ever see results of the classes in the table
+    by_class = {}
+    for rule in user_rules.rules:
+        if rule.pattern[0] in table:
+            by_class.setdefault(rule.pattern[0], []).append(rule)
+    for cls, rules in by_class.items():
+        gen.emit("")
+        gen.emit(f"def user_{cls.__name__}(expr):")
+        emit_rules(gen, cls, rules, builtin=False)
+
+    gen.emit("")
+    gen.emit("# Rules per node class")
+    gen.emit("BUILTIN = {" + ", ".join(f"{cls.__name__}: builtin_{cls.__name__}"
+                                     for cls in table) + "}")
+    gen.emit("USER = {" + ", ".join(f"{cls.__name__}: user_{cls.__name__}"
+                                  for cls in by_class) + "}")
+    gen.lines.extend(DRIVER.splitlines())
+    return '\n'.join(gen.lines) + '\n', gen.constants
+
+def emit_rules(gen, cls, rules, builtin):
+    """
+    Body of a rules function for `cls`: try each rule in order and return
+    the first result. Built-in functions return `expr` when nothing
+    applies, user ones None.
+    """
+    if cls is Pow:
+        gen.emit("a0, a1 = expr.args", 1)
+        operands = ["a0", "a1"]
+    else:
+        gen.emit("args = expr.args", 1)
+        operands = None
+    for rule in rules:
+        pattern = rule.pattern
+        if cls is Pow and len(pattern) != 3:
+            continue
+        gen.emit(f"# {' '.join(str(rule.name).split())}", 1)
+        if cls in COMMUTATIVE or any(type(arg) is tuple and arg[0] in COMMUTATIVE
+                                     for arg in walk(pattern)):
+            # Operand multisets are searched by the rule itself, behind an
+            # inlined test for an operand every match needs
+            guard = anchor_condition(gen, pattern, "expr")
+            gen.emit(f"if {guard}:" if guard else "if True:", 1)
+            gen.emit(f"result = {gen.constant(rule.apply)}(expr)", 2)
+            gen.emit("if result is not None:", 2)
+            gen.emit("return result", 3)
+            continue
+        conditions = []
+        bindings = {}
+        accesses = operands or [f"args[{i}]" for i in range(len(pattern) - 1)]
+        if operands is None:
+            conditions.append(f"len(args) == {len(pattern) - 1}")
+        for access, arg in zip(accesses, pattern[1:]):
+            match_conditions(gen, arg, access, bindings, conditions)
+        test = " and ".join(conditions) or "True"
+        gen.emit(f"if {test}:", 1)
+        if callable(rule.replacement):
+            names = ", ".join(f"{name!r}: {access}" for name, access in bindings.items())
+            gen.emit(f"result = {gen.constant(rule.replacement)}({{{names}}})", 2)
+            gen.emit("if result is not None:", 2)
+            gen.emit("return result", 3)
+        else:
+            gen.emit(f"return {template_source(gen, rule.replacement, bindings)}", 2)
+    gen.emit("return expr" if builtin else "return None", 1)
+
+def walk(pattern):
+    """Every sub-pattern of `pattern`, itself included."""
+    stack = [pattern]
+    while stack:
+        item = stack.pop()
+        yield item
+        if type(item) is tuple:
+            stack.extend(item[1:])
+
+def match_conditions(gen, pattern, access, bindings, conditions):
+    """Append the checks for `pattern` matching the node at `access`."""
+    kind = type(pattern)
+    if kind is Wild:
+        bound = bindings.get(pattern.name)
+        if bound is not None:
+            conditions.append(f"{access} is {bound}")
+            return
+        bindings[pattern.name] = access
+        if pattern.kind in NODE_TYPES:
+            conditions.append(f"type({access}) is {pattern.kind.__name__}")
+        elif pattern.kind is not None:
+            conditions.append(f"isinstance({access}, {gen.constant(pattern.kind)})")
+        if pattern.test is not None:
+            conditions.append(f"{gen.constant(pattern.test)}({access})")
+    elif kind is Value:
+        conditions.append(f"type({access}) is Number")
+        conditions.append(f"{access}.value == {gen.number(pattern.value)}")
+    elif kind is tuple:
+        cls, args = pattern[0], pattern[1:]
+        conditions.append(f"type({access}) is {cls.__name__}")
+        if cls is not Pow:
+            conditions.append(f"len({access}.args) == {len(args)}")
+        for i, arg in enumerate(args):
+            match_conditions(gen, arg, f"{access}.args[{i}]", bindings, conditions)
+    else:
+        conditions.append(f"{access} is {gen.constant(pattern)}")
+
+def template_source(gen, template, bindings):
+    """Source building the replacement `template` from the bound accesses."""
+    kind = type(template)
+    if kind is Wild:
+        return bindings[template.name]
+    if kind is Value:
+        return f"Number({gen.number(template.value)})"
+    if kind is tuple:
+        args = []
+        for arg in template[1:]:
+            if type(arg) is Rest:
+                raise ValueError("Rest can only be used in sum and product patterns")
+            args.append(template_source(gen, arg, bindings))
+        return f"{template[0].__name__}({', '.join(args)})"
+    return gen.constant(template)
+
+def anchor_condition(gen, pattern, access):
+    """A cheap test that `access` has an operand every match needs, or None."""
+    if pattern[0] not in COMMUTATIVE:
+        return None
+    anchor = operand_anchor(pattern)
+    if anchor is None:
+        return None
+    if type(anchor) is tuple and anchor[0] == 'type':
+        return f"any(type(arg) is {anchor[1].__name__} for arg in {access}.args)"
+    if type(anchor) is tuple and anchor[0] == 'value':
+        return (f"any(type(arg) is Number and arg.value == {gen.number(anchor[1])} "
+                f"for arg in {access}.args)")
+    if type(anchor) is tuple:
+        # A sub-pattern's shape: its head type is necessary
+        return f"any(type(arg) is {anchor[0].__name__} for arg in {access}.args)"
+    return f"{gen.constant(anchor)} in {access}.args"
+
+# The driver of the generated module: simplify.simplify_all() without the
+# global cache, calling the generated rule functions directly
+DRIVER = '''
+def apply_rules(node):
+    result = BUILTIN[type(node)](node)
+    if USER:
+        user = USER.get(type(result))
+        if user is not None:
+            rewritten = user(result)
+            if rewritten is not None and rewritten is not result:
+                return simplify(rewritten)
+    return result
+
+def rebuild(node, args):
+    cls = type(node)
+    if all(new is old for new, old in zip(args, node.args)):
+        rebuilt = node
+    else:
+        rebuilt = cls(*args)
+    if type(rebuilt) is not cls:
+        return rebuilt
+    return apply_rules(rebuilt)
+
+def simplify(expr):
+    return simplify_all([expr])[0]
+
+def simplify_all(exprs):
+    memo = {}
+    stack = list(reversed(exprs))
+    results = []
+    while stack:
+        item = stack.pop()
+        if type(item) is tuple:
+            node, arity = item
+            args = results[len(results) - arity:]
+            del results[len(results) - arity:]
+            result = rebuild(node, args)
+            memo[node] = result
+            results.append(result)
+        elif type(item) in BUILTIN:
+            result = memo.get(item)
+            if result is not None:
+                results.append(result)
+                continue
+            # The polynomial path stands in for the built-in rules only
+            if (not USER and type(item) is Add and len(item.args) >= POLY_MIN_TERMS
+                    and all(map(is_monomial, item.args))):
+                result = simplify_univariate(item) if HAVE_NUMPY else None
+                if result is None:
+                    result = simplify_polynomial(item)
+                memo[item] = result
+                results.append(result)
+                continue
+            stack.append((item, len(item.args)))
+            stack.extend(reversed(item.args))
+        else:
+            results.append(item)
+    return results
+'''
+
+# Example usage and testing
+if __name__ == "__main__":
+    import tempfile
+    from parser import parse_expression
+
+    module = build_simplifier(tempfile.mkdtemp())
+    print(f"Generated {module.__file__} (rebuilt: {module.rebuilt})\n")
+    with open(module.__file__) as f:
+        print(f.read())
+    for text in ["x^1 + 2^3", "(x*y)^0 + 2*x + 3*x", "x*x*x"]:
+        print(f"'{text}' → {module.simplify(parse_expression(text))}")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Expression tapes for MiniSym
+Lowers expressions to a flat list of register instructions held in an
+array, and runs them with a small interpreter loop.
+"""
+
+import marshal
+import operator
+import sys
+from array import array
+
+from minisym_ast import Expr, Number, Symbol, Add, Mul, Pow
+from poly import free_symbols
+from lambdify import references
+
+# Instruction set: every instruction is `dst = a <op> b` over registers
+ADD, MUL, POW = range(3)
+OPCODES = {Add: ADD, Mul: MUL, Pow: POW}
+FUNCTIONS = (operator.add, operator.mul, operator.pow)
+
+# Bumped whenever the serialized layout changes
+TAPE_VERSION = 1
+
+class Tape:
+    """
+    A register program evaluating one or more expressions.
+
+    Registers hold, in order, the inputs (one per symbol), the constants,
+    and the temporaries. `code` is an array of unsigned ints, four per
+    instruction: opcode, destination, left operand, right operand. Each
+    unique subexpression is computed by one instruction (a sum or product
+    of k operands by k - 1), so the tape is common-subexpression free by
+    construction, and a temporary register is reused as soon as its last
+    reader has run. `outputs` are the registers holding the results.
+
+    Tapes are plain data: to_bytes() and from_bytes() (and pickling) move
+    them between processes without the source expression.
+    """
+
+    def __init__(self, symbols, constants, code, outputs, registers, single=True):
+        self.symbols = tuple(symbols)
+        self.constants = tuple(constants)
+        self.code = code
+        self.outputs = tuple(outputs)
+        self.registers = registers
+        self.single = single
+        # Decoded once so the interpreter loop is a plain tuple unpack
+        self.program = [(FUNCTIONS[op], dst, a, b)
+                        for op, dst, a, b in zip(code[0::4], code[1::4], code[2::4], code[3::4])]
+
+    @classmethod
+    def from_exprs(cls, exprs, symbols=None):
+        """
+        Lower `exprs` (one expression, or a sequence of them) to a tape whose
+        inputs are `symbols`, by default every symbol in `exprs` sorted by name.
+        """
+        single = isinstance(exprs, Expr)
+        outputs = (exprs,) if single else tuple(exprs)
+        if symbols is None:
+            symbols = free_symbols(Add(*outputs)) if outputs else ()
+        symbols = tuple([Symbol(sym) if isinstance(sym, str) else sym for sym in symbols])
+        if len(set(symbols)) != len(symbols):
+            raise ValueError("Repeated symbol in the inputs")
+
+        order, _ = references(outputs)
+        last_use = {}
+        for i, node in enumerate(order):
+            for arg in node.args:
+                last_use[arg] = i
+        for expr in outputs:
+            last_use[expr] = len(order)
+
+        register = {sym: i for i, sym in enumerate(symbols)}
+        constants = []
+        for node in order:
+            if type(node) is Number:
+                register[node] = len(symbols) + len(constants)
+                constants.append(node.value)
+            elif type(node) is Symbol and node not in register:
+                raise ValueError(f"{node} is not among the symbols {list(map(str, symbols))}")
+        first_temporary = len(symbols) + len(constants)
+
+        code = array('I')
+        free = []
+        temporaries = 0
+        for i, node in enumerate(order):
+            kind = type(node)
+            if kind is Number or kind is Symbol:
+                continue
+            if kind not in OPCODES:
+                raise ValueError(f"Cannot compile {kind.__name__}")
+            op = OPCODES[kind]
+            args = node.args
+            dying = [arg for arg in dict.fromkeys(args)
+                     if last_use[arg] == i and register[arg] >= first_temporary]
+            # Write into the register of an operand that dies here. Sums and
+            # products are reordered to read that operand first, so no later
+            # instruction of this node reads it after it has been overwritten.
+            reuse = [arg for arg in dying if args.count(arg) == 1]
+            if reuse:
+                dst = register[reuse[0]]
+                dying.remove(reuse[0])
+                if op != POW:
+                    args = (reuse[0],) + tuple([arg for arg in args if arg is not reuse[0]])
+            elif free:
+                dst = free.pop()
+            else:
+                dst = first_temporary + temporaries
+                temporaries += 1
+            register[node] = dst
+            if op == POW and type(args[1]) is Number and args[1].value == 2:
+                # Squares are the commonest power, and x*x beats x**2
+                code.extend((MUL, dst, register[args[0]], register[args[0]]))
+            else:
+                code.extend((op, dst, register[args[0]], register[args[1]]))
+                for arg in args[2:]:
+                    code.extend((op, dst, dst, register[arg]))
+            free.extend([register[arg] for arg in dying])
+
+        return cls(symbols, constants, code, [register[expr] for expr in outputs],
+                   first_temporary + temporaries, single)
+
+    def __len__(self):
+        """Number of instructions."""
+        return len(self.code) // 4
+
+    def __call__(self, *values):
+        """Evaluate at one point, given a value per symbol."""
+        if len(values) != len(self.symbols):
+            raise TypeError(f"Expected {len(self.symbols)} values, got {len(values)}")
+        registers = [*values, *self.constants]
+        registers.extend([None] * (self.registers - len(registers)))
+        for function, dst, a, b in self.program:
+            registers[dst] = function(registers[a], registers[b])
+        if self.single:
+            return registers[self.outputs[0]]
+        return tuple([registers[i] for i in self.outputs])
+
+    def evaluate_batch(self, *columns):
+        """
+        Evaluate at many points: one sequence of values per symbol (a
+        scalar stands for the same value at every point).
+
+        Runs instruction by instruction over whole columns, so the
+        interpreter overhead is paid once per instruction rather than once
+        per instruction and point. Returns a list per output.
+        """
+        if len(columns) != len(self.symbols):
+            raise TypeError(f"Expected {len(self.symbols)} columns, got {len(columns)}")
+        lengths = {len(column) for column in columns if hasattr(column, '__len__')}
+        if len(lengths) > 1:
+            raise ValueError("Columns must all have the same length")
+        rows = lengths.pop() if lengths else 1
+        registers = [list(column) if hasattr(column, '__len__') else [column] * rows
+                     for column in columns]
+        registers.extend([[value] * rows for value in self.constants])
+        registers.extend([None] * (self.registers - len(registers)))
+        for function, dst, a, b in self.program:
+            registers[dst] = list(map(function, registers[a], registers[b]))
+        if self.single:
+            return registers[self.outputs[0]]
+        return tuple([registers[i] for i in self.outputs])
+
+    def to_bytes(self):
+        """Serialize the tape; see from_bytes()."""
+        return marshal.dumps((TAPE_VERSION, sys.byteorder,
+                              tuple([sym.name for sym in self.symbols]), self.constants,
+                              self.code.typecode, self.code.tobytes(), self.outputs,
+                              self.registers, self.single))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a tape serialized by to_bytes()."""
+        (version, byteorder, names, constants, typecode, code_bytes,
+         outputs, registers, single) = marshal.loads(data)
+        if version != TAPE_VERSION:
+            raise ValueError(f"Unsupported tape version {version}")
+        code = array(typecode)
+        code.frombytes(code_bytes)
+        if byteorder != sys.byteorder:
+            code.byteswap()
+        return cls([Symbol(name) for name in names], constants, code,
+                   outputs, registers, single)
+
+    def __reduce__(self):
+        return (Tape.from_bytes, (self.to_bytes(),))
+
+    def __repr__(self):
+        return (f"Tape({len(self)} instructions, {self.registers} registers, "
+                f"symbols={[sym.name for sym in self.symbols]})")
+
+    def disassemble(self):
+        """The instructions as readable text, one per line."""
+        names = [sym.name for sym in self.symbols]
+        names += [repr(value) for value in self.constants]
+        names += [f"r{i}" for i in range(len(names), self.registers)]
+        lines = []
+        for op, dst, a, b in zip(self.code[0::4], self.code[1::4],
+                                 self.code[2::4], self.code[3::4]):
+            symbol = ('+', '*', '**')[op]
+            lines.append(f"{names[dst]} = {names[a]} {symbol} {names[b]}")
+        lines.append(f"return {', '.join([names[i] for i in self.outputs])}")
+        return '\n'.join(lines)
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    expr = parse_expression("(x + y)^2 * (x + y + 1) + (x + y)^2")
+    tape = Tape.from_exprs(expr)
+    print(tape)
+    print(tape.disassemble())
+    print(f"tape(1, 2) = {tape(1, 2)}")
+    print(f"batch: {tape.evaluate_batch([0, 1, 2], 2)}")
@@ -25,10 +25,10 @@ def test_basic_construction():
     assert str(expr) == "(x + 42)"
     assert repr(expr) == "Add(Symbol('x'), Number(42))"
     
-    # Test Mul
+    # Test Mul (numeric factors are ordered first)
     expr = Mul(x, n)
-    assert str(expr) == "(x * 42)"
-    assert repr(expr) == "Mul(Symbol('x'), Number(42))"
+    assert str(expr) == "(42 * x)"
+    assert repr(expr) == "Mul(Number(42), Symbol('x'))"
     
     # Test Pow
     expr = Pow(x, n)
@@ -89,28 +89,26 @@ def test_operator_overloads():
     # Test addition
     expr = x + y
     assert isinstance(expr, Add)
-    assert expr.left == x
-    assert expr.right == y
+    assert expr.args == (x, y)
     
     # Test addition with numbers
     expr = x + 5
     assert isinstance(expr, Add)
-    assert expr.left == x
-    assert isinstance(expr.right, Number)
-    assert expr.right.value == 5
+    assert expr.args[0] == x
+    assert isinstance(expr.args[1], Number)
+    assert expr.args[1].value == 5
     
     # Test multiplication
     expr = x * y
     assert isinstance(expr, Mul)
-    assert expr.left == x
-    assert expr.right == y
+    assert expr.args == (x, y)
     
     # Test multiplication with numbers
     expr = x * 3
     assert isinstance(expr, Mul)
-    assert expr.left == x
-    assert isinstance(expr.right, Number)
-    assert expr.right.value == 3
+    assert isinstance(expr.args[0], Number)
+    assert expr.args[0].value == 3
+    assert expr.args[1] == x
     
     # Test power
     expr = x ** y
@@ -136,16 +134,117 @@ def test_complex_expressions():
     
     # Test nested expressions
     expr = x + y * 2
-    assert str(expr) == "(x + (y * 2))"
+    assert str(expr) == "(x + (2 * y))"
     
     expr = (x + y) * 2
-    assert str(expr) == "((x + y) * 2)"
+    assert str(expr) == "(2 * (x + y))"
     
     expr = x ** 2 + y ** 2
     assert str(expr) == "((x ** 2) + (y ** 2))"
     
     print("✓ Complex expression tests passed!")
 
+def test_interning():
+    """Test hash-consing: identical subtrees are shared and hashable."""
+    print("Testing interning...")
+    
+    x = Symbol('x')
+    
+    # Identical constructions return the same object
+    assert Symbol('x') is x
+    assert Number(2) is Number(2)
+    assert x ** 2 is Pow(Symbol('x'), Number(2))
+    assert Mul(Number(2), x) + x ** 2 is Add(Mul(Number(2), x), Pow(x, Number(2)))
+    
+    # Numeric types are structurally distinct (they print differently)
+    assert Number(5) is not Number(5.0)
+    assert Number(5) != Number(5.0)
+    assert str(Number(5.0)) == "5.0"
+    assert Add(x, Number(5)) != Add(x, Number(5.0))
+    
+    # Nodes are usable as dict keys and set members
+    counts = {}
+    for term in [x ** 2, Mul(Number(2), x), Pow(x, Number(2))]:
+        counts[term] = counts.get(term, 0) + 1
+    assert counts[x ** 2] == 2
+    assert len({Add(x, Number(1)), x + 1, Add(x, Number(2))}) == 2
+    
+    print("✓ Interning tests passed!")
+
+def test_immutability():
+    """Test that nodes are slot-based and cannot be modified."""
+    print("Testing immutability...")
+    
+    x = Symbol('x')
+    expr = Add(x, Number(1))
+    
+    for node, field in [(expr, 'left'), (Pow(x, Number(2)), 'exp'),
+                        (Number(3), 'value'), (x, 'name')]:
+        try:
+            setattr(node, field, Number(0))
+            assert False, f"Should not be able to set {field}"
+        except AttributeError:
+            pass
+        try:
+            delattr(node, field)
+            assert False, f"Should not be able to delete {field}"
+        except AttributeError:
+            pass
+    
+    # No per-instance __dict__, so arbitrary attributes are rejected too
+    assert not hasattr(expr, '__dict__')
+    try:
+        expr.note = "cached"
+        assert False, "Should not be able to add attributes"
+    except AttributeError:
+        pass
+    
+    # Copies and pickles come back as the shared interned node
+    import copy, pickle
+    assert copy.deepcopy(expr) is expr
+    assert pickle.loads(pickle.dumps(expr)) is expr
+    
+    print("✓ Immutability tests passed!")
+
+def test_flattening_and_order():
+    """Test n-ary Add/Mul flattening and canonical operand order."""
+    print("Testing flattening and canonical order...")
+    
+    x = Symbol('x')
+    y = Symbol('y')
+    z = Symbol('z')
+    
+    # Nested sums and products are flattened
+    expr = Add(Add(x, y), Add(z, Number(1)))
+    assert expr.args == (x, y, z, Number(1))
+    assert str(expr) == "(x + y + z + 1)"
+    expr = Mul(Mul(x, y), Mul(Number(2), z))
+    assert expr.args == (Number(2), x, y, z)
+    
+    # Operand order does not depend on construction order
+    assert x + y + z is z + y + x
+    assert x * 2 * y is y * (x * 2)
+    # Also for a term and the same term with a coefficient or exponent of 1
+    assert Add(x, Mul(Number(1), x)) is Add(Mul(Number(1), x), x)
+    assert Mul(x, x ** 1) is Mul(x ** 1, x)
+    
+    # Like terms and like bases are adjacent
+    expr = Add(Mul(Number(2), x), y, Mul(Number(3), x), Number(4), x)
+    assert str(expr) == "(x + (2 * x) + (3 * x) + y + 4)"
+    expr = Mul(y, x ** 2, Number(3), x)
+    assert str(expr) == "(3 * x * (x ** 2) * y)"
+    
+    # Degenerate sizes collapse
+    assert Add(x) is x
+    assert Add() is Number(0)
+    assert Mul() is Number(1)
+    
+    # Deep construction no longer nests
+    expr = Add(*[Mul(Number(i), x) for i in range(1, 5001)])
+    assert len(expr.args) == 5000
+    
+    print("✓ Flattening and canonical order tests passed!")
+
 if __name__ == "__main__":
     print("🧪 Running Phase 1 Tests...\n")
     
@@ -153,6 +252,9 @@ if __name__ == "__main__":
     test_equality()
     test_operator_overloads()
     test_complex_expressions()
+    test_interning()
+    test_immutability()
+    test_flattening_and_order()
     
     print("\n🎉 All Phase 1 tests passed! Your core expression engine is working correctly.")
     print("\nNext steps:")
@@ -5,7 +5,7 @@ Tests tokenization, parsing, and error handling.
 """
 
 from minisym_ast import Number, Symbol, Add, Mul, Pow
-from parser import Tokenizer, Parser, parse_expression, Token
+from parser import Tokenizer, Parser, IterativeParser, parse_expression, Token, iter_tokens
 
 def test_tokenizer():
     """Test the tokenizer functionality."""
@@ -177,6 +177,16 @@ def test_complex_expressions():
     expected = Add(Mul(Number(2.5), Symbol('x')), Number(3.7))
     assert str(expr) == str(expected)
     
+    # Test that chains of + and * parse into flat n-ary nodes
+    expr = parse_expression("a + b - c + 2*d*e/f")
+    assert isinstance(expr, Add) and len(expr.args) == 4
+    assert str(expr) == "(a + b + (-1 * c) + (2 * d * e * (f ** -1)))"
+    
+    # Test subtraction of a number
+    expr = parse_expression("x - 3")
+    expected = Add(Symbol('x'), Number(-3))
+    assert str(expr) == str(expected)
+    
     print("✓ Complex expression tests passed!")
 
 def test_parser_integration():
@@ -202,6 +212,79 @@ def test_parser_integration():
     
     print("✓ Parser integration tests passed!")
 
+def test_fast_tokenizer():
+    """Test the regex-based streaming tokenizer against Tokenizer."""
+    print("Testing fast tokenizer...")
+    
+    inputs = ["x + 2", "3.14 + 42", "my_var + x", "  x   +   2  ",
+              "(x1 + y_2) * 3 ^ -z / 4.5", "a-b*c^d"]
+    for text in inputs:
+        expected = [(t.type, t.value, t.position) for t in Tokenizer(text).tokens]
+        assert list(iter_tokens(text)) == expected
+        assert str(Parser(text).parse()) == str(Parser(text, fast=False).parse())
+    
+    # Tokens are produced lazily, before later errors are reached
+    tokens = iter_tokens("x + @")
+    assert next(tokens) == ('IDENTIFIER', 'x', 0)
+    assert next(tokens) == ('OPERATOR', '+', 2)
+    
+    # Errors report the same messages and positions as Tokenizer
+    for text in ["x @ 2", "x + 2.3.4", "1 + $"]:
+        try:
+            Tokenizer(text)
+            assert False, "Tokenizer should have raised ValueError"
+        except ValueError as e:
+            expected = str(e)
+        try:
+            list(iter_tokens(text))
+            assert False, "iter_tokens should have raised ValueError"
+        except ValueError as e:
+            assert str(e) == expected
+    
+    print("✓ Fast tokenizer tests passed!")
+
+def outcome(parser_class, text):
+    """The AST a parser builds for `text`, or the error message it raises."""
+    try:
+        return parser_class(text).parse()
+    except ValueError as e:
+        return str(e)
+
+def test_iterative_parser():
+    """Test that the iterative parser matches recursive descent exactly."""
+    print("Testing iterative parser...")
+    import random
+    
+    cases = ["x + 2", "2 + 3 * x", "x - y - 3", "-x^2", "-2^2", "2^-3^2",
+             "--x", "a/b/2", "x / 0", "(x + y) * -(a - b) ^ 2 / c",
+             "", "(x + 2", "x + 2)", "x 2", "(x 2)", "x ^", "x + )", "-",
+             "x @ 2", "x + 2.3.4", "()", "((a))(b)"]
+    rng = random.Random(42)
+    pieces = ["x", "y", "2", "0.5", "+", "-", "*", "/", "^", "(", ")", " "]
+    for _ in range(3000):
+        cases.append("".join(rng.choice(pieces) for _ in range(rng.randint(1, 12))))
+    for text in cases:
+        assert outcome(IterativeParser, text) == outcome(Parser, text), text
+    
+    # Lexical errors come before syntax errors, as with the eager Tokenizer
+    eager = lambda text: Parser(text, fast=False)
+    for text in [" x)$y1$", "x ) @", "(x 1.2.3", "x1. + )", "x1.5 + y)"]:
+        expected = outcome(eager, text)
+        assert outcome(Parser, text) == expected, text
+        assert outcome(IterativeParser, text) == expected, text
+    
+    # Nesting far beyond the interpreter recursion limit
+    depth = 20000
+    expr = parse_expression("(" * depth + "x" + ")" * depth)
+    assert expr == Symbol('x')
+    expr = parse_expression("^".join(["x"] * depth))
+    for _ in range(depth - 1):
+        assert isinstance(expr, Pow) and expr.base == Symbol('x')
+        expr = expr.exp
+    assert expr == Symbol('x')
+    
+    print("✓ Iterative parser tests passed!")
+
 if __name__ == "__main__":
     print("🧪 Running Phase 2 Tests...\n")
     
@@ -212,6 +295,8 @@ if __name__ == "__main__":
     test_error_handling()
     test_complex_expressions()
     test_parser_integration()
+    test_fast_tokenizer()
+    test_iterative_parser()
     
     print("\n🎉 All Phase 2 tests passed! Your parser is working correctly.")
     print("\nNext steps:")
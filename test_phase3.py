@@ -6,7 +6,7 @@ Tests algebraic simplification rules and constant folding.
 
 from minisym_ast import Number, Symbol, Add, Mul, Pow
 from parser import parse_expression
-from simplify import simplify
+from simplify import simplify, collect_like_terms
 
 def test_identity_rules():
     """Test identity rules (x + 0 → x, x * 1 → x)."""
@@ -147,7 +147,7 @@ def test_nested_simplification():
     
     expr = parse_expression("x * (2 + 3)")
     simplified = simplify(expr)
-    assert str(simplified) == "(x * 5)"
+    assert str(simplified) == "(5 * x)"
     
     print("✓ Nested simplification tests passed!")
 
@@ -158,9 +158,17 @@ def test_complex_simplifications():
     # Multiple like terms
     expr = parse_expression("2*x + 3*x + 4*x")
     simplified = simplify(expr)
-    # This should combine to 9*x, but our current implementation
-    # only handles pairs, so it will be ((2*x + 3*x) + 4*x)
-    # We'll improve this in the next iteration
+    assert str(simplified) == "(9 * x)"
+    
+    # Like terms that are not neighbours
+    expr = parse_expression("2*x + y + 3*x")
+    simplified = simplify(expr)
+    assert str(simplified) == "((5 * x) + y)"
+    
+    # Subtraction
+    expr = parse_expression("x + 5 - x - 2")
+    simplified = simplify(expr)
+    assert str(simplified) == "3"
     
     # Mixed expressions
     expr = parse_expression("(x + 0) * (y + 0) + (2 + 3)")
@@ -216,6 +224,98 @@ def test_simplification_integration():
     
     print("✓ Simplification integration tests passed!")
 
+def test_deep_expressions():
+    """Test that simplification handles arbitrarily deep expressions."""
+    print("Testing deep expressions...")
+    
+    x = Symbol('x')
+    
+    # Far deeper than the interpreter recursion limit
+    expr = x
+    for _ in range(20000):
+        expr = Add(Mul(expr, Number(1)), Number(0))
+    assert simplify(expr) is x
+    
+    expr = x
+    for _ in range(20000):
+        expr = Pow(expr, Number(1))
+    assert simplify(expr) is x
+    
+    # Nested sums that keep their shape still simplify every level
+    expr = x
+    for _ in range(5000):
+        expr = Mul(Number(2), Add(expr, Number(1), Number(0)))
+    simplified = simplify(expr)
+    depth = 0
+    while not isinstance(simplified, Symbol):
+        assert isinstance(simplified, Mul) and simplified.args[0] == Number(2)
+        inner = simplified.args[1]
+        assert inner.args[-1] == Number(1)
+        simplified = inner.args[0]
+        depth += 1
+    assert depth == 5000
+    
+    print("✓ Deep expression tests passed!")
+
+def test_collect_like_terms():
+    """Test hash-based like-term collection."""
+    print("Testing like-term collection...")
+    
+    x = Symbol('x')
+    y = Symbol('y')
+    
+    expr = parse_expression("2*x + y + 3*x*y - x + 4 + x*y*5 - y - 4")
+    assert str(collect_like_terms(expr)) == "(x + (8 * x * y))"
+    
+    # Nested sums are flattened into the collection
+    expr = Add(Mul(Number(1), Add(x, y)), Mul(Number(2), y), x)
+    assert str(collect_like_terms(expr)) == "((2 * x) + (3 * y))"
+    
+    # Everything cancels
+    expr = parse_expression("x*y - y*x + 2 - 2")
+    assert collect_like_terms(expr) == Number(0)
+    
+    # Non-sums are returned unchanged
+    assert collect_like_terms(x) is x
+    
+    # Large sums agree with simplify
+    terms = [Mul(Number(i % 7 - 3), Symbol(f"v{i % 100}"), x) for i in range(20000)]
+    expr = Add(*terms)
+    assert collect_like_terms(expr) is simplify(expr)
+    
+    print("✓ Like-term collection tests passed!")
+
+def test_power_products():
+    """Test merging of repeated factors into powers (x*x*x → x^3)."""
+    print("Testing power products...")
+    
+    cases = [
+        ("x*x*x", "(x ** 3)"),
+        ("x^2 * x^-1", "x"),
+        ("x * x^-1", "1"),
+        ("x / x", "1"),
+        ("2*x*3*x^2*y", "(6 * (x ** 3) * y)"),
+        ("x^a * x^b * x", "(x ** (a + b + 1))"),
+        ("x^2*y^3*x^-2*y^-3*5", "5"),
+        ("(x*y)^2 * (x*y)^-1 * x", "((x ** 2) * y)"),
+        ("3 * 2^x * 2^(1-x)", "6"),
+        ("y * 2^x * 2^(1-x)", "(2 * y)"),
+        ("2^x * 2^(1-x) * 2", "4"),
+    ]
+    for text, expected in cases:
+        result = simplify(parse_expression(text))
+        assert str(result) == expected, text
+        # Merged constants join the coefficient, so the result is final
+        assert simplify(result) is result, text
+    
+    # Large monomials collapse to one power per base
+    x = Symbol('x')
+    y = Symbol('y')
+    expr = Mul(*([x, Pow(y, Number(2))] * 5000))
+    assert simplify(expr) is Mul(Pow(x, Number(5000)), Pow(y, Number(10000)))
+    
+    print("✓ Power product tests passed!")
+
 if __name__ == "__main__":
     print("🧪 Running Phase 3 Tests...\n")
     
@@ -227,6 +327,9 @@ if __name__ == "__main__":
     test_complex_simplifications()
     test_edge_cases()
     test_simplification_integration()
+    test_deep_expressions()
+    test_collect_like_terms()
+    test_power_products()
     
     print("\n🎉 All Phase 3 tests passed! Your simplification engine is working correctly.")
     print("\nNext steps:")
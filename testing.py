@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test helpers for MiniSym
+Expression generators shared by the tests and the benchmarks.
+"""
+
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+
+def random_expr(rng, depth, leaves, constants=range(-2, 4), exponents=range(4),
+                leaf_chance=0.3, add_chance=0.4, mul_chance=0.4, symbolic_exponents=()):
+    """
+    A random expression at most `depth` levels deep, drawn from `rng`.
+
+    Leaves are one of `leaves` or a Number from `constants`. Inner nodes are
+    sums or products of two or three operands, or powers with an exponent
+    from `exponents` (or, when given, one of `symbolic_exponents`). A node
+    stops early with probability `leaf_chance`; otherwise it is a sum with
+    probability `add_chance`, a product with `mul_chance`, else a power.
+    """
+    if depth == 0 or rng.random() < leaf_chance:
+        return rng.choice(leaves + [Number(rng.choice(constants))])
+    kind = rng.random()
+    if kind < add_chance:
+        cls = Add
+    elif kind < add_chance + mul_chance:
+        cls = Mul
+    else:
+        base = random_expr(rng, depth - 1, leaves, constants, exponents,
+                           leaf_chance, add_chance, mul_chance, symbolic_exponents)
+        exp = Number(rng.choice(exponents))
+        if symbolic_exponents:
+            exp = rng.choice([exp] + list(symbolic_exponents))
+        return Pow(base, exp)
+    return cls(*[random_expr(rng, depth - 1, leaves, constants, exponents,
+                             leaf_chance, add_chance, mul_chance, symbolic_exponents)
+                 for _ in range(rng.randint(2, 3))])
+
+def balanced(depth):
+    """2^depth distinct symbols s0, s1, ... under alternating sums and products."""
+    level = [Symbol(f"s{i}") for i in range(1 << depth)]
+    for d in range(1, depth + 1):
+        cls = Add if d % 2 else Mul
+        level = [cls(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0]
+
+# Example usage and testing
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(0)
+    for _ in range(5):
+        print(random_expr(rng, 3, [Symbol('x'), Symbol('y')]))
+    print(balanced(3))
@@ -0,0 +1,89 @@
+import random
+import sys
+import threading
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from simplify import simplify
+
+class TestInterning(unittest.TestCase):
+    def test_threads_share_nodes(self):
+        # Switch threads as often as possible, to interleave the interning
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        barrier = threading.Barrier(8)
+        built = [[] for _ in range(8)]
+        def build(out):
+            barrier.wait()
+            for i in range(2000):
+                out.append(Add(Mul(Number(i), Symbol(f"t{i}")), Pow(Symbol('t'), Number(i))))
+        threads = [threading.Thread(target=build, args=(out,)) for out in built]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        for out in built[1:]:
+            self.assertTrue(all(a is b for a, b in zip(out, built[0])))
+
+class TestFingerprint(unittest.TestCase):
+    def test_huge_integer(self):
+        # Beyond the int-to-str digit limit, which repr() would hit
+        x = Symbol('x')
+        expr = x
+        for _ in range(20):
+            expr = Mul(Number(10**5000), Pow(expr, Number(2)))
+        self.assertIsInstance(expr._key[2], int)
+        self.assertNotEqual(Number(10**5000)._fp, Number(10**5000 + 1)._fp)
+        self.assertNotEqual(Number(1)._fp, Number(1.0)._fp)
+
+    def test_distinct_numbers(self):
+        # hash(-1) == hash(-2), but their fingerprints differ
+        self.assertNotEqual(Number(-1)._fp, Number(-2)._fp)
+        x = Symbol('x')
+        tower = x
+        for _ in range(20):
+            tower = Add(Mul(tower, x), Number(1))
+        u, v = Pow(tower, Number(-1)), Pow(tower, Number(-2))
+        self.assertNotEqual(u._key, v._key)
+        self.assertIs(Add(u, v), Add(v, u))
+        result = simplify(Add(u, Mul(Number(2), v), Mul(Number(3), u)))
+        self.assertIs(result, simplify(Add(Mul(Number(4), u), Mul(Number(2), v))))
+        self.assertEqual(len(result.args), 2)
+
+class TestIncrementalBuild(unittest.TestCase):
+    def test_augmented_assignment(self):
+        rng = random.Random(3)
+        symbols = [Symbol(f"x{j}") for j in range(8)]
+        terms = [Mul(Number(rng.randint(1, 5)), rng.choice(symbols),
+                     Pow(rng.choice(symbols), Number(rng.randint(2, 3))))
+                 for _ in range(3000)]
+        total = Number(0)
+        product = Number(1)
+        for term in terms:
+            total += term
+            product *= term.args[-1]
+        # Merging into the sorted sum gives the node a one-shot build does
+        self.assertIs(total, Add(Number(0), *reversed(terms)))
+        self.assertIs(product, Mul(Number(1), *[term.args[-1] for term in reversed(terms)]))
+        self.assertEqual(total._height, 3)
+
+    def test_merge_keeps_order(self):
+        rng = random.Random(4)
+        atoms = [Symbol(name) for name in "abcdefgh"] + [Number(i) for i in range(-3, 4)]
+        for _ in range(200):
+            parts = [Add(*rng.sample(atoms, rng.randint(2, 6))) for _ in range(rng.randint(1, 3))]
+            extra = rng.sample(atoms, rng.randint(0, 10))
+            merged = Add(*parts, *extra)
+            flat = [arg for part in parts for arg in part.args] + extra
+            self.assertIs(merged, Add(*reversed(flat)))
+
+    def test_nested_parse(self):
+        expr = parse_expression("(" * 3000 + "x" + " + 1)" * 3000)
+        self.assertEqual(len(expr.args), 3001)
+        self.assertEqual(expr._height, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import random
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from poly import SparsePoly
+import dense
+import simplify as simplify_module
+from simplify import simplify
+
+x, y = Symbol('x'), Symbol('y')
+
+@unittest.skipUnless(dense.HAVE_NUMPY, "NumPy is not installed")
+class TestDensePoly(unittest.TestCase):
+    def test_round_trip(self):
+        p = dense.DensePoly.from_string("(x - 1)*(x + 2) + 3*x^4")
+        self.assertEqual(p.coeffs.tolist(), [-2, 1, 1, 0, 3])
+        self.assertIs(p.symbol, x)
+        self.assertEqual(str(p.to_expr()), "(x + (x ** 2) + (3 * (x ** 4)) + -2)")
+        self.assertEqual(dense.DensePoly.from_string("7").degree(), 0)
+        self.assertEqual(dense.DensePoly([0, 0], x).degree(), -1)
+        with self.assertRaises(ValueError):
+            dense.DensePoly.from_string("x*y")
+        with self.assertRaises(ValueError):
+            dense.DensePoly.from_string("x^-1")
+
+    def test_multiply_matches_sparse(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            a = [rng.randint(-50, 50) for _ in range(rng.randrange(1, 40))]
+            b = [rng.randint(-50, 50) for _ in range(rng.randrange(1, 40))]
+            p, q = dense.DensePoly(a, x), dense.DensePoly(b, x)
+            self.assertIs((p * q).to_expr(), (p.to_sparse() * q.to_sparse()).to_expr())
+            self.assertIs((p + q).to_expr(), (p.to_sparse() + q.to_sparse()).to_expr())
+        p = dense.DensePoly([1, 1], x)
+        self.assertEqual((p ** 10).coeffs.tolist()[5], 252)
+
+    def test_large_coefficients_stay_exact(self):
+        p = dense.DensePoly([2 ** 62, 1], x)
+        self.assertEqual((p * p).coeffs.tolist(), [2 ** 124, 2 ** 63, 1])
+        self.assertEqual((p + p).coeffs.tolist(), [2 ** 63, 2])
+        self.assertEqual(dense.DensePoly([0, 0, 2 ** 62], x).derivative().coeffs.tolist(),
+                         [0, 2 ** 63])
+
+    def test_evaluate_and_derivative(self):
+        p = dense.DensePoly.from_string("2*x^3 - x + 5")
+        self.assertEqual(p.evaluate(2), 19)
+        points = dense.np.linspace(-2, 2, 9)
+        expected = [2 * t ** 3 - t + 5 for t in points]
+        self.assertTrue(dense.np.allclose(p(points), expected))
+        self.assertEqual(p.derivative().coeffs.tolist(), [-1, 0, 6])
+        # Integer points that would overflow int64 are evaluated exactly
+        cube = dense.DensePoly.from_string("x^3")
+        self.assertEqual(cube.evaluate(3000000), 27 * 10 ** 18)
+        self.assertEqual(cube.evaluate(dense.np.array([-3000000, 2])).tolist(),
+                         [-27 * 10 ** 18, 8])
+        self.assertEqual(p.derivative().derivative().derivative().derivative().degree(), -1)
+
+    def test_simplify_uses_dense_path(self):
+        rng = random.Random(1)
+        sums = [Add(*[Mul(Number(rng.randint(-3, 3)), Pow(x, Number(rng.randrange(6))))
+                      for _ in range(rng.randrange(8, 40))])
+                for _ in range(50)]
+        for expr in sums:
+            self.assertIs(dense.simplify_univariate(expr), SparsePoly.from_expr(expr).to_expr())
+        fast = [simplify(expr) for expr in sums]
+        min_terms = simplify_module.POLY_MIN_TERMS
+        simplify_module.POLY_MIN_TERMS = float('inf')
+        try:
+            for expr, result in zip(sums, fast):
+                self.assertIs(result, simplify(expr))
+        finally:
+            simplify_module.POLY_MIN_TERMS = min_terms
+        # Sums in more than one symbol are left to the sparse path
+        self.assertIsNone(dense.simplify_univariate(parse_expression("x + y")))
+
+    def test_sparse_sums_skip_dense_path(self):
+        # A high degree over few terms would allocate a huge, nearly empty array
+        expr = Add(*[Pow(x, Number(10 ** 9 + k)) for k in range(8)], Number(1))
+        self.assertIsNone(dense.simplify_univariate(expr))
+        self.assertIs(simplify(expr), SparsePoly.from_expr(expr).to_expr())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from simplify import simplify
+from expand import expand
+from diff import diff, gradient
+
+x, y, z = Symbol('x'), Symbol('y'), Symbol('z')
+
+class TestDiff(unittest.TestCase):
+    def test_basic_rules(self):
+        cases = [
+            ("5", "0"),
+            ("x", "1"),
+            ("y", "0"),
+            ("x^3", "(3 * (x ** 2))"),
+            ("3*x^2 + 2*x + 1", "((6 * x) + 2)"),
+            ("x^-1", "(-1 * (x ** -2))"),
+            ("x^0.5", "(0.5 * (x ** -0.5))"),
+            ("x^y", "((x ** (y + -1)) * y)"),
+        ]
+        for text, expected in cases:
+            self.assertEqual(str(diff(parse_expression(text), x)), expected, text)
+        self.assertRaises(ValueError, diff, parse_expression("2^x"), x)
+
+    def test_product_and_chain_rules(self):
+        self.assertIs(diff(parse_expression("x * y"), x), y)
+        self.assertEqual(str(diff(parse_expression("x^3 * y^2"), x)),
+                         "(3 * (x ** 2) * (y ** 2))")
+        self.assertEqual(str(diff(parse_expression("(x^2 + 1)^3"), x)),
+                         "(6 * x * (((x ** 2) + 1) ** 2))")
+        # Derivatives agree with differentiating the expanded form
+        for text in ["(2*x + 1) * (x - 1)", "(x + y)^4 * (x - 2)", "x * (x + 1) * (x + 2)"]:
+            expr = parse_expression(text)
+            self.assertIs(expand(diff(expr, x)), diff(expand(expr), x), text)
+
+    def test_shared_subexpressions(self):
+        expr = x
+        for i in range(300):
+            expr = Pow(Mul(expr, Add(expr, Number(i + 1))), Number(2))
+        result = diff(expr, x)
+        # A tree would have about 10^90 nodes; the DAG grows linearly
+        seen = set()
+        stack = [result]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(node.args)
+        self.assertLess(len(seen), 10 * 300)
+        # The derivative reuses the input's subtrees
+        for arg in expr.base.args:
+            self.assertIn(arg, seen)
+        # Already-simplified results
+        self.assertIs(simplify(result), result)
+
+class TestGradient(unittest.TestCase):
+    def test_matches_diff(self):
+        for text in ["x * y * z", "(x^2 + y)^3 * z", "x^3 + 2*x*y + 5", "(x + y)^4 * (x - 2)"]:
+            expr = parse_expression(text)
+            partials = gradient(expr, [x, y, z])
+            for partial, sym in zip(partials, [x, y, z]):
+                self.assertIs(expand(partial), expand(diff(expr, sym)), (text, sym))
+        self.assertEqual(gradient(Number(7), [x, y]), [Number(0), Number(0)])
+        self.assertEqual(gradient(x, [y, x]), [Number(0), Number(1)])
+        self.assertRaises(ValueError, gradient, parse_expression("y^x"), [x, y])
+
+    def test_numeric(self):
+        # The partials at a point, without building expressions
+        expr = parse_expression("(x^2 + y)^3 * z")
+        self.assertEqual(gradient(expr, [x, y, z], {x: 2, y: 3, z: 5}), [2940, 735, 343])
+        self.assertEqual(gradient(parse_expression("x * y * x * 0.5"), [x], {x: 0, y: 4}), [0])
+        # Every symbol needs a value
+        self.assertRaises(ValueError, gradient, expr, [x], {x: 2, y: 3})
+
+    def test_many_symbols(self):
+        # Hundreds of symbols in one sweep, sharing the input's subtrees
+        symbols = [Symbol(f"x{i}") for i in range(300)]
+        expr = Number(1)
+        for sym in symbols:
+            expr = Pow(Add(Mul(expr, sym), Number(1)), Number(2))
+        partials = gradient(expr, symbols)
+        values = gradient(expr, symbols, {sym: 0.01 for sym in symbols})
+        self.assertIs(partials[-1], diff(expr, symbols[-1]))
+        # All 300 partials together stay linear in the input's size
+        seen = set()
+        stack = list(partials)
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(node.args)
+        self.assertLess(len(seen), 10 * 300)
+        self.assertEqual(len(values), 300)
+        self.assertGreater(values[-1], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import unittest
+from minisym_ast import Number, Symbol, Pow
+from parser import parse_expression
+from simplify import simplify
+from expand import expand
+from egraph import (EGraph, EGraphSimplifier, simplify_egraph, node_count,
+                    evaluation_cost, tree_cost)
+from testing import random_expr
+
+x, y, z = Symbol('x'), Symbol('y'), Symbol('z')
+
+class TestEGraph(unittest.TestCase):
+    def test_hash_consing(self):
+        graph = EGraph()
+        a = graph.add(parse_expression("(x + y)^2 * (x + y)"))
+        self.assertEqual(graph.add(parse_expression("(x + y)^2 * (x + y)")), a)
+        # x, y, x + y, 2, (x + y)^2 and the product, each stored once
+        self.assertEqual(len(graph), 6)
+
+    def test_congruence(self):
+        graph = EGraph()
+        square_x = graph.add(Pow(x, Number(2)))
+        square_y = graph.add(Pow(y, Number(2)))
+        self.assertNotEqual(graph.find(square_x), graph.find(square_y))
+        graph.union(graph.add(x), graph.add(y))
+        graph.rebuild()
+        self.assertEqual(graph.find(square_x), graph.find(square_y))
+
+    def test_extract(self):
+        graph = EGraph()
+        a = graph.add(parse_expression("x*y + x*z"))
+        graph.union(a, graph.add(parse_expression("x*(y + z)")))
+        self.assertIs(graph.extract(a), parse_expression("x*(y + z)"))
+
+class TestSimplifyEGraph(unittest.TestCase):
+    def test_escapes_local_minima(self):
+        for text, expected in [("(x + 1)^2 - x^2 - 2*x", "1"),
+                               ("x*y + x*z", "x*(y + z)"),
+                               ("(x + y)*(x - y) + y^2", "x^2")]:
+            self.assertIs(simplify_egraph(parse_expression(text)),
+                          parse_expression(expected), text)
+
+    def test_never_worse_than_greedy(self):
+        rng = random.Random(1)
+        for cost in (node_count, evaluation_cost):
+            for _ in range(100):
+                expr = random_expr(rng, 4, [x, y, z])
+                greedy = simplify(expr)
+                result = simplify_egraph(expr, cost)
+                self.assertLessEqual(tree_cost(result, cost), tree_cost(greedy, cost), expr)
+                # Polynomials are equal when their expansions are
+                self.assertIs(expand(result), expand(greedy), expr)
+
+    def test_budgets(self):
+        expr = parse_expression("(x + y + 1)^3 * (x - y)^2 + (x*y + x*z)^2")
+        simplifier = EGraphSimplifier(node_limit=20)
+        result = simplifier.run(expr)
+        self.assertEqual(simplifier.stop_reason, 'node_limit')
+        self.assertIs(expand(result), expand(expr))
+        simplifier = EGraphSimplifier(time_limit=0)
+        self.assertIs(simplifier.run(expr), simplify(expr))
+        self.assertEqual((simplifier.stop_reason, simplifier.iterations), ('time_limit', 1))
+        simplifier = EGraphSimplifier(iteration_limit=1)
+        simplifier.run(expr)
+        self.assertEqual(simplifier.stop_reason, 'iteration_limit')
+
+if __name__ == '__main__':
+    unittest.main()
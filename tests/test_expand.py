@@ -0,0 +1,59 @@
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from simplify import simplify
+from expand import expand
+
+x, y = Symbol('x'), Symbol('y')
+
+class TestExpand(unittest.TestCase):
+    def test_basic_expansion(self):
+        cases = [
+            ("(x + 1) * (x + 2)", "((3 * x) + (x ** 2) + 2)"),
+            ("(x + y)^2", "((x ** 2) + (y ** 2) + (2 * x * y))"),
+            ("(a - b) * (a + b)", "((a ** 2) + (-1 * (b ** 2)))"),
+            ("2 * (x + 3) - 2*x", "6"),
+            ("(x + 1)^0", "1"),
+            ("x * y", "(x * y)"),
+            ("3", "3"),
+        ]
+        for text, expected in cases:
+            self.assertEqual(str(expand(parse_expression(text))), expected, text)
+
+    def test_expansion_is_canonical(self):
+        left = expand(parse_expression("(x + 1)^3"))
+        right = expand(parse_expression("(x + 1)*(x + 1)*(1 + x)"))
+        self.assertIs(left, right)
+        self.assertIs(left, simplify(parse_expression("x^3 + 3*x^2 + 3*x + 1")))
+        # Expanded output is already simplified
+        self.assertIs(simplify(left), left)
+        # Floats and integers mix
+        self.assertEqual(str(expand(parse_expression("(0.5*x + 1) * 2"))), "(x + 2)")
+
+    def test_non_polynomial_parts(self):
+        self.assertIs(expand(parse_expression("x * (x^-1 + 1)")), Add(x, Number(1)))
+        cases = [
+            ("(x * (y + 1))^-1", "((x + (x * y)) ** -1)"),
+            ("2^(x*(x + 1))", "(2 ** (x + (x ** 2)))"),
+            ("(x + 1)^y * (y + 1)", "(((x + 1) ** y) + (y * ((x + 1) ** y)))"),
+            # Exponents that simplify to non-negative integers are multiplied out
+            ("y * (x + 1)^(y - y + 2)", "(y + (2 * x * y) + ((x ** 2) * y))"),
+        ]
+        for text, expected in cases:
+            self.assertEqual(str(expand(parse_expression(text))), expected, text)
+        self.assertIs(expand(parse_expression("(x + 1)^(1 + 1)")),
+                      expand(parse_expression("(x + 1)^2")))
+
+    def test_large_expansion(self):
+        result = expand(parse_expression("(x + y + z + 1)^20"))
+        # One term per monomial of degree <= 20 in three variables
+        self.assertEqual(len(result.args), 1771)
+        self.assertIn(Mul(Number(20), Pow(x, Number(19))), result.args)
+        # Deep nesting does not hit the recursion limit
+        expr = x
+        for _ in range(500):
+            expr = Mul(Add(expr, Number(1)), y)
+        self.assertEqual(len(expand(expr).args), 501)
+
+if __name__ == '__main__':
+    unittest.main()
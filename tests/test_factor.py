@@ -0,0 +1,56 @@
+import random
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from expand import expand
+from factor import factor
+
+x, y, z = Symbol('x'), Symbol('y'), Symbol('z')
+
+class TestFactor(unittest.TestCase):
+    def test_common_factor(self):
+        cases = [
+            ("6*x^2*y + 9*x*y^2", "(3 * x * y * ((2 * x) + (3 * y)))"),
+            ("2*x + 4", "(2 * (x + 2))"),
+            ("-2*x - 4", "(-2 * (x + 2))"),
+            ("x^3 + x^2", "((x ** 2) * (x + 1))"),
+            ("2*x + 3*y", "((2 * x) + (3 * y))"),
+            ("0.5*x + 0.5*x*y", "(x * ((0.5 * y) + 0.5))"),
+            ("x^-1 + x", "(x + (x ** -1))"),
+            ("3 * (2*x + 2)", "(6 * (x + 1))"),
+            ("x", "x"),
+        ]
+        for text, expected in cases:
+            self.assertEqual(str(factor(parse_expression(text))), expected, text)
+
+    def test_difference_of_squares(self):
+        self.assertIs(factor(parse_expression("x^2 - 1")),
+                      Mul(Add(x, Number(1)), Add(x, Number(-1))))
+        cases = [
+            ("4*x^2 - 9*y^2", "(((2 * x) + (-3 * y)) * ((2 * x) + (3 * y)))"),
+            ("x^4 - y^4", "((x + (-1 * y)) * (x + y) * ((x ** 2) + (y ** 2)))"),
+            ("3*x^3 - 12*x", "(3 * x * (x + -2) * (x + 2))"),
+            ("1 - x^2", "(((-1 * x) + 1) * (x + 1))"),
+            ("x^2 + 1", "((x ** 2) + 1)"),
+            ("x^2 - 2", "((x ** 2) + -2)"),
+            ("x^3 - 1", "((x ** 3) + -1)"),
+        ]
+        for text, expected in cases:
+            self.assertEqual(str(factor(parse_expression(text))), expected, text)
+
+    def test_round_trip(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            expr = Add(*[Mul(Number(rng.choice([-1, 1]) * rng.randint(1, 4) * 6),
+                             *[Pow(s, Number(rng.randrange(1, 4))) for s in (x, y, z)
+                               if rng.random() < 0.7])
+                         for _ in range(rng.randrange(1, 6))])
+            self.assertIs(expand(factor(expr)), expand(expr), expr)
+        # A wide sum with a shared factor
+        expr = Add(*[Mul(Number(4 * (i + 1)), Pow(x, Number(i + 2)), y) for i in range(5000)])
+        result = factor(expr)
+        self.assertEqual(result.args[:3], (Number(4), Pow(x, Number(2)), y))
+        self.assertEqual(len(result.args[3].args), 5000)
+
+if __name__ == '__main__':
+    unittest.main()
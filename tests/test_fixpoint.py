@@ -0,0 +1,97 @@
+import random
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from simplify import simplify, RULES, pow_rules, register_rule, clear_user_rules
+from rewrite import Rule, Wild, Value, pattern
+from fixpoint import FixpointSimplifier, simplify_fixpoint
+from testing import random_expr
+
+x, y = Symbol('x'), Symbol('y')
+
+def distribute_pow(expr):
+    """(a*b)^n → a^n * b^n, leaving the new powers unsimplified."""
+    if type(expr.base) is Mul and type(expr.exp) is Number:
+        return Mul(*[Pow(arg, expr.exp) for arg in expr.base.args])
+    return pow_rules(expr)
+
+class TestFixpoint(unittest.TestCase):
+    def test_matches_simplify(self):
+        rng = random.Random(3)
+        for _ in range(300):
+            expr = random_expr(rng, 4, [x, y])
+            self.assertIs(simplify_fixpoint(expr), simplify(expr), expr)
+
+    def test_revisits_only_changes(self):
+        simplifier = FixpointSimplifier()
+        terms = [Mul(Number(i % 5 + 2), Add(Symbol(f"x{i}"), Number(1)),
+                     Add(Symbol(f"x{i}"), Number(1))) for i in range(500)]
+        result = simplifier.run(Add(*terms))
+        self.assertIs(result, simplify(Add(*terms)))
+        self.assertEqual(simplifier.passes, 2)
+        self.assertEqual(simplifier.hits['mul_rules'], 500)
+        # Pass 1 visits the 500 inner sums, the 500 products and the root;
+        # pass 2 only the 500 new products, their 500 new powers and the root
+        self.assertEqual(simplifier.visits, 1001 + 1001)
+        # A fixpoint is recognized without walking it again
+        self.assertIs(simplifier.run(result), result)
+        self.assertEqual((simplifier.passes, simplifier.visits), (0, 0))
+
+    def test_rules_creating_work(self):
+        rules = {**RULES, Pow: distribute_pow}
+        expr = parse_expression("(2*x)^2 * (3*y)^2 + (x*y)^3")
+        # One pass leaves 2^2 and 3^2 unfolded; the fixpoint folds them
+        simplifier = FixpointSimplifier(rules)
+        result = simplifier.run(expr)
+        self.assertTrue(simplifier.converged)
+        self.assertGreater(simplifier.passes, 1)
+        self.assertIs(result, simplify(parse_expression("36*x^2*y^2 + x^3*y^3")))
+        self.assertGreater(simplifier.hits['distribute_pow'], 0)
+
+    def test_iteration_cap(self):
+        def swap(expr):
+            """Rewrite x + 1 and x + 2 into each other forever."""
+            if expr is Add(x, Number(1)):
+                return Add(x, Number(2))
+            if expr is Add(x, Number(2)):
+                return Add(x, Number(1))
+            return expr
+        simplifier = FixpointSimplifier({**RULES, Add: swap}, max_iterations=5)
+        result = simplifier.run(Add(x, Number(1)))
+        self.assertFalse(simplifier.converged)
+        self.assertEqual(simplifier.passes, 5)
+        self.assertIs(result, Add(x, Number(2)))
+
+    def test_user_rules(self):
+        simplifier = FixpointSimplifier()
+        polynomial = Add(*[Mul(Number(k + 1), Pow(x, Number(k))) for k in range(10)])
+        expr = Add(Pow(Add(x, y), Number(2)), Mul(y, polynomial))
+        self.assertIs(simplifier.run(expr), simplify(expr))
+        register_rule(Rule('square', pattern(Pow, Wild('a'), Value(2)), y))
+        try:
+            # Registered rules apply, also to nodes that were stable before
+            # and on sums the polynomial path would otherwise take
+            self.assertIs(simplifier.run(expr), simplify(expr))
+            self.assertIs(simplifier.run(polynomial), simplify(polynomial))
+            self.assertNotIn(Pow(x, Number(2)), simplifier.run(polynomial).args)
+            self.assertGreater(simplifier.hits['user_rules'], 0)
+            # Explicit rule tables are used as they are
+            self.assertIn(Pow(x, Number(2)),
+                          FixpointSimplifier(dict(RULES)).run(Add(Pow(x, Number(2)), y)).args)
+        finally:
+            clear_user_rules()
+        self.assertIs(simplifier.run(expr), simplify(expr))
+
+    def test_rule_returning_its_input(self):
+        simplifier = FixpointSimplifier()
+        register_rule(Rule('commute', pattern(Mul, Wild('a'), Wild('b')),
+                           pattern(Mul, Wild('b'), Wild('a'))))
+        try:
+            self.assertIs(simplifier.run(Mul(x, y)), Mul(x, y))
+            self.assertTrue(simplifier.converged)
+            self.assertEqual(simplifier.hits['user_rules'], 0)
+        finally:
+            clear_user_rules()
+
+if __name__ == '__main__':
+    unittest.main()
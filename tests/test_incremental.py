@@ -0,0 +1,70 @@
+import random
+import unittest
+from minisym_ast import Number, Symbol, Pow
+from parser import parse_expression
+from simplify import simplify, register_rule, clear_user_rules
+from rewrite import Rule, Wild, pattern
+from incremental import SimplifiedExpr
+from testing import random_expr, balanced
+
+x, y = Symbol('x'), Symbol('y')
+
+def random_edit(rng, depth):
+    # Positive constants only, so that no edit creates 0 to a negative power
+    return random_expr(rng, depth, [x, y], constants=range(1, 4))
+
+def random_path(rng, expr):
+    path = []
+    while expr.args and rng.random() < 0.8:
+        path.append(rng.randrange(len(expr.args)))
+        expr = expr.args[path[-1]]
+    return path
+
+class TestIncremental(unittest.TestCase):
+    def test_matches_simplify(self):
+        rng = random.Random(4)
+        for _ in range(30):
+            handle = SimplifiedExpr(random_edit(rng, 5))
+            for _ in range(10):
+                handle.replace(random_path(rng, handle.expr), random_edit(rng, 2))
+                self.assertIs(handle.result, simplify(handle.expr), handle.expr)
+
+    def test_only_the_spine(self):
+        handle = SimplifiedExpr(balanced(12))
+        self.assertEqual(handle.updated, (1 << 12) - 1)
+        path = [0, 1] * 6
+        self.assertEqual(str(handle.subexpr(path)), "s1365")
+        handle.replace(path, Symbol('t'))
+        self.assertEqual(handle.updated, 12)
+        self.assertIs(handle.result, simplify(handle.expr))
+        # A new subtree is simplified along with the spine
+        handle.replace(path[:-2], parse_expression("t * t"))
+        self.assertEqual(handle.updated, 11)
+        self.assertIs(handle.result, simplify(handle.expr))
+
+    def test_memo_stays_bounded(self):
+        handle = SimplifiedExpr(balanced(8))
+        for i in range(1000):
+            handle.replace([i % 2] * 8, Symbol(f"t{i}"))
+            self.assertLessEqual(len(handle.memo), 2 * handle.live)
+        self.assertIs(handle.result, simplify(handle.expr))
+
+    def test_bad_path(self):
+        handle = SimplifiedExpr(parse_expression("x*y + 1"))
+        with self.assertRaises(IndexError):
+            handle.replace([5], x)
+        with self.assertRaises(IndexError):
+            handle.replace([0, 0, 0], x)
+
+    def test_refresh(self):
+        handle = SimplifiedExpr(parse_expression("(x^2)^3 + y"))
+        a, n, m = Wild('a'), Wild('n', Number), Wild('m', Number)
+        register_rule(Rule('pow-of-pow', pattern(Pow, pattern(Pow, a, n), m),
+                           lambda b: Pow(b['a'], Number(b['n'].value * b['m'].value))))
+        try:
+            self.assertIs(handle.refresh(), parse_expression("x^6 + y"))
+        finally:
+            clear_user_rules()
+
+if __name__ == '__main__':
+    unittest.main()
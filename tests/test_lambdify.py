@@ -0,0 +1,75 @@
+import gc
+import linecache
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from diff import gradient
+from lambdify import (lambdify, lambda_source, lambdify_cache_info,
+                      clear_lambdify_cache)
+
+x, y, z = Symbol('x'), Symbol('y'), Symbol('z')
+
+class TestLambdify(unittest.TestCase):
+    def setUp(self):
+        clear_lambdify_cache()
+
+    def test_evaluates(self):
+        f = lambdify(parse_expression("3*x^2*y - x/2 + 1"))
+        self.assertEqual(f.symbols, (x, y))
+        self.assertEqual(f(2, 5), 60)
+        self.assertEqual(lambdify(x ** -1, [x])(4), 0.25)
+        self.assertEqual(lambdify(Number(-2) ** x, ['x'])(3), -8)
+        self.assertEqual(lambdify(Number(7))(), 7)
+        # Symbols missing from the arguments are rejected
+        with self.assertRaises(ValueError):
+            lambdify(x + y, [x])
+
+    def test_common_subexpressions(self):
+        s = Add(x, y)
+        expr = Add(Mul(Pow(s, Number(2)), Add(x, y, Number(1))), Pow(s, Number(2)))
+        source = lambda_source(expr, (x, y))
+        # (x + y)^2 is used twice and computed once
+        self.assertEqual(source.count("** 2"), 1)
+        self.assertEqual(lambdify(expr)(1, 2), 45)
+
+    def test_multiple_outputs(self):
+        expr = parse_expression("(x*y + 1)^3 * z")
+        f = lambdify(gradient(expr, [x, y, z]), [x, y, z])
+        self.assertEqual(f(2, 3, 5), tuple(gradient(expr, [x, y, z], {x: 2, y: 3, z: 5})))
+
+    def test_argument_names(self):
+        # Names that are not usable as parameters are replaced
+        f = lambdify(Add(Symbol('lambda'), Symbol('_t0'), x))
+        self.assertEqual(f(1, 2, 3), 6)
+        self.assertIn("def _lambdified(_a0, _a1, x):", f.source)
+
+    def test_deep_expression(self):
+        expr = x
+        for i in range(5000):
+            expr = Add(Mul(expr, x), Number(i % 7))
+        value, expected = lambdify(expr)(0.5), 0.5
+        for i in range(5000):
+            expected = expected * 0.5 + i % 7
+        self.assertAlmostEqual(value, expected)
+
+    def test_cache(self):
+        expr = x * y + 1
+        f = lambdify(expr, [x, y])
+        self.assertIs(lambdify(expr, (x, y)), f)
+        self.assertIsNot(lambdify(expr, [y, x]), f)
+        self.assertEqual(lambdify_cache_info().hits, 1)
+
+    def test_source_lines_released(self):
+        f = lambdify(x * y + 2, [x, y])
+        g = lambdify(x * y + 3, [x, y])
+        filename = f.__code__.co_filename
+        self.assertNotEqual(filename, g.__code__.co_filename)
+        self.assertEqual(linecache.getline(filename, 1), f.source.splitlines(True)[0])
+        # Evicted and no longer referenced: its source lines go too
+        del f
+        clear_lambdify_cache()
+        gc.collect()
+        self.assertNotIn(filename, linecache.cache)
+
+if __name__ == '__main__':
+    unittest.main()
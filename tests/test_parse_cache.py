@@ -0,0 +1,49 @@
+import unittest
+from minisym_ast import Symbol, Add, Number
+import parser
+from parser import ParseCache, parse_expression
+
+class TestParseCache(unittest.TestCase):
+    def tearDown(self):
+        parser.disable_parse_cache()
+
+    def test_hits_misses_and_evictions(self):
+        cache = ParseCache(maxsize=2)
+        first = cache.parse("x + 1")
+        self.assertIs(cache.parse("x + 1"), first)
+        cache.parse("y")
+        cache.parse("x + 1")      # refreshes "x + 1"
+        cache.parse("z")          # evicts "y", the least recently used
+        self.assertEqual(tuple(cache.cache_info()), (2, 3, 1, 2, 2))
+        self.assertEqual(list(cache.entries), ["x + 1", "z"])
+        cache.clear()
+        self.assertEqual(tuple(cache.cache_info()), (0, 0, 0, 0, 2))
+
+    def test_errors_are_not_cached(self):
+        cache = ParseCache()
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.parse("(x + 2")
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.cache_info().misses, 2)
+
+    def test_parse_expression_opt_in(self):
+        self.assertIsNone(parser.parse_cache_info())
+        parser.enable_parse_cache(maxsize=8)
+        expr = parse_expression("x + 1")
+        self.assertIs(parse_expression("x + 1"), expr)
+        self.assertEqual(expr, Add(Symbol('x'), Number(1)))
+        info = parser.parse_cache_info()
+        self.assertEqual((info.hits, info.misses, info.maxsize), (1, 1, 8))
+        # Cached ASTs are immutable, so callers cannot corrupt them
+        with self.assertRaises(AttributeError):
+            expr.args = ()
+        parser.disable_parse_cache()
+        self.assertIsNone(parser.parse_cache_info())
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            ParseCache(maxsize=0)
+
+if __name__ == '__main__':
+    unittest.main()
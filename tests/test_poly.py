@@ -0,0 +1,89 @@
+import random
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from poly import SparsePoly, is_polynomial, multiply_dict, multiply_kronecker
+import simplify as simplify_module
+from simplify import simplify
+
+x, y, z = Symbol('x'), Symbol('y'), Symbol('z')
+
+def random_poly(rng, terms, degree, symbols=(x, y, z), big=10):
+    return SparsePoly({tuple(rng.randrange(degree) for _ in symbols):
+                       rng.randint(-big, big) for _ in range(terms)}, symbols)
+
+def random_sum(rng, terms):
+    """An unsimplified sum of integer monomials in x, y, z."""
+    return Add(*[Mul(Number(rng.randint(-3, 3)),
+                     *[Pow(s, Number(rng.randrange(3))) for s in (x, y, z)
+                       if rng.random() < 0.7])
+                 for _ in range(terms)])
+
+class TestSparsePoly(unittest.TestCase):
+    def test_round_trip(self):
+        expr = parse_expression("3*x^2*y + 2*x - 5")
+        poly = SparsePoly.from_expr(expr)
+        self.assertEqual(poly.symbols, (x, y))
+        self.assertEqual(poly.terms, {(2, 1): 3, (1, 0): 2, (0, 0): -5})
+        self.assertIs(poly.to_expr(), simplify(expr))
+        self.assertIs(SparsePoly({}, (x,)).to_expr(), Number(0))
+
+    def test_arithmetic(self):
+        p = SparsePoly.from_expr(parse_expression("x + y"))
+        q = SparsePoly.from_expr(parse_expression("x - y"))
+        self.assertEqual(str((p * q).to_expr()), "((x ** 2) + (-1 * (y ** 2)))")
+        self.assertEqual((p + q).terms, {(1, 0): 2})
+        self.assertEqual(len(p - p), 0)
+        cube = SparsePoly.from_expr(parse_expression("(x + 1)^3"))
+        self.assertEqual(cube.terms, {(3,): 1, (2,): 3, (1,): 3, (0,): 1})
+        self.assertEqual(cube.degree(), 3)
+        # Operands over different symbols are aligned first
+        self.assertEqual((SparsePoly.from_expr(z) * p).symbols, (x, y, z))
+        self.assertEqual(p ** 0, SparsePoly.constant(1))
+        with self.assertRaises(ValueError):
+            p ** -1
+
+    def test_not_a_polynomial(self):
+        for text in ["x^-1", "x^y", "2^x", "x^0.5"]:
+            expr = parse_expression(text)
+            self.assertFalse(is_polynomial(expr))
+            with self.assertRaises(ValueError):
+                SparsePoly.from_expr(expr)
+        self.assertTrue(is_polynomial(parse_expression("(x*y + 2)^4 - 1.5")))
+
+    def test_kronecker_matches_dict(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            p = random_poly(rng, rng.randrange(1, 20), 6, big=rng.choice([1, 1000, 10 ** 25]))
+            q = random_poly(rng, rng.randrange(1, 20), 6)
+            if not p.terms or not q.terms:
+                continue
+            packed = multiply_kronecker(p, q)
+            if packed is not None:
+                self.assertEqual(packed.terms, multiply_dict(p, q).terms)
+
+    def test_large_product(self):
+        rng = random.Random(1)
+        p = SparsePoly({(i,): rng.randint(1, 99) for i in range(1000)}, (x,))
+        q = SparsePoly({(i,): -rng.randint(1, 99) for i in range(1000)}, (x,))
+        product = p * q
+        self.assertEqual(len(product), 1999)
+        self.assertEqual(product.terms[(1998,)], p.terms[(999,)] * q.terms[(999,)])
+
+class TestPolynomialSimplify(unittest.TestCase):
+    def setUp(self):
+        self.min_terms = simplify_module.POLY_MIN_TERMS
+
+    def tearDown(self):
+        simplify_module.POLY_MIN_TERMS = self.min_terms
+
+    def test_same_result_as_rules(self):
+        rng = random.Random(2)
+        sums = [random_sum(rng, rng.randrange(1, 60)) for _ in range(100)]
+        fast = [simplify(expr) for expr in sums]
+        simplify_module.POLY_MIN_TERMS = float('inf')
+        for expr, result in zip(sums, fast):
+            self.assertIs(result, simplify(expr))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import io
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+import printer
+
+class TestPrinter(unittest.TestCase):
+    def setUp(self):
+        printer.disable_string_cache()
+
+    def tearDown(self):
+        printer.disable_string_cache()
+
+    def test_matches_str_and_repr(self):
+        x = Symbol('x')
+        expr = Add(Mul(Number(2), Pow(x, Number(3))), Symbol('y'), Number(1))
+        self.assertEqual(printer.sstr(expr), "(y + (2 * (x ** 3)) + 1)")
+        self.assertEqual(str(expr), printer.sstr(expr))
+        self.assertEqual(printer.srepr(expr),
+                         "Add(Symbol('y'), Mul(Number(2), Pow(Symbol('x'), "
+                         "Number(3))), Number(1))")
+        self.assertEqual(repr(expr), printer.srepr(expr))
+
+    def test_deep_expression(self):
+        expr = Symbol('x')
+        for _ in range(50000):
+            expr = Pow(expr, Number(2))
+        text = str(expr)
+        self.assertTrue(text.startswith("(" * 50000 + "x ** 2)"))
+        self.assertEqual(len(text), 50000 * len("( ** 2)") + 1)
+        self.assertTrue(repr(expr).endswith("Number(2))"))
+
+    def test_write_to_stream(self):
+        x = Symbol('x')
+        expr = Add(*[Mul(Number(i), Pow(x, Number(i))) for i in range(2, 3000)])
+        stream = io.StringIO()
+        printer.write(expr, stream)
+        self.assertEqual(stream.getvalue(), str(expr))
+
+    def test_string_cache(self):
+        x = Symbol('x')
+        expr = Add(Mul(Number(2), x), Number(1))
+        printer.enable_string_cache()
+        text = str(expr)
+        self.assertEqual(printer.string_cache_size(), 1)
+        self.assertIs(str(expr), text)
+        # Cached subtrees are reused when rendering a larger expression
+        self.assertEqual(str(Mul(expr, Symbol('y'))), "(y * ((2 * x) + 1))")
+        printer.disable_string_cache()
+        self.assertEqual(printer.string_cache_size(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
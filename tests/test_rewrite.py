@@ -0,0 +1,103 @@
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+import simplify as simplify_module
+from simplify import simplify, register_rule, clear_user_rules, pow_rules, POW_RULES
+from rewrite import Rule, RuleSet, Wild, Rest, Value, pattern, match
+
+x, y, s, c = Symbol('x'), Symbol('y'), Symbol('s'), Symbol('c')
+a, b = Wild('a'), Wild('b')
+n, m = Wild('n', Number), Wild('m', Number)
+
+class TestMatching(unittest.TestCase):
+    def test_positional(self):
+        self.assertEqual(list(match(pattern(Pow, a, n), Pow(x, Number(2)), {})),
+                         [{'a': x, 'n': Number(2)}])
+        self.assertEqual(list(match(pattern(Pow, a, n), Pow(x, y), {})), [])
+        # A repeated variable must bind the same expression
+        self.assertTrue(list(match(pattern(Pow, a, a), Pow(x, x), {})))
+        self.assertFalse(list(match(pattern(Pow, a, a), Pow(x, y), {})))
+        # Value matches equal numbers of any type
+        rule = Rule('one', pattern(Pow, a, Value(1)), a)
+        self.assertIs(rule.apply(Pow(x, Number(1.0))), x)
+        self.assertIsNone(rule.apply(Pow(x, Number(2))))
+
+    def test_commutative(self):
+        expr = Add(Mul(Number(2), x), Pow(y, Number(2)), Number(3))
+        # Operands match in any order, and Rest takes the others
+        rule = Rule('r', pattern(Add, pattern(Pow, a, Value(2)), Rest('rest')),
+                    pattern(Add, a, Rest('rest')))
+        self.assertIs(rule.apply(expr), Add(Mul(Number(2), x), y, Number(3)))
+        # Without a Rest the operand count must agree
+        self.assertIsNone(Rule('r', pattern(Add, a, b), a).apply(expr))
+        self.assertEqual(len(list(match(pattern(Add, a, b, Rest('r')), expr, {}))), 6)
+
+    def test_index(self):
+        rules = RuleSet([
+            Rule('pow-of-x', pattern(Pow, x, a), a),
+            Rule('pow-of-number', pattern(Pow, a, n), a),
+            Rule('pow-of-pow', pattern(Pow, pattern(Pow, a, n), m), a),
+            Rule('sum-with-x', pattern(Add, x, Rest('r')), x),
+            Rule('product', pattern(Mul, a, b), a),
+        ])
+        self.assertEqual(rules.candidates(Pow(x, Number(2))), [0, 1])
+        self.assertEqual(rules.candidates(Pow(y, y)), [])
+        self.assertEqual(rules.candidates(Pow(Pow(y, Number(2)), Number(3))), [1, 2])
+        self.assertEqual(rules.candidates(Add(x, y)), [3])
+        self.assertEqual(rules.candidates(Add(y, Number(1))), [])
+        self.assertEqual(rules.candidates(Mul(x, y)), [4])
+        # Candidates are tried in order until one applies
+        self.assertIs(rules.rewrite(Pow(x, Number(2))), Number(2))
+
+    def test_pow_rules_match_table(self):
+        atoms = [x, Number(0), Number(1), Number(2), Number(-1), Number(0.5), Number(1.0),
+                 Number(0.0), Number(-2.5), Number(3), Add(x, y)]
+        for base in atoms:
+            for exp in atoms:
+                expr = Pow(base, exp)
+                try:
+                    expected = POW_RULES.rewrite(expr) or expr
+                except ZeroDivisionError:
+                    self.assertRaises(ZeroDivisionError, pow_rules, expr)
+                    continue
+                self.assertIs(pow_rules(expr), expected, expr)
+
+class TestUserRules(unittest.TestCase):
+    def tearDown(self):
+        clear_user_rules()
+        simplify_module.disable_simplify_cache()
+
+    def test_register_rule(self):
+        expr = parse_expression("(x^2)^3 + s^2 + 3 + c^2 + y")
+        self.assertIs(simplify(expr), expr)
+        simplify_module.enable_simplify_cache()
+        simplify(expr)
+        register_rule(Rule('pow-of-pow', pattern(Pow, pattern(Pow, a, n), m),
+                           lambda bindings: Pow(bindings['a'],
+                                                Number(bindings['n'].value * bindings['m'].value))))
+        register_rule(Rule('pythagoras',
+                           pattern(Add, pattern(Pow, s, Value(2)), pattern(Pow, c, Value(2)),
+                                   Rest('rest')),
+                           pattern(Add, Number(1), Rest('rest'))))
+        # Registering drops cached results; rule results are simplified further
+        self.assertEqual(str(simplify(expr)), "(y + (x ** 6) + 4)")
+        clear_user_rules()
+        self.assertIs(simplify(expr), expr)
+
+    def test_polynomial_sums(self):
+        # Long sums of monomials skip the rules unless user rules exist
+        expr = Add(*[Mul(Number(k + 1), Pow(x, Number(k))) for k in range(10)])
+        self.assertGreaterEqual(len(expr.args), simplify_module.POLY_MIN_TERMS)
+        register_rule(Rule('square', pattern(Pow, x, Value(2)), y))
+        result = simplify(expr)
+        self.assertIn(Mul(Number(3), y), result.args)
+        self.assertNotIn(Pow(x, Number(2)), [arg for term in result.args for arg in term.args])
+
+    def test_rule_returning_its_input(self):
+        # Canonical order undoes the swap, so the rule rewrites x*y to itself
+        register_rule(Rule('commute', pattern(Mul, a, b), pattern(Mul, b, a)))
+        self.assertIs(simplify(Mul(x, y)), Mul(x, y))
+        self.assertIs(simplify(parse_expression("2*x*y + x*y")), parse_expression("3*x*y"))
+
+if __name__ == '__main__':
+    unittest.main()
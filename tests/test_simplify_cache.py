@@ -0,0 +1,48 @@
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul
+import simplify as simplify_module
+from simplify import simplify
+
+def shared_dag(levels):
+    """An expression whose tree doubles in size each level, but whose DAG does not."""
+    expr = Symbol('x')
+    for i in range(levels):
+        expr = Mul(Add(expr, Number(0)), Add(expr, Number(i + 1)))
+    return expr
+
+class TestSimplifyMemo(unittest.TestCase):
+    def tearDown(self):
+        simplify_module.disable_simplify_cache()
+
+    def test_shared_subexpressions_simplified_once(self):
+        # 2**80 tree nodes: only feasible if each shared subtree is visited once
+        expr = shared_dag(80)
+        memo = {}
+        result = simplify_module.simplify_all([expr], memo)[0]
+        # One memo entry per distinct composite node: two sums and a product a level
+        self.assertEqual(len(memo), 3 * 80)
+        expected = Symbol('x')
+        for i in range(80):
+            expected = Mul(expected, Add(expected, Number(i + 1)))
+        self.assertIs(result, expected)
+
+    def test_global_cache(self):
+        self.assertIsNone(simplify_module.simplify_cache_info())
+        simplify_module.enable_simplify_cache(maxsize=3)
+        x = Symbol('x')
+        expr = Add(Mul(Number(2), x), Mul(Number(3), x))
+        self.assertEqual(str(simplify(expr)), "(5 * x)")
+        misses = simplify_module.simplify_cache_info().misses
+        self.assertEqual(str(simplify(expr)), "(5 * x)")
+        info = simplify_module.simplify_cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, misses)
+        # The cache stays bounded
+        for i in range(10):
+            simplify(Add(x, Number(i), Number(1)))
+        info = simplify_module.simplify_cache_info()
+        self.assertEqual(info.size, 3)
+        self.assertGreater(info.evictions, 0)
+
+if __name__ == '__main__':
+    unittest.main()
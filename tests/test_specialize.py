@@ -0,0 +1,83 @@
+import os
+import random
+import tempfile
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from simplify import simplify, register_rule, clear_user_rules
+from rewrite import Rule, Wild, Rest, Value, pattern
+from specialize import build_simplifier
+from testing import random_expr
+
+x, y, s, c = Symbol('x'), Symbol('y'), Symbol('s'), Symbol('c')
+a, n, m = Wild('a'), Wild('n', Number), Wild('m', Number)
+
+def pow_of_pow(bindings):
+    return Pow(bindings['a'], Number(bindings['n'].value * bindings['m'].value))
+
+class TestSpecialize(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        clear_user_rules()
+        self.cache_dir.cleanup()
+
+    def assert_equivalent(self, module, seed):
+        rng = random.Random(seed)
+        for _ in range(300):
+            expr = random_expr(rng, 4, [x, y, s, c], constants=[-1, 0, 1, 2, 3, 0.5],
+                               add_chance=0.35, mul_chance=0.35, symbolic_exponents=[x])
+            self.assertIs(module.simplify(expr), simplify(expr), expr)
+
+    def test_matches_simplify(self):
+        module = build_simplifier(self.cache_dir.name)
+        self.assert_equivalent(module, 5)
+        expr = parse_expression("x^1 + 2^3 + (x*y)^0 + 0^2 + 1^x")
+        self.assertIs(module.simplify(expr), simplify(expr))
+
+    def test_user_rules(self):
+        register_rule(Rule('pow-of-pow', pattern(Pow, pattern(Pow, a, n), m), pow_of_pow))
+        register_rule(Rule('pythagoras',
+                           pattern(Add, pattern(Pow, s, Value(2)), pattern(Pow, c, Value(2)),
+                                   Rest('rest')),
+                           pattern(Add, Number(1), Rest('rest'))))
+        register_rule(Rule('square-root', pattern(Pow, pattern(Pow, a, Value(2)), Value(0.5)), a))
+        module = build_simplifier(self.cache_dir.name)
+        expr = parse_expression("(x^2)^3 + s^2 + 3 + c^2 + y + (y^2)^0.5")
+        self.assertEqual(str(module.simplify(expr)), "((2 * y) + (x ** 6) + 4)")
+        self.assertIs(module.simplify(expr), simplify(expr))
+        self.assert_equivalent(module, 6)
+
+    def test_user_rules_on_polynomial_sums(self):
+        expr = Add(*[Mul(Number(k + 1), Pow(x, Number(k))) for k in range(10)])
+        register_rule(Rule('square', pattern(Pow, x, Value(2)), y))
+        module = build_simplifier(self.cache_dir.name)
+        self.assertIs(module.simplify(expr), simplify(expr))
+        self.assertIn(Mul(Number(3), y), module.simplify(expr).args)
+
+    def test_rule_returning_its_input(self):
+        register_rule(Rule('commute', pattern(Mul, a, Wild('b')), pattern(Mul, Wild('b'), a)))
+        module = build_simplifier(self.cache_dir.name)
+        self.assertIs(module.simplify(Mul(x, y)), Mul(x, y))
+
+    def test_disk_cache(self):
+        first = build_simplifier(self.cache_dir.name)
+        self.assertTrue(first.rebuilt)
+        # The same rules reuse the generated file
+        again = build_simplifier(self.cache_dir.name)
+        self.assertFalse(again.rebuilt)
+        self.assertEqual(again.__file__, first.__file__)
+        # Changed rules generate a new one, and their own results
+        register_rule(Rule('pow-of-pow', pattern(Pow, pattern(Pow, a, n), m), pow_of_pow))
+        changed = build_simplifier(self.cache_dir.name)
+        self.assertTrue(changed.rebuilt)
+        self.assertNotEqual(changed.__file__, first.__file__)
+        expr = parse_expression("(x^2)^3")
+        self.assertIs(changed.simplify(expr), Pow(x, Number(6)))
+        self.assertIs(first.simplify(expr), expr)
+        self.assertEqual(len([name for name in os.listdir(self.cache_dir.name)
+                              if name.endswith('.py')]), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import pickle
+import unittest
+from array import array
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from diff import gradient
+from lambdify import lambdify
+from tape import Tape
+
+x, y, z = Symbol('x'), Symbol('y'), Symbol('z')
+
+class TestTape(unittest.TestCase):
+    def test_evaluates(self):
+        for text in ["(x + y)^2 * (x + y + 1) + 3*(x + y)^2 - x*y*z",
+                     "x^-1 + y^0.5 * z^3", "7", "y"]:
+            expr = parse_expression(text)
+            tape = Tape.from_exprs(expr, [x, y, z])
+            f = lambdify(expr, [x, y, z])
+            for point in [(1, 2, 3), (0.5, 4.0, -1.5)]:
+                self.assertAlmostEqual(tape(*point), f(*point))
+        self.assertIsInstance(tape.code, array)
+        with self.assertRaises(ValueError):
+            Tape.from_exprs(x + y, [x])
+        with self.assertRaises(TypeError):
+            Tape.from_exprs(x + y)(1)
+
+    def test_common_subexpressions_and_registers(self):
+        s = Add(x, y)
+        expr = Add(Mul(Pow(s, Number(2)), Add(x, y, Number(1))), Pow(s, Number(2)))
+        tape = Tape.from_exprs(expr)
+        # x + y, its square, x + y + 1 (two), the product and the sum
+        self.assertEqual(len(tape), 6)
+        # A long chain reuses one temporary
+        chain = x
+        for i in range(1000):
+            chain = Add(Mul(chain, x), Number(i % 3))
+        tape = Tape.from_exprs(chain)
+        self.assertEqual(tape.registers, 1 + 3 + 1)
+        self.assertEqual(tape(0), 999 % 3)
+
+    def test_multiple_outputs_and_batches(self):
+        expr = parse_expression("(x*y + 1)^3 * z")
+        tape = Tape.from_exprs(gradient(expr, [x, y, z]), [x, y, z])
+        self.assertEqual(tape(2, 3, 5), (2205, 1470, 343))
+        dx, dy, dz = tape.evaluate_batch([0, 1, 2], 3, [5, 5, 5])
+        self.assertEqual(dz, [1, 64, 343])
+        self.assertEqual(dx, [tape(v, 3, 5)[0] for v in range(3)])
+        with self.assertRaises(ValueError):
+            tape.evaluate_batch([0, 1], [0, 1, 2], 5)
+
+    def test_serialization(self):
+        expr = parse_expression("(x + 2.5)^3 * y - x/y")
+        tape = Tape.from_exprs(expr)
+        copy = Tape.from_bytes(tape.to_bytes())
+        self.assertEqual(copy.code, tape.code)
+        self.assertEqual(copy.symbols, tape.symbols)
+        self.assertEqual(copy(1.5, 2), tape(1.5, 2))
+        self.assertEqual(pickle.loads(pickle.dumps(tape))(1.5, 2), tape(1.5, 2))
+        self.assertNotIn(b'Add', pickle.dumps(tape))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from minisym_ast import Number, Symbol, Add, Mul, Pow
+from parser import parse_expression
+from diff import gradient
+from lambdify import lambdify
+import vectorize
+from vectorize import ArrayEvaluator, evaluate_array
+
+x, y, z = Symbol('x'), Symbol('y'), Symbol('z')
+
+@unittest.skipUnless(vectorize.HAVE_NUMPY, "NumPy is not installed")
+class TestArrayEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.np = vectorize.np
+        rng = self.np.random.default_rng(1)
+        self.columns = [rng.random(1001) + 0.5 for _ in range(3)]
+
+    def test_matches_scalar_evaluation(self):
+        np = self.np
+        for text in ["(x + y)^2 * (x + y + 1) + 3*(x + y)^2 - x*y*z",
+                     "x^-1 + y^0.5 * z^3", "(x*z + 1)^-2 / y"]:
+            expr = parse_expression(text)
+            f = lambdify(expr, [x, y, z])
+            expected = [f(*row) for row in zip(*self.columns)]
+            for chunk_size in (1, 7, 1000, 5000):
+                result = ArrayEvaluator(expr, [x, y, z])(*self.columns, chunk_size=chunk_size)
+                self.assertTrue(np.allclose(result, expected), (text, chunk_size))
+
+    def test_constant_steps(self):
+        # Steps between two constants run in floating point, as in lambdify
+        expr = Mul(x, Pow(Number(2), Number(-1)))
+        result = evaluate_array(expr, {'x': self.np.arange(3.)})
+        self.assertEqual(result.tolist(), [0, 0.5, 1])
+
+    def test_shared_subexpressions_and_buffers(self):
+        s = Add(x, y)
+        expr = Add(Mul(Pow(s, Number(2)), Add(x, y, Number(1))), Pow(s, Number(2)))
+        evaluator = ArrayEvaluator(expr)
+        # x + y and its square are computed once each
+        self.assertEqual(len(evaluator.steps), 6)
+        self.assertLessEqual(evaluator.buffers, 3)
+        # A long chain needs no more buffers than a short one
+        chain = x
+        for i in range(500):
+            chain = Add(Mul(chain, x), Number(i % 3))
+        self.assertEqual(ArrayEvaluator(chain).buffers, 1)
+
+    def test_inputs_and_outputs(self):
+        np = self.np
+        # Scalars broadcast, integer columns are evaluated as floats
+        result = evaluate_array(parse_expression("x^-1 * y"), {'x': np.arange(1, 5), 'y': 2})
+        self.assertTrue(np.allclose(result, [2, 1, 2 / 3, 0.5]))
+        out = np.zeros(4)
+        self.assertIs(evaluate_array(x + 1, {x: np.arange(4.0)}, out=out), out)
+        self.assertEqual(out.tolist(), [1, 2, 3, 4])
+        self.assertEqual(evaluate_array(Number(7), {x: np.arange(3.0)}).tolist(), [7, 7, 7])
+        # Several outputs share one plan
+        partials = gradient(parse_expression("(x*y + 1)^3 * z"), [x, y, z])
+        dx, dy, dz = evaluate_array(partials, {x: np.arange(3.0), y: 2, z: 1.5})
+        self.assertEqual(dz.tolist(), [1, 27, 125])
+        with self.assertRaises(ValueError):
+            evaluate_array(x + y, {x: np.arange(3.0)})
+        with self.assertRaises(ValueError):
+            evaluate_array(x + y, {x: np.arange(3.0), y: np.arange(4.0)})
+
+if __name__ == '__main__':
+    unittest.main()
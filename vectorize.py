@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Vectorized evaluation for MiniSym
+Evaluates expressions over NumPy arrays, one whole-array ufunc per node.
+NumPy is optional: without it HAVE_NUMPY is False and ArrayEvaluator
+cannot be used.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from minisym_ast import Expr, Symbol, Add
+from poly import free_symbols
+from tape import Tape, ADD, MUL, POW
+
+HAVE_NUMPY = np is not None
+
+# Rows evaluated per chunk: large enough that each ufunc call amortizes its
+# overhead, small enough that the temporaries stay in cache
+CHUNK_SIZE = 1 << 14
+
+class ArrayEvaluator:
+    """
+    A compiled plan evaluating `exprs` over arrays bound to `symbols`.
+
+    The plan is the expressions' Tape, with each instruction run as one
+    whole-array ufunc call writing in place with out=: each unique
+    subexpression is computed once per chunk, and a register's buffer is
+    handed to a later node as soon as its last reader has run, so the
+    number of buffers is the largest number of intermediates alive at once
+    rather than the number of nodes.
+    """
+
+    def __init__(self, exprs, symbols=None):
+        if not HAVE_NUMPY:
+            raise ImportError("ArrayEvaluator needs NumPy")
+        self.single = isinstance(exprs, Expr)
+        self.exprs = (exprs,) if self.single else tuple(exprs)
+        if symbols is None:
+            symbols = free_symbols(Add(*self.exprs)) if self.exprs else ()
+        self.symbols = tuple([Symbol(sym) if isinstance(sym, str) else sym
+                              for sym in symbols])
+        self.compile()
+
+    def compile(self):
+        """Map the instructions of the expressions' tape to ufunc steps."""
+        tape = Tape.from_exprs(self.exprs, self.symbols)
+        ufuncs = {ADD: np.add, MUL: np.multiply, POW: np.power}
+        code = tape.code
+        self.steps = [(ufuncs[op], a, b, dst)
+                      for op, dst, a, b in zip(code[0::4], code[1::4], code[2::4], code[3::4])]
+        self.constants = list(tape.constants)
+        self.buffers = tape.registers - len(self.symbols) - len(self.constants)
+        self.outputs = tape.outputs
+        self.dtype = np.result_type(np.float64, *[np.min_scalar_type(value)
+                                                  for value in self.constants])
+
+    def __call__(self, *arrays, chunk_size=CHUNK_SIZE, out=None):
+        """
+        Evaluate at the rows of `arrays`, one per symbol (scalars broadcast).
+
+        Rows are processed `chunk_size` at a time, so the temporaries take
+        `chunk_size` elements each however long the inputs are. Results are
+        written to `out` when given (an array, or a sequence of arrays for
+        several expressions) and returned.
+        """
+        if len(arrays) != len(self.symbols):
+            raise TypeError(f"Expected {len(self.symbols)} arrays, got {len(arrays)}")
+        arrays = [np.asarray(array) for array in arrays]
+        lengths = {len(array) for array in arrays if array.ndim}
+        if len(lengths) > 1 or any(array.ndim > 1 for array in arrays):
+            raise ValueError("Inputs must be scalars or 1-D arrays of one length")
+        rows = lengths.pop() if lengths else 1
+        dtype = np.result_type(self.dtype, *arrays)
+
+        if out is None:
+            outputs = [np.empty(rows, dtype=dtype) for _ in self.exprs]
+        else:
+            outputs = [out] if self.single else list(out)
+        chunk_size = max(1, min(chunk_size, rows))
+        buffers = np.empty((self.buffers, chunk_size), dtype=dtype)
+        # Constants are scalars of the result dtype too: two Python ints would
+        # select NumPy's integer loop, which rejects 2 ** -1
+        constants = [dtype.type(value) for value in self.constants]
+        registers = [None] * len(self.symbols) + constants + list(buffers)
+        # Columns of another dtype (integers, say) are converted a chunk at a
+        # time, so that every ufunc runs in the result dtype
+        columns = []
+        for i, array in enumerate(arrays):
+            if array.ndim == 0:
+                registers[i] = array.astype(dtype)[()]
+            elif array.dtype == dtype:
+                columns.append((i, array, None))
+            else:
+                columns.append((i, array, np.empty(chunk_size, dtype=dtype)))
+
+        steps = self.steps
+        first_buffer = len(registers) - self.buffers
+        for start in range(0, rows, chunk_size):
+            stop = min(start + chunk_size, rows)
+            for i, array, converted in columns:
+                if converted is None:
+                    registers[i] = array[start:stop]
+                else:
+                    registers[i] = converted[:stop - start]
+                    np.copyto(registers[i], array[start:stop], casting='unsafe')
+            if stop - start != chunk_size:
+                for i, buffer in enumerate(buffers):
+                    registers[first_buffer + i] = buffer[:stop - start]
+            for ufunc, a, b, target in steps:
+                ufunc(registers[a], registers[b], out=registers[target])
+            for result, index in zip(outputs, self.outputs):
+                result[start:stop] = registers[index]
+        return outputs[0] if self.single else tuple(outputs)
+
+def evaluate_array(exprs, values, chunk_size=CHUNK_SIZE, out=None):
+    """
+    Evaluate `exprs` with each Symbol bound to an array (or scalar).
+
+    `values` maps Symbols or their names to the input columns. See
+    ArrayEvaluator for reusing the compiled plan across calls.
+    """
+    values = {Symbol(key) if isinstance(key, str) else key: value
+              for key, value in values.items()}
+    evaluator = ArrayEvaluator(exprs, tuple(values))
+    return evaluator(*values.values(), chunk_size=chunk_size, out=out)
+
+# Example usage and testing
+if __name__ == "__main__":
+    from parser import parse_expression
+
+    expr = parse_expression("(x + y)^2 * (x + y + 1) + (x + y)^2")
+    x = np.linspace(0, 1, 5)
+    print(f"x = {x}")
+    print(f"{expr} at y = 2 → {evaluate_array(expr, {'x': x, 'y': 2.0})}")